@@ -0,0 +1,102 @@
+# benchmarks/bench_player.py
+# Player dispatch overhead and schedule lateness through the null backend,
+# plus lateness while the parent process is busy, for the in-thread Player
+# and the out-of-process RemotePlayer.
+#
+#   python -m benchmarks.bench_player
+import os
+import statistics
+import threading
+import time
+
+os.environ.setdefault("PYNPUT_BACKEND", "dummy")
+
+from src.backends import NullBackend  # noqa: E402
+from src.plan import compile_events  # noqa: E402
+from src.player import Player  # noqa: E402
+from src.remote_player import RemotePlayer  # noqa: E402
+from src.telemetry import Telemetry  # noqa: E402
+
+from benchmarks.stats import summarize  # noqa: E402
+from benchmarks.synthetic import synthetic_events  # noqa: E402
+
+# Timed runs replay 1 ms-spaced events, so they are kept short; the
+# unlimited-speed run measures pure dispatch cost at every size.
+TIMED_EVENTS = 1_000
+SPEEDS = (("1x", 1.0), ("2x", 2.0))
+SIZES = (1_000, 10_000, 100_000)
+REPEAT = 3  # dispatch cost is the best of REPEAT runs
+ISOLATION_EVENTS = 500  # 1 ms apart, played while a busy thread holds the parent's GIL
+
+
+def lateness_us(plan, backend, speed):
+    """Dispatch lateness per event in microseconds.
+
+    The player's start time is not observable from outside, so lateness is
+    measured against the earliest dispatch relative to its own schedule.
+    Cursor moves are filtered out so each logged action is one plan row.
+    """
+    actions = [entry[0] for entry in backend.log if entry[1] != "move"]
+    skew = [t - o / speed * 1e9 for t, o in zip(actions, plan.offsets)]
+    anchor = min(skew)
+    return [(s - anchor) / 1000 for s in skew]
+
+
+def _busy(stop):
+    # Stands in for Tk redraws and listener callbacks: pure-Python work
+    # that only lets go of the GIL at the interpreter's switch interval
+    while not stop.is_set():
+        sum(i * i for i in range(10_000))
+
+
+def isolation():
+    """Lateness (us) for in-thread vs out-of-process playback under parent load."""
+    plan = compile_events(synthetic_events(ISOLATION_EVENTS))
+    results = {}
+    for label, player in (("thread", Player(settle=0, backend=NullBackend(), telemetry=Telemetry())),
+                          ("process", RemotePlayer(settle=0, backend="null", telemetry=Telemetry()))):
+        if label == "process":
+            player.start()  # spawn cost is not part of playback
+        stop = threading.Event()
+        worker = threading.Thread(target=_busy, args=(stop,), daemon=True)
+        worker.start()
+        try:
+            player.play(plan)
+        finally:
+            stop.set()
+            worker.join()
+            if label == "process":
+                player.close()
+        t = player.telemetry
+        n = min(t.recorded, t.capacity)
+        late = [(t.actual[i] - t.scheduled[i]) / 1000 for i in range(n)]
+        for stat, value in summarize(late).items():
+            results[f"player.isolation.{label}.{stat}_us"] = value
+        results[f"player.isolation.{label}.stdev_us"] = statistics.pstdev(late) if late else 0.0
+    return results
+
+
+def collect(sizes=SIZES):
+    results = {}
+    for label, speed in SPEEDS:
+        plan = compile_events(synthetic_events(TIMED_EVENTS))
+        backend = NullBackend()
+        Player(settle=0, backend=backend).play(plan, speed=speed)
+        for stat, value in summarize(lateness_us(plan, backend, speed)).items():
+            results[f"player.lateness.{label}.{stat}_us"] = value
+    for n in sizes:
+        plan = compile_events(synthetic_events(n))
+        best = float("inf")
+        for _ in range(REPEAT):
+            player = Player(settle=0, backend=NullBackend())
+            t0 = time.perf_counter_ns()
+            player.play(plan, speed=float("inf"))
+            best = min(best, time.perf_counter_ns() - t0)
+        results[f"player.dispatch.unlimited.{n}_ns_per_event"] = best / n
+    results.update(isolation())
+    return results
+
+
+if __name__ == "__main__":
+    for key, value in collect().items():
+        print(f"{key:<48} {value:12.2f}")
@@ -0,0 +1,121 @@
+# benchmarks/bench_recorder.py
+# Cost of one Recorder listener callback on the OS hook thread, comparing
+# the original capture path (timestamp + round + key mapping + dict + lock,
+# all inline) with the current enqueue-only path.
+#
+#   python -m benchmarks.bench_recorder
+#
+# collect() is the benchmark-suite entry point (see benchmarks/run.py).
+import os
+import time
+from time import perf_counter_ns
+
+os.environ.setdefault("PYNPUT_BACKEND", "dummy")
+
+from pynput.keyboard import KeyCode  # noqa: E402
+from pynput.mouse import Button  # noqa: E402
+
+from src.backends import NullBackend  # noqa: E402
+from src.recorder import Recorder  # noqa: E402
+
+from benchmarks.stats import summarize  # noqa: E402
+from benchmarks.synthetic import synthetic_input  # noqa: E402
+
+RATES = (1_000, 10_000)  # injected events per second
+
+
+class _InlineRecorder(Recorder):
+    """The pre-queue capture path, kept here as the comparison baseline."""
+
+    def __init__(self):
+        super().__init__()
+        self._start_time = time.time()
+
+    def _on_click(self, x, y, button, pressed):
+        ts = round(time.time() - self._start_time, 4)
+        with self._lock:
+            self._events.append({
+                "type": "click",
+                "x": int(x), "y": int(y),
+                "button": button.name,
+                "pressed": pressed,
+                "t": ts,
+            })
+
+    def _on_key_press(self, key):
+        if self._is_filtered(key):
+            return
+        ts = round(time.time() - self._start_time, 4)
+        with self._lock:
+            self._events.append({
+                "type": "key",
+                "key": self._key_str(key),
+                "pressed": True,
+                "t": ts,
+            })
+
+
+def time_callbacks(recorder, n):
+    """Return mean ns per callback for n key presses and n clicks."""
+    key = KeyCode.from_char("a")
+    on_key, on_click = recorder._on_key_press, recorder._on_click
+    start = time.perf_counter_ns()
+    for i in range(n):
+        on_key(key)
+        on_click(i, i, Button.left, True)
+    return (time.perf_counter_ns() - start) / (2 * n)
+
+
+def run(n=100_000):
+    inline = _InlineRecorder()
+    queued = Recorder()
+    # Real input arrives far slower than this loop, so the consumer normally
+    # works between callbacks. Timing without it running isolates what the
+    # hook thread itself pays; stop() drains the backlog afterwards.
+    results = {
+        "inline_ns": time_callbacks(inline, n),
+        "queued_ns": time_callbacks(queued, n),
+    }
+    start = time.perf_counter_ns()
+    assert len(queued.stop()) == 2 * n
+    results["consumer_ns"] = (time.perf_counter_ns() - start) / (2 * n)
+    return results
+
+
+def time_callbacks_at_rate(rate, seconds=1.0):
+    """Per-callback cost (ns) while a live Recorder receives `rate` events/s."""
+    backend = NullBackend()
+    recorder = Recorder(backend=backend)
+    recorder.start()
+    samples = []
+
+    def timed(callback):
+        def wrapper(*args):
+            t0 = perf_counter_ns()
+            callback(*args)
+            samples.append(perf_counter_ns() - t0)
+        return wrapper
+
+    backend._callbacks = {name: timed(cb) for name, cb in backend._callbacks.items() if cb is not None}
+    backend.inject(synthetic_input(int(rate * seconds)), rate=rate)
+    recorder.stop()
+    return summarize(samples)
+
+
+def collect(sizes=None):
+    results = {}
+    for rate in RATES:
+        for stat, value in time_callbacks_at_rate(rate).items():
+            results[f"recorder.callback.{rate}hz.{stat}_ns"] = value
+    r = run(n=10_000)
+    results["recorder.callback.inline_mean_ns"] = r["inline_ns"]
+    results["recorder.callback.queued_mean_ns"] = r["queued_ns"]
+    return results
+
+
+if __name__ == "__main__":
+    r = run()
+    print(f"inline callback : {r['inline_ns']:8.0f} ns/event")
+    print(f"queued callback : {r['queued_ns']:8.0f} ns/event")
+    print(f"speedup         : {r['inline_ns'] / r['queued_ns']:8.2f}x")
+    print(f"consumer work   : {r['consumer_ns']:8.0f} ns/event (off the hook thread)")
@@ -0,0 +1,82 @@
+# benchmarks/bench_store.py
+# save_macro / load_macro / load_compiled / list_macros across macro and library sizes, plus
+# bytes per event on disk for each format and compression codec.
+#
+#   python -m benchmarks.bench_store
+import os
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("PYNPUT_BACKEND", "dummy")
+
+from src import macro_store  # noqa: E402
+from src.macro_store import save_macro, load_macro, load_columns, load_compiled, list_macros, _macro_path  # noqa: E402
+from src.plan import compile_events  # noqa: E402
+
+from benchmarks.synthetic import synthetic_events  # noqa: E402
+
+MACRO_SIZES = (1_000, 10_000, 100_000)
+LIBRARY_SIZES = (10, 100, 1_000)
+# label -> (format, save_macro options)
+FORMATS = {
+    "json": ("json", {}),
+    "binary": ("binary", {}),
+    "zlib": ("compressed", {"codec": "zlib"}),
+    "lzma": ("compressed", {"codec": "lzma"}),
+}
+
+
+REPEAT = 3  # each timing is the best of REPEAT runs, to damp scheduler noise
+
+
+def _time(fn, *args, setup=None, **kwargs):
+    best = float("inf")
+    for _ in range(REPEAT):
+        if setup is not None:
+            setup()
+        t0 = time.perf_counter()
+        fn(*args, **kwargs)
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def _forget_indexes():
+    # Each list_macros measurement starts from a fresh process state
+    macro_store._indexes.clear()
+
+
+def collect(sizes=MACRO_SIZES, library_sizes=LIBRARY_SIZES):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp)
+        for n in sizes:
+            events = synthetic_events(n)
+            for label, (fmt, options) in FORMATS.items():
+                name = f"m{n}_{label}"
+                results[f"store.save.{label}.{n}_ms"] = _time(save_macro, name, events, folder=folder, fmt=fmt,
+                                                              **options)
+                results[f"store.load.{label}.{n}_ms"] = _time(load_macro, name, folder=folder)
+                results[f"store.load_columns.{label}.{n}_ms"] = _time(load_columns, name, folder=folder)
+                results[f"store.load_compiled.{label}.{n}_ms"] = _time(load_compiled, name, compile_events,
+                                                                       folder=folder)
+                size = _macro_path(name, folder).stat().st_size
+                results[f"store.bytes_per_event.{label}.{n}"] = size / n
+        for count in library_sizes:
+            lib = folder / f"lib{count}"
+            events = synthetic_events(1_000)
+            for i in range(count):
+                save_macro(f"macro{i:05d}", events, folder=lib)
+
+            def cold():
+                (lib / ".macro_index").unlink(missing_ok=True)
+                _forget_indexes()
+
+            results[f"store.list.cold.{count}_ms"] = _time(list_macros, folder=lib, setup=cold)
+            results[f"store.list.indexed.{count}_ms"] = _time(list_macros, folder=lib, setup=_forget_indexes)
+    return results
+
+
+if __name__ == "__main__":
+    for key, value in collect().items():
+        print(f"{key:<40} {value:10.2f}")
@@ -0,0 +1,94 @@
+# benchmarks/run.py
+# Benchmark suite runner with stored baselines.
+#
+#   python -m benchmarks.run                      # run and compare to baseline
+#   python -m benchmarks.run --save-baseline      # run and store as new baseline
+#   python -m benchmarks.run --full               # include 1e6-event macros
+#   python -m benchmarks.run --only store player  # subset of suites
+#
+# Every metric is lower-is-better. Baselines are machine specific, so they
+# are not committed; keep one per machine (see --baseline).
+import argparse
+import json
+import os
+import platform
+import sys
+from pathlib import Path
+
+os.environ.setdefault("PYNPUT_BACKEND", "dummy")
+
+DEFAULT_BASELINE = Path(__file__).with_name("baselines.json")
+QUICK_SIZES = (1_000, 10_000, 100_000)
+FULL_SIZES = QUICK_SIZES + (1_000_000,)
+SUITES = ("recorder", "store", "player")
+
+
+def run_suites(names, sizes):
+    results = {}
+    for name in names:
+        if name == "recorder":
+            from benchmarks import bench_recorder
+            results.update(bench_recorder.collect())
+        elif name == "store":
+            from benchmarks import bench_store
+            results.update(bench_store.collect(sizes=sizes))
+        elif name == "player":
+            from benchmarks import bench_player
+            results.update(bench_player.collect(sizes=sizes))
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Return (report lines, regressed metric names)."""
+    lines = [f"{'metric':<50} {'baseline':>12} {'current':>12} {'change':>8}"]
+    regressed = []
+    for key in sorted(results):
+        current = results[key]
+        base = baseline.get(key)
+        if base is None:
+            lines.append(f"{key:<50} {'-':>12} {current:12.2f} {'new':>8}")
+            continue
+        change = (current - base) / abs(base) if base else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressed.append(key)
+        lines.append(f"{key:<50} {base:12.2f} {current:12.2f} {change:+8.1%}{flag}")
+    return lines, regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--full", action="store_true", help="also run 1e6-event macros")
+    parser.add_argument("--only", nargs="+", choices=SUITES, default=SUITES)
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative slowdown reported as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = run_suites(args.only, FULL_SIZES if args.full else QUICK_SIZES)
+    if args.save_baseline:
+        stored = {}
+        if args.baseline.exists():
+            stored = json.loads(args.baseline.read_text(encoding="utf-8"))
+        stored.update(results)
+        stored["_machine"] = f"{platform.platform()} / Python {platform.python_version()}"
+        args.baseline.write_text(json.dumps(stored, indent=2, sort_keys=True), encoding="utf-8")
+        print(f"Saved {len(results)} metrics to {args.baseline}")
+        return 0
+
+    baseline = {}
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        print(f"Baseline: {args.baseline} ({baseline.get('_machine', 'unknown machine')})")
+    lines, regressed = compare(results, baseline, args.threshold)
+    print("\n".join(lines))
+    if regressed:
+        print(f"\n{len(regressed)} metric(s) regressed by more than {args.threshold:.0%}")
+        return 1 if args.fail_on_regression else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,15 @@
+# benchmarks/stats.py
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of an unsorted sequence (p in 0..100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, int(round(p / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[k]
+
+
+def summarize(values):
+    """p50/p99/max of a sample, the shape every timing metric in the suite reports."""
+    return {"p50": percentile(values, 50), "p99": percentile(values, 99), "max": max(values) if values else 0.0}
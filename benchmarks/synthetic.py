@@ -0,0 +1,48 @@
+# benchmarks/synthetic.py
+# Deterministic synthetic macros for the benchmark suite.
+import random
+
+_KEYS = ["a", "b", "c", "enter", "space", "ctrl_l", "v", "shift"]
+
+
+def synthetic_events(n, interval=0.001, seed=0):
+    """n events spaced `interval` seconds apart: a mix of clicks, scrolls and key presses."""
+    rng = random.Random(seed)
+    events = []
+    t = 0.0
+    while len(events) < n:
+        kind = rng.random()
+        if kind < 0.4:
+            key = rng.choice(_KEYS)
+            events.append({"type": "key", "key": key, "pressed": True, "t": round(t, 4)})
+            t += interval
+            events.append({"type": "key", "key": key, "pressed": False, "t": round(t, 4)})
+        elif kind < 0.8:
+            x, y = rng.randrange(1920), rng.randrange(1080)
+            events.append({"type": "click", "x": x, "y": y, "button": "left", "pressed": True, "t": round(t, 4)})
+            t += interval
+            events.append({"type": "click", "x": x, "y": y, "button": "left", "pressed": False, "t": round(t, 4)})
+        else:
+            events.append({"type": "scroll", "x": rng.randrange(1920), "y": rng.randrange(1080),
+                           "dx": 0, "dy": rng.choice((-1, 1)), "t": round(t, 4)})
+        t += interval
+    return events[:n]
+
+
+def synthetic_input(n):
+    """A raw listener-callback stream for NullBackend.inject()."""
+    from pynput.keyboard import KeyCode
+    from pynput.mouse import Button
+    key = KeyCode.from_char("a")
+    stream = []
+    for i in range(n):
+        r = i % 4
+        if r == 0:
+            stream.append(("press", key))
+        elif r == 1:
+            stream.append(("release", key))
+        elif r == 2:
+            stream.append(("click", i % 1920, i % 1080, Button.left, True))
+        else:
+            stream.append(("scroll", i % 1920, i % 1080, 0, 1))
+    return stream
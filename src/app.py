@@ -4,12 +4,33 @@ from tkinter import ttk, messagebox, filedialog, simpledialog
 import threading
 import os
 
-from src.macro_store import save_macro, load_macro, list_macros, delete_macro
-from src.settings import load_settings, save_settings
-from src.recorder import Recorder
+from src.macro_store import (MACRO_SUFFIXES, MacroSaver, load_compiled, load_macro_cached, macro_cache,
+                             list_macro_info, macro_info, delete_macro)
+from src.settings import SettingsManager
+from src.recorder import Recorder, StreamingRecorder
 from src.player import Player
-
+from src.remote_player import RemotePlayer
+from src.tracks import MultiPlayer, Track
+from src.playlist import (PLAYLIST_SUFFIX, save_playlist, load_playlist, list_playlists, delete_playlist,
+                          missing_macros, estimate_duration, iter_playlist)
+from src.plan import compile_events
+from src.telemetry import Telemetry
+from src.timing import Timing, TIMING_MODES
+from src.progress import Progress, POLL_INTERVAL_MS, format_progress
+from src.optimizer import optimize, optimize_macro, format_stats
+from src.remap import Remap
+from src.watcher import FolderWatcher
+from src.library_view import LibraryView
+
+QUICK_RECORD_NAME = "Quick_Record"
+# Settings that change the effective duration shown for the selected macro
+DURATION_FIELDS = ("speed", "timing_mode", "max_gap_s", "long_gap_s", "long_gap_speed", "min_gap_ms", "cursor_settle_ms")
+PLAYLIST_PREFIX = "playlist:"  # library iids of playlists; macros use their bare name
+LIBRARY_COLUMNS = ("name", "events", "duration", "created")
+LIBRARY_HEADINGS = ("Name", "Events", "Duration", "Created")
+LIBRARY_WIDTHS = (150, 60, 70, 120)
 SPEED_OPTIONS = [0.5, 0.75, 1.0, 1.25, 1.5, 2.0]
+SETTLE_OPTIONS = [0, 2, 5, 10, 20, 50]  # ms; 0 = throughput mode
 HOTKEY_OPTIONS = ["<f5>", "<f6>", "<f7>", "<f8>", "<f9>", "<f10>"]
 
 
@@ -19,17 +40,35 @@ class App(tk.Tk):
         self.title("Macro Recorder")
         self.resizable(False, False)
 
-        self._settings = load_settings()
+        # Edits are applied in memory at once and written after a short quiet
+        # period; only subscribers to the fields that changed do any work
+        self._settings = SettingsManager()
+        macro_cache.budget = self._settings.get("cache_budget_mb", 256) * 1024 * 1024
         self._recorder = Recorder()
         self._player = Player()
+        self._remote_player = None  # kept between plays so the child process starts once
         self._recording = False
         self._playing = False
-        self._saving = False
+        self._saving = False  # a recording is being written by the saver
+        self._saver = MacroSaver()
         self._hotkey_listener = None
+        self._progress_job = None
+        self._watcher = None
+        self._duration_busy = False  # a duration preview is being computed
+        self._duration_pending = False  # and another was asked for meanwhile
+        self._in_flight = set()    # macros the app itself is writing; the watcher leaves them alone
+        self._play_context = None  # (name, start, end, repeat) of the single macro playing
+        self._pause_requested = False
+        self._play_skipped = []    # "name: error" for playlist steps that failed to load
+        self._paused = None        # (name, start, end, repeat, position) to resume from
 
         self._build_ui()
         self._refresh_library()
         self._register_hotkeys()
+        self._settings.subscribe(lambda diff: self._register_hotkeys(), fields=("record_hotkey", "play_hotkey"))
+        self._settings.subscribe(lambda diff: self._refresh_library(), fields=("macro_folder",))
+        self._settings.subscribe(lambda diff: self._restart_watcher(), fields=("library_poll_s",))
+        self._settings.subscribe(lambda diff: self._update_duration(), fields=DURATION_FIELDS)
         self.protocol("WM_DELETE_WINDOW", self._on_close)
 
     @staticmethod
@@ -55,9 +94,13 @@ class App(tk.Tk):
         btn_row.pack(fill="x", padx=4, pady=2)
         ttk.Button(btn_row, text="New", command=self._new_macro).pack(side="left")
         ttk.Button(btn_row, text="Delete", command=self._delete_macro).pack(side="left", padx=4)
+        ttk.Button(btn_row, text="Save Playlist", command=self._save_playlist).pack(side="left")
 
-        self._listbox = tk.Listbox(lib_frame, width=32, height=10, selectmode="single")
-        self._listbox.pack(fill="both", expand=True, padx=4, pady=4)
+        # Metadata columns come from the library index; no macro is loaded to
+        # fill, search or sort them, and only the visible rows are drawn
+        self._library = LibraryView(lib_frame, LIBRARY_COLUMNS, LIBRARY_HEADINGS, LIBRARY_WIDTHS, height=10)
+        self._library.pack(fill="both", expand=True, padx=4, pady=4)
+        self._library.bind("<<LibrarySelect>>", lambda e: self._update_duration())
 
         # ── Controls panel ──
         ctrl_frame = ttk.LabelFrame(self, text="Controls")
@@ -69,10 +112,13 @@ class App(tk.Tk):
         self._btn_record.pack(side="left", padx=4)
         self._btn_play = ttk.Button(btn_row2, text="▶ Play", command=self._toggle_play)
         self._btn_play.pack(side="left", padx=4)
+        ttk.Button(btn_row2, text="⏸ Pause", command=self._pause_playing).pack(side="left", padx=4)
         ttk.Button(btn_row2, text="■ Stop", command=self._stop_all).pack(side="left", padx=4)
 
         self._status_var = tk.StringVar(value="Idle")
         ttk.Label(ctrl_frame, textvariable=self._status_var).pack(pady=2)
+        self._duration_var = tk.StringVar(value="")
+        ttk.Label(ctrl_frame, textvariable=self._duration_var).pack(pady=2)
 
         # ── Settings panel ──
         cfg_frame = ttk.LabelFrame(self, text="Settings")
@@ -81,9 +127,12 @@ class App(tk.Tk):
         self._rec_hotkey_var = tk.StringVar(value=self._settings["record_hotkey"])
         self._play_hotkey_var = tk.StringVar(value=self._settings["play_hotkey"])
         self._speed_var = tk.DoubleVar(value=self._settings["speed"])
+        self._settle_var = tk.IntVar(value=self._settings.get("cursor_settle_ms", 10))
         self._repeat_var = tk.StringVar(value=str(self._settings.get("repeat_count", 1)))
         self._repeat_var.trace_add("write", self._on_settings_changed)
         self._folder_var = tk.StringVar(value=self._settings["macro_folder"])
+        self._moves_var = tk.BooleanVar(value=self._settings.get("record_moves", False))
+        self._timing_var = tk.StringVar(value=self._settings.get("timing_mode", "uniform"))
 
         rows = [
             ("Record hotkey:", self._rec_hotkey_var, HOTKEY_OPTIONS),
@@ -101,17 +150,44 @@ class App(tk.Tk):
         speed_cb.grid(row=2, column=1, sticky="w", padx=4)
         speed_cb.bind("<<ComboboxSelected>>", self._on_settings_changed)
 
-        ttk.Label(cfg_frame, text="Repeat:").grid(row=3, column=0, sticky="w", padx=4, pady=2)
+        ttk.Label(cfg_frame, text="Cursor settle (ms):").grid(row=3, column=0, sticky="w", padx=4, pady=2)
+        settle_cb = ttk.Combobox(cfg_frame, textvariable=self._settle_var,
+                                 values=SETTLE_OPTIONS, width=8, state="readonly")
+        settle_cb.grid(row=3, column=1, sticky="w", padx=4)
+        settle_cb.bind("<<ComboboxSelected>>", self._on_settings_changed)
+
+        ttk.Label(cfg_frame, text="Repeat:").grid(row=4, column=0, sticky="w", padx=4, pady=2)
         vcmd = (self.register(self._validate_int), '%P')
         repeat_entry = ttk.Entry(cfg_frame, textvariable=self._repeat_var, width=10, validate="key", validatecommand=vcmd)
-        repeat_entry.grid(row=3, column=1, sticky="w", padx=4)
+        repeat_entry.grid(row=4, column=1, sticky="w", padx=4)
 
-        ttk.Label(cfg_frame, text="Macro folder:").grid(row=4, column=0, sticky="w", padx=4, pady=2)
+        ttk.Label(cfg_frame, text="Macro folder:").grid(row=5, column=0, sticky="w", padx=4, pady=2)
         folder_row = tk.Frame(cfg_frame)
-        folder_row.grid(row=4, column=1, sticky="w", padx=4)
+        folder_row.grid(row=5, column=1, sticky="w", padx=4)
         ttk.Label(folder_row, textvariable=self._folder_var, width=22, anchor="w").pack(side="left")
         ttk.Button(folder_row, text="...", width=3, command=self._choose_folder).pack(side="left")
 
+        ttk.Checkbutton(cfg_frame, text="Record mouse movement", variable=self._moves_var,
+                        command=self._on_settings_changed).grid(row=6, column=0, columnspan=2, sticky="w", padx=4, pady=2)
+
+        # Gap thresholds for the non-uniform modes live in settings.json
+        ttk.Label(cfg_frame, text="Timing:").grid(row=7, column=0, sticky="w", padx=4, pady=2)
+        timing_cb = ttk.Combobox(cfg_frame, textvariable=self._timing_var,
+                                 values=TIMING_MODES, width=8, state="readonly")
+        timing_cb.grid(row=7, column=1, sticky="w", padx=4)
+        timing_cb.bind("<<ComboboxSelected>>", self._on_settings_changed)
+
+        # Seconds into the recording; empty means from the start / to the end.
+        # Repeats loop the range. Not saved: a range belongs to one macro.
+        ttk.Label(cfg_frame, text="Range (s):").grid(row=8, column=0, sticky="w", padx=4, pady=2)
+        range_row = tk.Frame(cfg_frame)
+        range_row.grid(row=8, column=1, sticky="w", padx=4)
+        self._range_start_var = tk.StringVar()
+        self._range_end_var = tk.StringVar()
+        ttk.Entry(range_row, textvariable=self._range_start_var, width=6).pack(side="left")
+        ttk.Label(range_row, text="to").pack(side="left", padx=2)
+        ttk.Entry(range_row, textvariable=self._range_end_var, width=6).pack(side="left")
+
     def _validate_int(self, P):
         if P == "" or P.isdigit():
             return True
@@ -120,13 +196,133 @@ class App(tk.Tk):
     # ── Library actions ─────────────────────────────────────────────────────
 
     def _refresh_library(self):
-        self._listbox.delete(0, "end")
-        for name in list_macros(folder=self._settings["macro_folder"]):
-            self._listbox.insert("end", name)
+        """Rebuild the whole library and watch the (possibly new) folder for outside changes."""
+        folder = self._settings["macro_folder"]
+        rows = {}
+        durations = {}
+        for info in list_macro_info(folder=folder):
+            if info["valid"]:
+                durations[info["name"]] = info["duration"]
+                rows[info["name"]] = self._library_row(info)
+        for name in list_playlists(folder=folder):
+            row = self._playlist_row(name, folder, durations)
+            if row is not None:
+                rows[PLAYLIST_PREFIX + name] = row
+        self._library.clear()
+        self._library.update_rows(rows)
+        self._watch_folder(folder)
+
+    def _watch_folder(self, folder):
+        if self._watcher is not None:
+            if self._watcher.folder == folder:
+                return
+            self._watcher.stop()
+            self._watcher = None
+        interval = self._settings.get("library_poll_s", 1.0)
+        if interval > 0:
+            # settings.json shares the default macro folder; its writes are not macro changes
+            settings_path = self._settings.path
+            ignore = (settings_path.name,) if os.path.abspath(settings_path.parent) == os.path.abspath(folder) else ()
+            self._watcher = FolderWatcher(folder, MACRO_SUFFIXES + (PLAYLIST_SUFFIX,),
+                                          lambda *sets: self._on_folder_changed(folder, *sets), interval=interval,
+                                          ignore=ignore)
+            self._watcher.start()
+
+    def _restart_watcher(self):
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+        self._watch_folder(self._settings["macro_folder"])
+
+    def _on_folder_changed(self, folder, added, removed, changed):
+        # Watcher thread: describe only the files that changed (through the
+        # index, so nothing else is reparsed), then patch rows on the Tk thread
+        rows = {}
+        playlists = []
+        in_flight = set(self._in_flight)
+        for filename in added | removed | changed:
+            name, suffix = os.path.splitext(filename)
+            if suffix == PLAYLIST_SUFFIX:
+                playlists.append(name)
+                continue
+            if name in in_flight:
+                continue  # being recorded or saved; the app updates its row when done
+            # A removed .json may leave the same macro in another format
+            info = macro_info(name, folder=folder)
+            rows[name] = self._library_row(info) if info is not None and info["valid"] else None
+        for name in playlists:
+            rows[PLAYLIST_PREFIX + name] = self._playlist_row(name, folder)
+        if not rows:
+            return
+        try:
+            self.after(0, self._apply_library_changes, folder, rows)
+        except (RuntimeError, tk.TclError):
+            pass  # window closed
+
+    def _apply_library_changes(self, folder, rows):
+        """Insert, update or delete just the given rows ({iid: row, or None to remove})."""
+        if folder != self._settings["macro_folder"]:
+            return  # changes from a folder we no longer show
+        selected = set(self._library.selection())
+        self._library.update_rows(rows)
+        if not selected.isdisjoint(rows):
+            self._update_duration()
+
+    def _update_library_row(self, info):
+        self._library.update_rows({info["name"]: self._library_row(info)})
+
+    # A library row is (display values, sort keys, group); playlists are
+    # group 1 so they stay below the macros whichever column is sorted
+
+    @staticmethod
+    def _library_row(info):
+        created = info["created"][:16].replace("T", " ")
+        values = (info["name"], info["events"], f"{info['duration']:.1f}s", created)
+        return values, (info["name"].lower(), info["events"], info["duration"], created), 0
+
+    @staticmethod
+    def _playlist_row(name, folder, durations=None):
+        try:
+            playlist = load_playlist(name, folder=folder)
+        except (OSError, ValueError):
+            return None
+        estimate = estimate_duration(playlist, folder=folder, durations=durations)
+        steps = len(playlist["entries"])
+        created = playlist.get("created", "")[:16].replace("T", " ")
+        values = (f"▸ {name}", f"{steps} steps", f"~{estimate:.1f}s", created)
+        return values, (name.lower(), steps, estimate, created), 1
 
     def _selected_macro(self):
-        sel = self._listbox.curselection()
-        return self._listbox.get(sel[0]) if sel else None
+        sel = self._library.selection()
+        return sel[0] if sel else None
+
+    def _selected_macros(self):
+        return [iid for iid in self._library.selection() if not iid.startswith(PLAYLIST_PREFIX)]
+
+    def _selected_playlist(self):
+        name = self._selected_macro()
+        if name and name.startswith(PLAYLIST_PREFIX):
+            return name[len(PLAYLIST_PREFIX):]
+        return None
+
+    def _save_playlist(self):
+        """Save the selected macros, in library order, as a playlist."""
+        names = self._selected_macros()
+        if not names:
+            messagebox.showinfo("No macro selected", "Select the macros to chain first.")
+            return
+        name = simpledialog.askstring("Save Playlist", "Playlist name:", parent=self)
+        if not name:
+            return
+        # Per-step repeat, speed and delay can be edited in the .playlist file
+        folder = self._settings["macro_folder"]
+        try:
+            save_playlist(name, names, folder=folder)
+        except (ValueError, OSError) as e:
+            messagebox.showerror("Save Playlist", str(e))
+            return
+        self._apply_library_changes(folder, {PLAYLIST_PREFIX + name: self._playlist_row(name, folder)})
+        self._select_macro(PLAYLIST_PREFIX + name)
 
     def _new_macro(self):
         """Placeholder — recording creates macros via the Record button."""
@@ -136,15 +332,21 @@ class App(tk.Tk):
         name = self._selected_macro()
         if not name:
             return
+        playlist = self._selected_playlist()
+        if playlist is not None:
+            if messagebox.askyesno("Delete", f"Delete playlist '{playlist}'?"):
+                delete_playlist(playlist, folder=self._settings["macro_folder"])
+                self._library.delete(name)
+            return
         if messagebox.askyesno("Delete", f"Delete macro '{name}'?"):
             delete_macro(name, folder=self._settings["macro_folder"])
-            self._refresh_library()
+            self._library.delete(name)
 
     # ── Record / Play / Stop ────────────────────────────────────────────────
 
     def _toggle_record(self):
         if self._saving:
-            return  # dialog is open, ignore hotkey
+            return  # previous recording is still being saved
         if self._recording:
             self._stop_recording()
         else:
@@ -159,33 +361,159 @@ class App(tk.Tk):
         rec_key_obj = self._parse_hotkey_to_key(self._settings["record_hotkey"])
         play_key_obj = self._parse_hotkey_to_key(self._settings["play_hotkey"])
         filter_keys = [k for k in [rec_key_obj, play_key_obj] if k is not None]
-        self._recorder = Recorder(filter_keys=filter_keys)
-        self._recorder.start()
+        options = dict(filter_keys=filter_keys,
+                       record_moves=self._settings.get("record_moves", False),
+                       move_tolerance=self._settings.get("move_tolerance_px", 2.0))
+        try:
+            if self._settings.get("stream_recording", False):
+                # Events go straight to disk as they are recorded
+                self._in_flight.add(QUICK_RECORD_NAME)
+                self._recorder = StreamingRecorder(QUICK_RECORD_NAME, folder=self._settings["macro_folder"], **options)
+            else:
+                self._recorder = Recorder(**options)
+            self._recorder.start()
+        except OSError as e:
+            self._in_flight.discard(QUICK_RECORD_NAME)
+            self._recording = False
+            self._btn_record.config(text="● Record")
+            self._set_status(f"Record Error: {e}")
 
     def _stop_recording(self):
-        events = self._recorder.stop()
+        result = self._recorder.stop()
         self._recording = False
         self._btn_record.config(text="● Record")
         self._set_status("Idle")
+        options = self._optimizer_options()
+        name = QUICK_RECORD_NAME
+        folder = self._settings["macro_folder"]
+        notes = []
+
+        def on_done(info, error):
+            try:
+                self.after(0, self._on_saved, name, info, error, "".join(notes))
+            except (RuntimeError, tk.TclError):
+                pass  # window closed; the file is still written
+
+        if isinstance(self._recorder, StreamingRecorder):
+            if result is None:
+                self._in_flight.discard(name)
+                return
+
+            # Already on disk; optimizing and re-indexing a long recording
+            # happens on the saver's worker too
+            def optimize_file():
+                if options is None:
+                    return
+                try:
+                    notes.append(f" — optimizer {format_stats(optimize_macro(name, folder=folder, **options))}")
+                except (OSError, ValueError) as e:
+                    notes.append(f" — optimize error: {e}")
+
+            self._saving = True
+            self._set_status(f"Saving {name}...")
+            try:
+                self._saver.submit(name, optimize_file, folder=folder, on_done=on_done)
+            except RuntimeError as e:
+                self._saving = False
+                self._in_flight.discard(name)
+                self._set_status(f"Save Error: {e}")
+            return
+        events = result
         if not events:
             return
-        
+        if options is not None:
+            events, stats = optimize(events, **options)
+            notes.append(f" — optimizer {format_stats(stats)}")
+
+        # Serializing and writing a long recording happens on the saver's
+        # worker; record/play stay disabled until it lands
+        self._saving = True
+        self._in_flight.add(name)
+        self._set_status(f"Saving {name} ({len(events)} events)...")
         try:
-            name = "Quick_Record"
-            folder = self._settings["macro_folder"]
-            save_macro(name, events, folder=folder)
-            self._refresh_library()
-            # Select the newly saved macro
-            for i in range(self._listbox.size()):
-                if self._listbox.get(i) == name:
-                    self._listbox.selection_clear(0, "end")
-                    self._listbox.selection_set(i)
-                    self._listbox.activate(i)
-                    self._listbox.see(i)
-                    break
-        except Exception as e:
+            self._saver.save(name, events, folder=folder,
+                             fmt=self._settings.get("macro_format", "json"), on_done=on_done,
+                             codec=self._settings.get("compression_codec", "zlib"),
+                             resolution=self._settings.get("timestamp_resolution_ms", 0.1) / 1000)
+        except RuntimeError as e:
+            self._saving = False
+            self._in_flight.discard(name)
             self._set_status(f"Save Error: {e}")
 
+    def _on_saved(self, name, info, error, note=""):
+        self._saving = False
+        self._in_flight.discard(name)
+        if error is not None:
+            self._set_status(f"Save Error: {error}")
+            return
+        self._set_status(f"Saved {name}{note}")
+        # One targeted row update instead of rescanning the whole library
+        if info is not None and info["valid"]:
+            self._update_library_row(info)
+        self._select_macro(name)
+
+    def _optimizer_options(self):
+        # None when recordings are saved exactly as captured
+        if not self._settings.get("optimize_recordings", True):
+            return None
+        return dict(collapse_repeats=self._settings.get("collapse_key_repeat", False))
+
+    def _update_duration(self):
+        """Show the selected macro's recorded and effective playback duration.
+
+        Loading and scheduling a big macro takes a while, so it runs on a
+        worker thread. Requests made while one is running are coalesced
+        into a single rerun with the latest selection and settings.
+        """
+        self._duration_pending = True
+        if not self._duration_busy:
+            self._compute_duration()
+
+    def _compute_duration(self):
+        self._duration_pending = False
+        name = self._selected_macro()
+        if not name:
+            self._duration_var.set("")
+            return
+        playlist = self._selected_playlist()
+        folder = self._settings["macro_folder"]
+        speed = self._settings.get("speed", 1.0)
+        settle = self._settings.get("cursor_settle_ms", 10) / 1000
+        try:
+            timing = Timing.from_settings(self._settings)
+        except ValueError as e:
+            self._duration_var.set(str(e))
+            return
+
+        def work():
+            try:
+                if playlist is not None:
+                    estimate = estimate_duration(load_playlist(playlist, folder=folder), folder=folder)
+                    text = f"Duration: ~{estimate / speed:.1f}s at uniform timing"
+                else:
+                    plan = load_macro_cached(name, folder=folder, transform=compile_events)
+                    effective = timing.duration(plan, speed, settle)
+                    text = f"Duration: {plan.duration:.1f}s recorded, {effective:.1f}s at {timing.mode} timing"
+            except (FileNotFoundError, ValueError) as e:
+                text = str(e)
+            try:
+                self.after(0, self._show_duration, text)
+            except (RuntimeError, tk.TclError):
+                pass  # window closed
+
+        self._duration_busy = True
+        threading.Thread(target=work, daemon=True).start()
+
+    def _show_duration(self, text):
+        self._duration_busy = False
+        if self._duration_pending:
+            self._compute_duration()  # the selection or settings changed meanwhile
+        else:
+            self._duration_var.set(text)
+
+    def _select_macro(self, name):
+        self._library.select(name)
+
     def _toggle_play(self):
         if self._saving:
             return
@@ -200,12 +528,25 @@ class App(tk.Tk):
             if self._recording or self._saving:
                 return  # Still saving or cancelled
 
-        name = self._selected_macro()
-        if not name:
+        playlist_name = self._selected_playlist()
+        names = self._selected_macros()
+        if not names and playlist_name is None:
             messagebox.showinfo("No macro selected", "Select a macro from the library first.")
             return
+        folder = self._settings["macro_folder"]
+        playlist, plans = None, []
         try:
-            events = load_macro(name, folder=self._settings["macro_folder"])
+            remap = Remap.from_settings(self._settings)
+            if playlist_name is not None:
+                # Playlist steps are loaded one ahead while playing, not here
+                playlist = load_playlist(playlist_name, folder=folder)
+                missing = missing_macros(playlist, folder=folder)
+                if missing:
+                    raise FileNotFoundError(f"Playlist refers to missing macros: {', '.join(missing)}")
+            else:
+                # Compiled (and remapped) plans are cached per display profile
+                # until the file changes, and every repeat reuses the same plan
+                plans = [load_macro_cached(name, folder=folder, transform=remap or compile_events) for name in names]
         except (FileNotFoundError, ValueError) as e:
             messagebox.showerror("Load Error", str(e))
             self._refresh_library()
@@ -219,38 +560,128 @@ class App(tk.Tk):
         if repeat_count < 1:
             repeat_count = 1
 
+        try:
+            start = float(self._range_start_var.get() or 0)
+            end = float(self._range_end_var.get()) if self._range_end_var.get().strip() else None
+        except ValueError:
+            messagebox.showerror("Range", "Range start and end must be numbers of seconds.")
+            return
+        if (start > 0 or end is not None) and len(plans) != 1:
+            messagebox.showinfo("Range", "A range applies to a single macro; clear it to play playlists or tracks.")
+            return
+
         self._playing = True
         self._btn_play.config(text="■ Stop Play")
-        self._set_status(f"Playing: {name} (1/{repeat_count})")
         speed = self._speed_var.get()
-        self._player = Player()
+        timing = Timing.from_settings(self._settings)
+        telemetry = Telemetry() if self._settings.get("telemetry", False) else None
+        options = dict(precise=self._settings.get("precise_timing", True),
+                       settle=self._settings.get("cursor_settle_ms", 10) / 1000,
+                       telemetry=telemetry)
+
+        if playlist is not None:
+            self._player = Player(**options)
+            progress = Progress(len(playlist["entries"]))
+            self._poll_progress(f"playlist {playlist_name}", progress)
+            load = (lambda name: load_compiled(name, remap, folder=folder)) if remap is not None else None
+            # A macro that fails to load is skipped and reported when the playlist ends
+            skipped = self._play_skipped = []
+            steps = iter_playlist(playlist, folder=folder, load=load,
+                                  on_error=lambda name, e: skipped.append(f"{name}: {e}"))
+            play = lambda: self._player.play_steps(steps, speed=speed, timing=timing, on_step=progress.update)
+        elif len(plans) == 1:
+            if self._settings.get("out_of_process_playback", False):
+                self._player = self._get_remote_player(**options)
+            else:
+                self._player = Player(**options)
+            # The playing thread only bumps a counter; the Tk loop polls it at
+            # a fixed rate, so huge repeat counts cannot flood the event queue
+            progress = Progress(repeat_count)
+            self._poll_progress(names[0], progress)
+            context = (names[0], start, end, repeat_count)
+            # Play after a pause continues the same macro, range and repeats
+            resume = self._paused[-1] if self._paused is not None and self._paused[:-1] == context else None
+            self._play_context = context
+            # One play() call keeps all repeats on a single drift-free timeline
+            play = lambda: self._player.play(plans[0], speed=speed, repeat=repeat_count,
+                                             on_iteration=progress.update, timing=timing,
+                                             start=start, end=end, resume=resume)
+        else:
+            # Several selected macros play together as overlaid tracks
+            self._player = MultiPlayer(**options)
+            tracks = [Track(plan, name=name, repeat=repeat_count, timing=timing) for name, plan in zip(names, plans)]
+            self._set_status(f"Playing {len(tracks)} tracks: {' + '.join(names)}")
+            play = lambda: self._player.play(tracks, speed=speed)
 
         def run():
-            for i in range(repeat_count):
-                if not self._playing or self._player._stop_event.is_set():
-                    break
+            error = None
+            try:
+                play()
+            except Exception as e:  # a macro failed to load or the playback process failed
+                error = e
+            finally:
                 try:
-                    self.after(0, lambda current=i+1: self._set_status(f"Playing: {name} ({current}/{repeat_count})"))
+                    self.after(0, self._on_play_finished, error)
                 except RuntimeError:
-                    pass
-                self._player.play(events, speed=speed)
-                
-            try:
-                self.after(0, self._on_play_finished)
-            except RuntimeError:
-                pass  # window was destroyed before playback finished
+                    pass  # window was destroyed before playback finished
 
         threading.Thread(target=run, daemon=True).start()
 
+    def _get_remote_player(self, precise, settle, telemetry):
+        """The out-of-process player, restarted only if its timing options changed."""
+        remote = self._remote_player
+        if remote is None or (remote.precise, remote.settle) != (precise, settle):
+            if remote is not None:
+                remote.close()
+            remote = self._remote_player = RemotePlayer(precise=precise, settle=settle)
+        remote.telemetry = telemetry
+        return remote
+
     def _stop_playing(self):
+        self._paused = None
         self._player.stop()
 
-    def _on_play_finished(self):
+    def _pause_playing(self):
+        """Stop a single-macro play but keep its position, so Play resumes it."""
+        if self._playing and self._play_context is not None:
+            self._pause_requested = True
+            self._player.stop()
+
+    def _poll_progress(self, name, progress):
+        self._set_status(f"Playing: {name} ({format_progress(progress.snapshot())})")
+        self._progress_job = self.after(POLL_INTERVAL_MS, self._poll_progress, name, progress)
+
+    def _on_play_finished(self, error=None):
         self._playing = False
+        if self._progress_job is not None:
+            self.after_cancel(self._progress_job)
+            self._progress_job = None
         self._btn_play.config(text="▶ Play")
-        self._set_status("Idle")
+        context, self._play_context = self._play_context, None
+        paused, self._pause_requested = self._pause_requested, False
+        self._paused = None
+        skipped, self._play_skipped = self._play_skipped, []
+        if error is not None:
+            self._set_status("Idle — playback failed")
+            messagebox.showerror("Play", f"Playback failed: {error}")
+            return
+        if skipped:
+            messagebox.showwarning("Playlist", "Skipped macros that failed to load:\n" + "\n".join(skipped))
+        position = getattr(self._player, "position", None)
+        if paused and context is not None and position is not None:
+            self._paused = context + (position,)
+            self._set_status(f"Paused: {context[0]} pass {position[0] + 1}/{context[3]} — Play resumes")
+            return
+        telemetry = self._player.telemetry
+        if telemetry is not None and telemetry.recorded:
+            late = telemetry.lateness.summary()
+            self._set_status(f"Idle — lateness p50 {late['p50_us']}us, p99 {late['p99_us']}us, "
+                             f"max {late['max_us']}us ({telemetry.failed} failed)")
+        else:
+            self._set_status("Idle")
 
     def _stop_all(self):
+        self._paused = None
         if self._recording:
             self._stop_recording()
         if self._playing:
@@ -287,24 +718,26 @@ class App(tk.Tk):
     # ── Settings ─────────────────────────────────────────────────────────────
 
     def _on_settings_changed(self, *args):
-        self._settings["record_hotkey"] = self._rec_hotkey_var.get()
-        self._settings["play_hotkey"] = self._play_hotkey_var.get()
-        self._settings["speed"] = self._speed_var.get()
         try:
-            val = int(self._repeat_var.get() or "1")
-            self._settings["repeat_count"] = max(1, val)
+            repeat_count = max(1, int(self._repeat_var.get() or "1"))
         except ValueError:
-            self._settings["repeat_count"] = 1
-        save_settings(self._settings)
-        self._register_hotkeys()
+            repeat_count = 1
+        # Subscribers react to the fields that actually changed
+        self._settings.update(
+            record_hotkey=self._rec_hotkey_var.get(),
+            play_hotkey=self._play_hotkey_var.get(),
+            speed=self._speed_var.get(),
+            cursor_settle_ms=self._settle_var.get(),
+            record_moves=self._moves_var.get(),
+            timing_mode=self._timing_var.get(),
+            repeat_count=repeat_count,
+        )
 
     def _choose_folder(self):
         folder = filedialog.askdirectory(title="Choose macro folder")
         if folder:
-            self._settings["macro_folder"] = folder
             self._folder_var.set(folder)
-            save_settings(self._settings)
-            self._refresh_library()
+            self._settings.update(macro_folder=folder)
 
     # ── Misc ─────────────────────────────────────────────────────────────────
 
@@ -314,10 +747,20 @@ class App(tk.Tk):
     def _on_close(self):
         # Stop recording without prompting — discard in-progress recording
         if self._recording:
-            self._recorder.stop()  # discard events
+            if isinstance(self._recorder, StreamingRecorder):
+                self._recorder.stop(keep=False)  # the previous Quick_Record stays
+            else:
+                self._recorder.stop()  # discard events
             self._recording = False
         if self._playing:
             self._stop_playing()
         if self._hotkey_listener:
             self._hotkey_listener.stop()
+        if self._watcher is not None:
+            self._watcher.stop()
+        if self._remote_player is not None:
+            self._remote_player.close()
+        self._settings.flush()
+        # A save still in progress finishes before the process exits
+        self._saver.shutdown(wait=False)
         self.destroy()
@@ -0,0 +1,132 @@
+# src/backends.py
+import time
+from time import perf_counter_ns
+
+# An input backend is what Player dispatches to and what Recorder listens
+# through. Both classes here implement the same small interface:
+#   move(pos), press_button(b), release_button(b), scroll(dx, dy),
+#   press_key(k), release_key(k)
+#   listen(on_move=, on_click=, on_scroll=, on_press=, on_release=) -> handle
+# where the handle has stop(). Callback signatures match pynput's listeners.
+
+
+class PynputBackend:
+    """Real input through pynput controllers and listeners (the default)."""
+
+    def __init__(self):
+        # Imported here so headless code paths never load pynput
+        from pynput import mouse, keyboard
+        self._mouse_mod = mouse
+        self._keyboard_mod = keyboard
+        self._mouse = mouse.Controller()
+        self._keyboard = keyboard.Controller()
+
+    def move(self, pos):
+        self._mouse.position = pos
+
+    def press_button(self, button):
+        self._mouse.press(button)
+
+    def release_button(self, button):
+        self._mouse.release(button)
+
+    def scroll(self, dx, dy):
+        self._mouse.scroll(dx, dy)
+
+    def press_key(self, key):
+        self._keyboard.press(key)
+
+    def release_key(self, key):
+        self._keyboard.release(key)
+
+    def listen(self, on_move=None, on_click=None, on_scroll=None, on_press=None, on_release=None):
+        mouse_listener = self._mouse_mod.Listener(on_move=on_move, on_click=on_click, on_scroll=on_scroll)
+        keyboard_listener = self._keyboard_mod.Listener(on_press=on_press, on_release=on_release)
+        mouse_listener.start()
+        keyboard_listener.start()
+        return _ListenerGroup(mouse_listener, keyboard_listener)
+
+
+class _ListenerGroup:
+    def __init__(self, *listeners):
+        self._listeners = listeners
+
+    def stop(self):
+        for listener in self._listeners:
+            listener.stop()
+
+
+class NullBackend:
+    """In-memory backend for headless tests and benchmarks.
+
+    Every dispatched action is appended to `log` as a tuple
+    (perf_counter_ns, action, *args), so timing accuracy and throughput can
+    be measured without a display. inject() feeds a synthetic input stream
+    to whatever listen() registered, optionally paced at a fixed rate.
+    """
+
+    _CALLBACKS = {
+        "move": "on_move",
+        "click": "on_click",
+        "scroll": "on_scroll",
+        "press": "on_press",
+        "release": "on_release",
+    }
+
+    def __init__(self):
+        self.log = []
+        self._callbacks = {}
+
+    def move(self, pos):
+        self.log.append((perf_counter_ns(), "move", pos))
+
+    def press_button(self, button):
+        self.log.append((perf_counter_ns(), "press_button", button))
+
+    def release_button(self, button):
+        self.log.append((perf_counter_ns(), "release_button", button))
+
+    def scroll(self, dx, dy):
+        self.log.append((perf_counter_ns(), "scroll", dx, dy))
+
+    def press_key(self, key):
+        self.log.append((perf_counter_ns(), "press_key", key))
+
+    def release_key(self, key):
+        self.log.append((perf_counter_ns(), "release_key", key))
+
+    def listen(self, on_move=None, on_click=None, on_scroll=None, on_press=None, on_release=None):
+        self._callbacks = {
+            "on_move": on_move, "on_click": on_click, "on_scroll": on_scroll,
+            "on_press": on_press, "on_release": on_release,
+        }
+        return self
+
+    def stop(self):
+        self._callbacks = {}
+
+    def inject(self, stream, rate=None):
+        """Deliver synthetic input to the registered callbacks.
+
+        stream yields tuples like ("click", x, y, button, pressed),
+        ("scroll", x, y, dx, dy), ("move", x, y), ("press", key) or
+        ("release", key). rate is events per second on an absolute
+        timeline; None delivers as fast as possible. Returns the number of
+        events delivered; kinds nobody listens to are dropped.
+        """
+        interval_ns = int(1e9 / rate) if rate else 0
+        start = perf_counter_ns()
+        delivered = 0
+        for i, (kind, *args) in enumerate(stream):
+            if interval_ns:
+                due = start + i * interval_ns
+                remaining = due - perf_counter_ns()
+                if remaining > 2_000_000:
+                    time.sleep((remaining - 1_000_000) / 1e9)
+                while perf_counter_ns() < due:
+                    pass
+            callback = self._callbacks.get(self._CALLBACKS[kind])
+            if callback is not None:
+                callback(*args)
+                delivered += 1
+        return delivered
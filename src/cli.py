@@ -0,0 +1,369 @@
+# src/cli.py
+# Headless entry point: python -m src <command> ...
+#
+# Only stdlib, settings and macro_store are imported up front. pynput (via
+# the player/recorder modules) is imported inside the commands that need
+# it and tkinter never is, so list/convert/stats start fast on machines
+# without a display. tests/test_cli.py holds the import-time budget.
+import argparse
+import os
+import sys
+import time
+
+from src.macro_binary import CODECS
+from src.macro_store import FORMATS, check_name, list_macro_info, load_compiled, convert_macro, save_macro
+from src.settings import load_settings
+from src.timing import Timing, TIMING_MODES
+
+IMPORT_BUDGET_MS = 150  # `import src.cli` in a fresh interpreter
+
+
+def _cmd_list(args):
+    infos = list_macro_info(folder=args.folder)
+    for info in infos:
+        if not info["valid"]:
+            continue
+        if args.long:
+            print(f"{info['name']:<32} {info['events']:>9} events {info['duration']:>10.1f}s  {info['created']}")
+        else:
+            print(info["name"])
+    return 0
+
+
+def _cmd_stats(args):
+    infos = [i for i in list_macro_info(folder=args.folder) if not args.names or i["name"] in args.names]
+    missing = set(args.names) - {i["name"] for i in infos}
+    for name in sorted(missing):
+        print(f"{name}: not found", file=sys.stderr)
+    for info in infos:
+        if not info["valid"]:
+            print(f"{info['name']}: corrupt ({info.get('error', 'unreadable')})")
+            continue
+        types = ", ".join(f"{k}={v}" for k, v in sorted(info["types"].items()))
+        print(f"{info['name']}: {info['events']} events, {info['duration']:.3f}s, "
+              f"{info['size']} bytes, created {info['created']} [{types}]")
+    return 1 if missing else 0
+
+
+def _cmd_convert(args):
+    for name in args.names:
+        path = convert_macro(name, args.to, folder=args.folder, **_storage_options(args))
+        print(f"{name} -> {path.name}")
+    return 0
+
+
+def _storage_options(args):
+    return {"codec": args.codec, "resolution": args.resolution_ms / 1000}
+
+
+def _cmd_optimize(args, settings):
+    from src.optimizer import optimize_macro, format_stats
+
+    for name in args.names:
+        stats = optimize_macro(name, folder=args.folder, dry_run=args.dry_run,
+                               collapse_repeats=args.collapse_repeats)
+        print(f"{name}: {format_stats(stats)}" + (" (dry run)" if args.dry_run else ""))
+    return 0
+
+
+def _cmd_play(args, settings):
+    if args.speed <= 0:
+        raise ValueError("--speed must be positive")
+    if args.dry_run:
+        # The null backend never touches real input; let pynput load without a display
+        os.environ.setdefault("PYNPUT_BACKEND", "dummy")
+    from src.plan import compile_events
+    from src.player import Player
+
+    backend = None
+    if args.dry_run:
+        from src.backends import NullBackend
+        backend = NullBackend()
+    timing = Timing(mode=args.timing, max_gap=args.max_gap, long_gap=args.long_gap,
+                    long_speed=args.long_speed, min_gap=args.min_gap / 1000)
+    settle = settings.get("cursor_settle_ms", 10) / 1000
+    telemetry = None
+    if args.report is not None:
+        from src.telemetry import Telemetry
+        telemetry = Telemetry()
+    options = dict(precise=settings.get("precise_timing", True), settle=settle, backend=backend, telemetry=telemetry)
+
+    from src.remap import Remap
+
+    if bool(args.remap_from) != bool(args.remap_to):
+        raise ValueError("--remap-from and --remap-to go together")
+    if args.remap_from:
+        remap = Remap.from_displays([_parse_geometry(g) for g in args.remap_from],
+                                    [_parse_geometry(g) for g in args.remap_to])
+        remap = None if remap.is_identity else remap
+    else:
+        remap = Remap.from_settings(settings)
+    compile_plan = remap if remap is not None else compile_events
+
+    seeking = args.start > 0 or args.end is not None or args.resume is not None
+    if seeking and (args.playlist or len(args.names) != 1):
+        raise ValueError("--start, --end and --resume need exactly one macro")
+
+    if args.playlist:
+        from src.playlist import load_playlist, missing_macros, estimate_duration, iter_playlist
+
+        if len(args.names) != 1:
+            raise ValueError("--playlist takes exactly one playlist name")
+        playlist = load_playlist(args.names[0], folder=args.folder)
+        missing = missing_macros(playlist, folder=args.folder)
+        if missing:
+            raise FileNotFoundError(f"Playlist '{args.names[0]}' refers to missing macros: {', '.join(missing)}")
+        entries = playlist["entries"]
+        print(f"{args.names[0]}: {len(entries)} steps, ~{estimate_duration(playlist, args.folder) / args.speed:.3f}s "
+              f"at uniform timing", file=sys.stderr)
+        player = Player(**options)
+        # Macros are loaded one step ahead of playback, never all at once
+        load = (lambda name: load_compiled(name, remap, folder=args.folder)) if remap is not None else None
+        skip = lambda name, e: print(f"  skipping {name}: {e}", file=sys.stderr)
+        play = lambda: player.play_steps(
+            iter_playlist(playlist, folder=args.folder, load=load, on_error=skip), speed=args.speed, timing=timing,
+            on_step=lambda k: print(f"  step {k + 1}/{len(entries)}: {entries[k]['macro']}", file=sys.stderr))
+        summary = f"playlist {args.names[0]} ({len(entries)} steps)"
+    else:
+        if len(args.offset) > len(args.names):
+            raise ValueError("more --offset values than macros")
+        plans = [load_compiled(name, compile_plan, folder=args.folder) for name in args.names]
+        for name, plan in zip(args.names, plans):
+            print(f"{name}: {plan.duration:.3f}s recorded, "
+                  f"{timing.duration(plan, args.speed, settle):.3f}s per pass at {timing.mode} timing", file=sys.stderr)
+        if len(plans) == 1:
+            if args.process:
+                # Dispatch from a child process
+                from src.remote_player import RemotePlayer
+                player = RemotePlayer(precise=options["precise"], settle=settle, telemetry=telemetry,
+                                      backend="null" if args.dry_run else "pynput")
+                player.start()  # spawning is not playback time
+                backend = None  # the child has its own null backend; see player.actions
+            else:
+                player = Player(**options)
+            resume = _parse_position(args.resume) if args.resume is not None else None
+            play = lambda: player.play(plans[0], speed=args.speed, repeat=args.repeat, timing=timing,
+                                       start=args.start, end=args.end, resume=resume)
+        else:
+            # Several macros overlay each other as tracks of one mix
+            from src.tracks import MultiPlayer, Track
+            offsets = args.offset + [0.0] * (len(plans) - len(args.offset))
+            tracks = [Track(plan, name=name, offset=offset, repeat=args.repeat, timing=timing)
+                      for name, plan, offset in zip(args.names, plans, offsets)]
+            player = MultiPlayer(**options)
+            play = lambda: player.play(tracks, speed=args.speed)
+        summary = f"{' + '.join(args.names)} x{args.repeat} ({sum(len(p) for p in plans)} events)"
+
+    start = time.perf_counter()
+    try:
+        play()
+    except KeyboardInterrupt:
+        player.stop()
+        position = getattr(player, "position", None)
+        if position is not None and not args.playlist and len(plans) == 1:
+            iteration, row = position
+            at = plans[0].offsets[row] if row < len(plans[0]) else plans[0].duration
+            print(f"Stopped at {at:.3f}s in pass {iteration + 1}/{args.repeat}; "
+                  f"continue with --resume {iteration}:{row}", file=sys.stderr)
+        else:
+            print("Stopped.", file=sys.stderr)
+        _report(telemetry, args.report)
+        return 130
+    finally:
+        if hasattr(player, "close"):
+            player.close()
+    elapsed = time.perf_counter() - start
+    print(f"Played {summary} in {elapsed:.3f}s")
+    if args.dry_run:
+        actions = len(backend.log) if backend is not None else player.actions
+        where = " in the playback process" if backend is None else ""
+        print(f"Dry run: {actions} actions dispatched to the null backend{where}")
+    _report(telemetry, args.report)
+    return 0
+
+
+def _parse_geometry(text):
+    """WxH or WxH+X+Y (X11 style) -> (x, y, w, h)."""
+    size, _, origin = text.partition("+")
+    try:
+        w, h = (int(v) for v in size.lower().split("x"))
+        x, y = (int(v) for v in origin.split("+")) if origin else (0, 0)
+    except ValueError:
+        raise ValueError(f"Bad monitor geometry '{text}' (expected WxH or WxH+X+Y)")
+    return x, y, w, h
+
+
+def _parse_position(text):
+    """ITERATION:ROW, as printed when a play is interrupted -> Player position."""
+    try:
+        iteration, row = (int(part) for part in text.split(":"))
+    except ValueError:
+        raise ValueError(f"Bad --resume position '{text}' (expected ITERATION:ROW)")
+    return iteration, row
+
+
+def _cmd_playlist(args):
+    from src.playlist import save_playlist, load_playlist, list_playlists, estimate_duration
+
+    if args.name is None:
+        for name in list_playlists(folder=args.folder):
+            print(name)
+        return 0
+    if args.steps:
+        path = save_playlist(args.name, [_parse_step(s) for s in args.steps], folder=args.folder)
+        print(f"Saved {len(args.steps)} steps to {path}")
+        return 0
+    playlist = load_playlist(args.name, folder=args.folder)
+    for k, e in enumerate(playlist["entries"], 1):
+        print(f"{k:>3}. {e['macro']:<32} x{e['repeat']:<6} {e['speed']:g}x  +{e['delay']:g}s")
+    print(f"~{estimate_duration(playlist, args.folder):.1f}s")
+    return 0
+
+
+def _parse_step(text):
+    """MACRO[:REPEAT[:SPEED[:DELAY]]] -> playlist entry."""
+    parts = text.split(":")
+    if len(parts) > 4:
+        raise ValueError(f"Bad playlist step '{text}' (expected MACRO[:REPEAT[:SPEED[:DELAY]]])")
+    entry = {"macro": parts[0]}
+    for key, value, cast in zip(("repeat", "speed", "delay"), parts[1:], (int, float, float)):
+        if value:
+            entry[key] = cast(value)
+    return entry
+
+
+def _report(telemetry, path):
+    if telemetry is None:
+        return
+    print(telemetry.format_report())
+    if path:
+        telemetry.write_report(path)
+        print(f"Report written to {path}")
+
+
+def _cmd_record(args, settings):
+    from src.recorder import INTERRUPT_CHORD, Recorder, StreamingRecorder
+
+    check_name(args.name)  # before recording, not when the result is saved
+    # The Ctrl+C that stops the recording must not be replayed
+    options = dict(record_moves=args.moves, move_tolerance=settings.get("move_tolerance_px", 2.0),
+                   trim_chord=INTERRUPT_CHORD)
+    if args.stream:
+        recorder = StreamingRecorder(args.name, folder=args.folder, **options)
+    else:
+        recorder = Recorder(**options)
+    recorder.start()
+    print("Recording... press Ctrl+C to stop" if args.duration is None
+          else f"Recording for {args.duration}s...", file=sys.stderr)
+    try:
+        if args.duration is None:
+            while True:
+                time.sleep(0.5)
+        time.sleep(args.duration)
+    except KeyboardInterrupt:
+        pass
+    result = recorder.stop()
+    if args.stream and result is not None:
+        print(f"Saved {result}")
+        return 0
+    if not result:
+        print("Nothing recorded.", file=sys.stderr)
+        return 1
+    if settings.get("optimize_recordings", True):
+        from src.optimizer import optimize, format_stats
+        result, stats = optimize(result, collapse_repeats=settings.get("collapse_key_repeat", False))
+        print(f"Optimizer {format_stats(stats)}", file=sys.stderr)
+    path = save_macro(args.name, result, folder=args.folder, fmt=args.format, **_storage_options(args))
+    print(f"Saved {len(result)} events to {path}")
+    return 0
+
+
+def _add_storage_args(p, settings):
+    p.add_argument("--codec", choices=sorted(CODECS), default=settings.get("compression_codec", "zlib"),
+                   help="compression for the compressed format")
+    p.add_argument("--resolution-ms", type=float, default=settings.get("timestamp_resolution_ms", 0.1),
+                   help="timestamp precision for the compressed format")
+
+
+def build_parser(settings):
+    parser = argparse.ArgumentParser(prog="python -m src", description="Record and replay macros without the GUI.")
+    parser.add_argument("--folder", default=settings["macro_folder"], help="macro folder (default: from settings)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("play", help="play a macro, or several at once as overlaid tracks")
+    p.add_argument("names", nargs="+", metavar="name")
+    p.add_argument("--offset", type=float, nargs="+", default=[], metavar="SECONDS",
+                   help="start offset of each track, in the order the macros are named")
+    p.add_argument("--repeat", type=int, default=1)
+    p.add_argument("--speed", type=float, default=settings.get("speed", 1.0))
+    p.add_argument("--timing", choices=TIMING_MODES, default=settings.get("timing_mode", "uniform"),
+                   help="gap compression: uniform, cap, split or fastest")
+    p.add_argument("--max-gap", type=float, default=settings.get("max_gap_s", 1.0), help="cap: longest gap (s)")
+    p.add_argument("--long-gap", type=float, default=settings.get("long_gap_s", 0.5),
+                   help="split: gaps beyond this (s) are also divided by --long-speed")
+    p.add_argument("--long-speed", type=float, default=settings.get("long_gap_speed", 4.0))
+    p.add_argument("--min-gap", type=float, default=settings.get("min_gap_ms", 10),
+                   help="fastest: press→release spacing kept (ms)")
+    p.add_argument("--start", type=float, default=0.0, metavar="SECONDS",
+                   help="start this far into the recording; held keys and buttons are restored")
+    p.add_argument("--end", type=float, metavar="SECONDS", help="stop here; with --repeat, loops [start, end)")
+    p.add_argument("--resume", metavar="ITERATION:ROW", help="continue an interrupted play where it stopped")
+    p.add_argument("--remap-from", nargs="+", metavar="WxH+X+Y",
+                   help="monitors the macro was recorded on; with --remap-to, remaps clicks to the current layout")
+    p.add_argument("--remap-to", nargs="+", metavar="WxH+X+Y", help="monitors to replay on, in the same order")
+    p.add_argument("--playlist", action="store_true", help="the name is a playlist rather than a macro")
+    p.add_argument("--process", action=argparse.BooleanOptionalAction,
+                   default=settings.get("out_of_process_playback", False),
+                   help="play a single macro from a separate process, isolated from this one's jitter")
+    p.add_argument("--dry-run", action="store_true", help="dispatch to the null backend instead of real input")
+    p.add_argument("--report", nargs="?", const="", metavar="PATH",
+                   help="print a timing report after playback; with PATH also write it as JSON")
+
+    p = sub.add_parser("record", help="record a macro until Ctrl+C or --duration")
+    p.add_argument("name")
+    p.add_argument("--duration", type=float)
+    p.add_argument("--moves", action="store_true", default=settings.get("record_moves", False),
+                   help="also record mouse movement")
+    p.add_argument("--stream", action="store_true", default=settings.get("stream_recording", False),
+                   help="write events to disk while recording")
+    p.add_argument("--format", choices=sorted(FORMATS), default=settings.get("macro_format", "json"))
+    _add_storage_args(p, settings)
+
+    p = sub.add_parser("list", help="list macros")
+    p.add_argument("-l", "--long", action="store_true", help="show event count, duration and created date")
+
+    p = sub.add_parser("convert", help="rewrite macros in another format")
+    p.add_argument("names", nargs="+")
+    p.add_argument("--to", required=True, choices=sorted(FORMATS))
+    _add_storage_args(p, settings)
+
+    p = sub.add_parser("optimize", help="remove redundant events from stored macros")
+    p.add_argument("names", nargs="+")
+    p.add_argument("--collapse-repeats", action="store_true", default=settings.get("collapse_key_repeat", False),
+                   help="also drop key auto-repeat presses")
+    p.add_argument("--dry-run", action="store_true", help="report what would be removed without saving")
+
+    p = sub.add_parser("playlist", help="list playlists, show one, or save one from steps")
+    p.add_argument("name", nargs="?")
+    p.add_argument("steps", nargs="*", metavar="MACRO[:REPEAT[:SPEED[:DELAY]]]")
+
+    p = sub.add_parser("stats", help="show macro metadata from the library index")
+    p.add_argument("names", nargs="*")
+    return parser
+
+
+def main(argv=None):
+    settings = load_settings()
+    args = build_parser(settings).parse_args(argv)
+    try:
+        if args.command == "play":
+            return _cmd_play(args, settings)
+        if args.command == "record":
+            return _cmd_record(args, settings)
+        if args.command == "optimize":
+            return _cmd_optimize(args, settings)
+        return {"list": _cmd_list, "stats": _cmd_stats, "convert": _cmd_convert,
+                "playlist": _cmd_playlist}[args.command](args)
+    except (FileNotFoundError, ValueError, RuntimeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
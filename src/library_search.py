@@ -0,0 +1,174 @@
+# src/library_search.py
+# In-memory model behind the library view: every row's display values, a
+# substring index over them and the current filtered, sorted view. Nothing
+# here touches the disk or tkinter, so a search or a re-sort never reloads
+# a macro and the model is testable headless.
+#
+# Search is case-insensitive substring matching over all displayed values
+# (name, event count, duration, created date). A trigram inverted index
+# narrows each query to the rows sharing its rarest trigram, and a query
+# that extends the previous one only re-checks the previous matches, so
+# typing costs time proportional to the matches, not the library.
+
+GRAM = 3
+
+
+def _grams(text):
+    return {text[i:i + GRAM] for i in range(len(text) - GRAM + 1)}
+
+
+class SubstringIndex:
+    """Trigram index of the lowercased text fields of each key."""
+
+    def __init__(self):
+        self._fields = {}    # key -> tuple of lowercased fields
+        self._postings = {}  # trigram -> set of keys
+
+    def __len__(self):
+        return len(self._fields)
+
+    def add(self, key, fields):
+        self.remove(key)
+        fields = tuple(str(f).lower() for f in fields)
+        self._fields[key] = fields
+        for gram in set().union(*(_grams(f) for f in fields)):
+            self._postings.setdefault(gram, set()).add(key)
+
+    def remove(self, key):
+        fields = self._fields.pop(key, None)
+        if fields is None:
+            return
+        for gram in set().union(*(_grams(f) for f in fields)):
+            keys = self._postings.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[gram]
+
+    def search(self, query, within=None):
+        """Keys with a field containing query; within limits the candidates (e.g. the previous matches)."""
+        query = query.lower()
+        if not query:
+            return set(self._fields) if within is None else set(within)
+        candidates = within
+        if len(query) >= GRAM:
+            postings = []
+            for gram in _grams(query):
+                keys = self._postings.get(gram)
+                if not keys:
+                    return set()
+                postings.append(keys)
+            rarest = min(postings, key=len)
+            if candidates is None or len(rarest) < len(candidates):
+                candidates = rarest
+        if candidates is None:
+            candidates = self._fields  # one or two characters: most rows match anyway
+        fields = self._fields
+        return {key for key in candidates if key in fields and any(query in f for f in fields[key])}
+
+
+class LibraryModel:
+    """Rows of the library view, filtered by a search query and sorted by a column.
+
+    Each row has display values (one per column), sort keys (same order;
+    numbers for numeric columns) and a group: rows sort within their group
+    and groups keep their order, so playlists stay below macros whichever
+    column is sorted. view is the list of row ids to show.
+    """
+
+    def __init__(self, columns):
+        self.columns = tuple(columns)
+        self._values = {}
+        self._keys = {}
+        self._groups = {}
+        self._index = SubstringIndex()
+        self.query = ""
+        self._matches = None  # None means every row
+        self.sort_column = self.columns[0]
+        self.descending = False
+        self._view = None
+
+    def __len__(self):
+        return len(self._values)
+
+    def __contains__(self, iid):
+        return iid in self._values
+
+    def shown(self, iid):
+        """Whether iid is a row that matches the current query."""
+        return iid in self._values and (self._matches is None or iid in self._matches)
+
+    def values(self, iid):
+        return self._values[iid]
+
+    def set(self, iid, values, keys=None, group=0):
+        """Add or replace a row; returns False if it was already present unchanged."""
+        values = tuple(values)
+        keys = tuple(keys) if keys is not None else values
+        if self._values.get(iid) == values and self._keys.get(iid) == keys and self._groups.get(iid) == group:
+            return False
+        if self._values.get(iid) != values:
+            self._index.add(iid, values)
+        self._values[iid] = values
+        self._keys[iid] = keys
+        self._groups[iid] = group
+        if self._matches is not None:
+            if self._index.search(self.query, within=(iid,)):
+                self._matches.add(iid)
+            else:
+                self._matches.discard(iid)
+        self._view = None
+        return True
+
+    def remove(self, iid):
+        if self._values.pop(iid, None) is None:
+            return False
+        del self._keys[iid]
+        del self._groups[iid]
+        self._index.remove(iid)
+        if self._matches is not None:
+            self._matches.discard(iid)
+        self._view = None
+        return True
+
+    def clear(self):
+        """Drop every row, keeping the query and sort order."""
+        self._values.clear()
+        self._keys.clear()
+        self._groups.clear()
+        self._index = SubstringIndex()
+        if self._matches is not None:
+            self._matches = set()
+        self._view = None
+
+    def search(self, query):
+        """Filter the view to rows containing query (case-insensitive)."""
+        query = query.strip()
+        if query == self.query:
+            return
+        within = self._matches if self.query and self.query.lower() in query.lower() else None
+        self.query = query
+        self._matches = self._index.search(query, within=within) if query else None
+        self._view = None
+
+    def sort(self, column, descending=False):
+        self.sort_column = column
+        self.descending = descending
+        self._view = None
+
+    @property
+    def view(self):
+        """Row ids matching the query, in sort order."""
+        if self._view is None:
+            rows = self._values.keys() if self._matches is None else self._matches
+            col = self.columns.index(self.sort_column)
+            keys, groups = self._keys, self._groups
+            by_group = {}
+            for iid in rows:
+                by_group.setdefault(groups[iid], []).append(iid)
+            view = []
+            for group in sorted(by_group):
+                # Row id breaks ties so equal keys keep a stable order
+                view += sorted(by_group[group], key=lambda iid: (keys[iid][col], iid), reverse=self.descending)
+            self._view = view
+        return self._view
@@ -0,0 +1,221 @@
+# src/library_view.py
+# Virtualized, searchable library list. The Treeview only ever holds the
+# rows that fit on screen; scrolling, searching and sorting re-render that
+# window from LibraryModel, so the cost of a redraw depends on the widget
+# height, not on how many macros the folder holds. Selection is kept in
+# the model by row id, so it survives rows scrolling out of view.
+import tkinter as tk
+from tkinter import ttk
+
+from src.library_search import LibraryModel
+
+WHEEL_ROWS = 3  # rows per mouse wheel notch
+_SHIFT = 0x0001
+_CONTROL = 0x0004
+
+
+class LibraryView(ttk.Frame):
+    """Search box, sortable column headings and a windowed Treeview over a LibraryModel.
+
+    Fires <<LibrarySelect>> when the selection changes.
+    """
+
+    def __init__(self, master, columns, headings, widths, height=10):
+        super().__init__(master)
+        self.model = LibraryModel(columns)
+        self._height = height
+        self._first = 0          # view index of the top rendered row
+        self._selected = []      # selected row ids, in the order they were selected
+        self._anchor = None      # row id keyboard/shift selection extends from
+        self._headings = dict(zip(columns, headings))
+
+        search_row = tk.Frame(self)
+        search_row.pack(fill="x")
+        ttk.Label(search_row, text="Search:").pack(side="left")
+        self._query_var = tk.StringVar()
+        self._query_var.trace_add("write", lambda *a: self._on_search())
+        ttk.Entry(search_row, textvariable=self._query_var).pack(side="left", fill="x", expand=True, padx=4)
+        self._count_var = tk.StringVar()
+        ttk.Label(search_row, textvariable=self._count_var).pack(side="left")
+
+        body = tk.Frame(self)
+        body.pack(fill="both", expand=True, pady=(4, 0))
+        self._tree = ttk.Treeview(body, columns=columns, show="headings", height=height, selectmode="extended")
+        for col, width in zip(columns, widths):
+            self._tree.heading(col, command=lambda c=col: self._on_heading(c))
+            self._tree.column(col, width=width, anchor="w" if col == columns[0] else "e")
+        self._scrollbar = ttk.Scrollbar(body, orient="vertical", command=self._on_scrollbar)
+        self._tree.pack(side="left", fill="both", expand=True)
+        self._scrollbar.pack(side="left", fill="y")
+        self._update_headings()
+
+        self._tree.bind("<Button-1>", self._on_click)
+        self._tree.bind("<<TreeviewSelect>>", self._on_tree_select)
+        self._tree.bind("<MouseWheel>", lambda e: self._scroll(-WHEEL_ROWS if e.delta > 0 else WHEEL_ROWS))
+        self._tree.bind("<Button-4>", lambda e: self._scroll(-WHEEL_ROWS))
+        self._tree.bind("<Button-5>", lambda e: self._scroll(WHEEL_ROWS))
+        for key, step in (("<Up>", -1), ("<Down>", 1), ("<Prior>", -height), ("<Next>", height)):
+            self._tree.bind(key, lambda e, s=step: self._move_cursor(s, e.state & _SHIFT))
+        self._tree.bind("<Home>", lambda e: self._move_cursor(-len(self.model.view), e.state & _SHIFT))
+        self._tree.bind("<End>", lambda e: self._move_cursor(len(self.model.view), e.state & _SHIFT))
+
+    # ── rows ────────────────────────────────────────────────────────────────
+
+    def update_rows(self, rows):
+        """Apply {iid: (values, keys, group), or None to delete} and redraw once."""
+        changed = False
+        for iid, row in rows.items():
+            if row is None:
+                changed |= self.model.remove(iid)
+            else:
+                changed |= self.model.set(iid, *row)
+        if changed:
+            self._drop_missing_selection()
+            self.render()
+
+    def delete(self, iid):
+        self.update_rows({iid: None})
+
+    def clear(self):
+        self.model.clear()
+        self._drop_missing_selection()
+        self.render()
+
+    def _drop_missing_selection(self):
+        selected = [iid for iid in self._selected if iid in self.model]
+        if selected != self._selected:
+            self._selected = selected
+            self.event_generate("<<LibrarySelect>>")
+
+    def exists(self, iid):
+        return iid in self.model
+
+    # ── selection ───────────────────────────────────────────────────────────
+
+    def selection(self):
+        """Selected row ids in view order (selected rows hidden by the search are left out)."""
+        selected = [iid for iid in self._selected if self.model.shown(iid)]
+        if len(selected) <= 1:
+            return selected
+        selected = set(selected)
+        return [iid for iid in self.model.view if iid in selected]
+
+    def select(self, iid):
+        """Select a single row and scroll it into view."""
+        if iid not in self.model:
+            return
+        self._selected = [iid]
+        self._anchor = iid
+        self.see(iid)
+        self.event_generate("<<LibrarySelect>>")
+
+    def see(self, iid):
+        view = self.model.view
+        try:
+            pos = view.index(iid)
+        except ValueError:
+            return
+        if pos < self._first:
+            self._first = pos
+        elif pos >= self._first + self._height:
+            self._first = pos - self._height + 1
+        self.render()
+
+    def _on_click(self, event):
+        # A plain click on a row replaces the selection, including rows
+        # scrolled out of view; clicks on headings and separators keep it
+        if event.state & (_SHIFT | _CONTROL):
+            return
+        if self._tree.identify_region(event.x, event.y) in ("cell", "tree"):
+            self._selected = []
+
+    def _on_tree_select(self, event):
+        visible = self._tree.get_children()
+        picked = self._tree.selection()
+        selected = set(self._selected)
+        if set(picked) == {iid for iid in visible if iid in selected}:
+            return  # fired by our own render
+        visible = set(visible)
+        self._selected = [iid for iid in self._selected if iid not in visible] + list(picked)
+        focus = self._tree.focus()
+        if focus:
+            self._anchor = focus
+        self.event_generate("<<LibrarySelect>>")
+
+    def _move_cursor(self, step, extend=False):
+        view = self.model.view
+        if not view:
+            return "break"
+        current = self._tree.focus() or self._anchor
+        pos = view.index(current) if current in self.model and current in view else -1
+        pos = max(0, min(len(view) - 1, pos + step))
+        iid = view[pos]
+        if extend and self._anchor in view:
+            a = view.index(self._anchor)
+            self._selected = view[min(a, pos):max(a, pos) + 1]
+        else:
+            self._selected = [iid]
+            self._anchor = iid
+        self.see(iid)
+        self._tree.focus(iid)
+        self.event_generate("<<LibrarySelect>>")
+        return "break"
+
+    # ── search / sort / scroll ──────────────────────────────────────────────
+
+    def _on_search(self):
+        before = self.selection()
+        self.model.search(self._query_var.get())
+        self._first = 0
+        self.render()
+        if self.selection() != before:
+            self.event_generate("<<LibrarySelect>>")  # selected rows were hidden or revealed
+
+    def _on_heading(self, column):
+        descending = column == self.model.sort_column and not self.model.descending
+        self.model.sort(column, descending)
+        self._update_headings()
+        self.render()
+
+    def _update_headings(self):
+        for col, text in self._headings.items():
+            if col == self.model.sort_column:
+                text += " ▼" if self.model.descending else " ▲"
+            self._tree.heading(col, text=text)
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self._first = int(float(amount) * len(self.model.view))
+            self.render()
+        else:
+            self._scroll(int(amount) * (self._height if unit == "pages" else 1))
+
+    def _scroll(self, rows):
+        self._first += rows
+        self.render()
+        return "break"
+
+    def render(self):
+        """Redraw the visible window of the view."""
+        view = self.model.view
+        total = len(view)
+        self._first = max(0, min(self._first, total - self._height))
+        window = view[self._first:self._first + self._height]
+        tree = self._tree
+        current = tree.get_children()
+        if list(current) != window:
+            tree.delete(*current)
+            for iid in window:
+                tree.insert("", "end", iid=iid, values=self.model.values(iid))
+        else:
+            for iid in window:
+                if tuple(map(str, tree.item(iid, "values"))) != tuple(map(str, self.model.values(iid))):
+                    tree.item(iid, values=self.model.values(iid))
+        selected = set(self._selected)
+        tree.selection_set([iid for iid in window if iid in selected])
+        if total:
+            self._scrollbar.set(self._first / total, (self._first + len(window)) / total)
+        else:
+            self._scrollbar.set(0.0, 1.0)
+        shown = f"{total:,}" if not self.model.query else f"{total:,} of {len(self.model):,}"
+        self._count_var.set(shown)
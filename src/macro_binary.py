@@ -0,0 +1,329 @@
+# src/macro_binary.py
+import json
+import math
+import mmap
+import struct
+import sys
+import zlib
+from array import array
+from itertools import accumulate
+
+# Compact columnar macro format (.mcb). Layout, little-endian:
+#   header   MAGIC, u32 event count, u32 path point count, u32 meta length
+#   meta     UTF-8 JSON {"name", "created", "strings"}; strings is the
+#            string table that button/key names are stored as indices into
+#   padding  to an 8-byte boundary
+#   columns  back to back, in COLUMNS order
+MAGIC = b"MCB1"
+_HEADER = struct.Struct("<4sIII")
+
+# Event type codes. These intentionally match the Plan opcodes.
+TYPE_CLICK = 0
+TYPE_SCROLL = 1
+TYPE_KEY = 2
+TYPE_MOVE = 3
+
+_TYPE_CODES = {"click": TYPE_CLICK, "scroll": TYPE_SCROLL, "key": TYPE_KEY, "move": TYPE_MOVE}
+
+FLAG_PRESSED = 1
+
+# (attribute, typecode, per-event or per-path-point). 8-byte columns first
+# so every column stays naturally aligned.
+COLUMNS = (
+    ("t", "d", "event"),
+    ("pt", "d", "path"),
+    ("x", "i", "event"),
+    ("y", "i", "event"),
+    ("code", "i", "event"),   # string table index of button/key name, -1 if none
+    ("a", "i", "event"),      # scroll dx, or path start index for moves
+    ("b", "i", "event"),      # scroll dy, or path point count for moves
+    ("px", "i", "path"),
+    ("py", "i", "path"),
+    ("type", "B", "event"),
+    ("flags", "B", "event"),
+)
+
+_SWAP = sys.byteorder != "little"
+
+# Compressed variant (.mcz) for synced folders: the same columns, with the
+# t/pt floats replaced by int64 deltas of ticks at `resolution` seconds,
+# then the meta JSON and all columns compressed as one stream.
+#   header   MAGIC_Z, u8 codec, f64 resolution, u32 event count,
+#            u32 path point count, u32 meta length
+#   body     compressed(meta + columns in COLUMNS order)
+MAGIC_Z = b"MCZ1"
+_ZHEADER = struct.Struct("<4sBdIII")
+CODECS = {"zlib": 1, "lzma": 2}
+DEFAULT_RESOLUTION = 1e-4  # seconds; Recorder rounds timestamps to this, so it is lossless
+_TIME_COLUMNS = ("t", "pt")
+
+
+class MacroColumns:
+    """A macro held as typed columns instead of one dict per event."""
+
+    __slots__ = tuple(name for name, _, _ in COLUMNS) + ("strings", "name", "created")
+
+    def __init__(self, name="", created=""):
+        for attr, typecode, _ in COLUMNS:
+            setattr(self, attr, array(typecode))
+        self.strings = []
+        self.name = name
+        self.created = created
+
+    def __len__(self):
+        return len(self.t)
+
+    def nbytes(self):
+        """Approximate memory held by the columns."""
+        return sum(getattr(self, attr).itemsize * len(getattr(self, attr)) for attr, _, _ in COLUMNS)
+
+    @classmethod
+    def from_events(cls, events, name="", created=""):
+        cols = cls(name, created)
+        index = {}
+
+        def intern(s):
+            i = index.get(s)
+            if i is None:
+                i = index[s] = len(cols.strings)
+                cols.strings.append(s)
+            return i
+
+        for event in events:
+            kind = _TYPE_CODES.get(event.get("type"))
+            if kind is None:
+                continue
+            x = y = a = b = flags = 0
+            code = -1
+            if kind == TYPE_CLICK:
+                x, y = int(event["x"]), int(event["y"])
+                code = intern(event["button"])
+                flags = FLAG_PRESSED if event["pressed"] else 0
+            elif kind == TYPE_SCROLL:
+                x, y = int(event["x"]), int(event["y"])
+                a, b = int(event["dx"]), int(event["dy"])
+            elif kind == TYPE_KEY:
+                code = intern(event["key"])
+                flags = FLAG_PRESSED if event["pressed"] else 0
+            else:
+                path = event["path"]
+                a, b = len(cols.pt), len(path)
+                x, y = int(path[0][0]), int(path[0][1])
+                for px, py, pt in path:
+                    cols.px.append(int(px))
+                    cols.py.append(int(py))
+                    cols.pt.append(pt)
+            cols.t.append(event["t"])
+            cols.type.append(kind)
+            cols.x.append(x)
+            cols.y.append(y)
+            cols.code.append(code)
+            cols.flags.append(flags)
+            cols.a.append(a)
+            cols.b.append(b)
+        return cols
+
+    def to_events(self):
+        """Rebuild the plain event dicts used by the JSON format."""
+        events = []
+        strings = self.strings
+        for i in range(len(self.t)):
+            kind = self.type[i]
+            if kind == TYPE_CLICK:
+                events.append({
+                    "type": "click",
+                    "x": self.x[i], "y": self.y[i],
+                    "button": strings[self.code[i]],
+                    "pressed": bool(self.flags[i] & FLAG_PRESSED),
+                    "t": self.t[i],
+                })
+            elif kind == TYPE_SCROLL:
+                events.append({
+                    "type": "scroll",
+                    "x": self.x[i], "y": self.y[i],
+                    "dx": self.a[i], "dy": self.b[i],
+                    "t": self.t[i],
+                })
+            elif kind == TYPE_KEY:
+                events.append({
+                    "type": "key",
+                    "key": strings[self.code[i]],
+                    "pressed": bool(self.flags[i] & FLAG_PRESSED),
+                    "t": self.t[i],
+                })
+            else:
+                start, count = self.a[i], self.b[i]
+                events.append({
+                    "type": "move",
+                    "path": [[self.px[j], self.py[j], self.pt[j]] for j in range(start, start + count)],
+                    "t": self.t[i],
+                })
+        return events
+
+
+def _padding(offset):
+    return -offset % 8
+
+
+def write_columns(path, cols):
+    meta = json.dumps({"name": cols.name, "created": cols.created, "strings": cols.strings}).encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, len(cols.t), len(cols.pt), len(meta)))
+        f.write(meta)
+        f.write(b"\0" * _padding(_HEADER.size + len(meta)))
+        for attr, _, _ in COLUMNS:
+            column = getattr(cols, attr)
+            if _SWAP:
+                column = array(column.typecode, column)
+                column.byteswap()
+            f.write(column.tobytes())
+
+
+def _expected_size(n_events, n_path, meta_len):
+    data_start = _HEADER.size + meta_len + _padding(_HEADER.size + meta_len)
+    size = data_start
+    for _, typecode, kind in COLUMNS:
+        size += array(typecode).itemsize * (n_events if kind == "event" else n_path)
+    return data_start, size
+
+
+def read_header(path):
+    """Return (n_events, n_path, meta dict) after checking the file is intact.
+
+    Raises ValueError for a truncated or foreign file.
+    """
+    with open(path, "rb") as f:
+        head = f.read(_HEADER.size)
+        if len(head) < _HEADER.size:
+            raise ValueError("file too short")
+        magic, n_events, n_path, meta_len = _HEADER.unpack(head)
+        if magic != MAGIC:
+            raise ValueError("bad magic")
+        meta = json.loads(f.read(meta_len).decode("utf-8"))
+        f.seek(0, 2)
+        actual = f.tell()
+    _, size = _expected_size(n_events, n_path, meta_len)
+    if actual != size:
+        raise ValueError(f"expected {size} bytes, found {actual}")
+    return n_events, n_path, meta
+
+
+def read_columns(path):
+    """Load a .mcb file column by column through mmap; no per-event objects are built."""
+    n_events, n_path, meta = read_header(path)
+    cols = MacroColumns(meta.get("name", ""), meta.get("created", ""))
+    cols.strings = meta.get("strings", [])
+    if n_events == 0:
+        return cols
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        meta_len = _HEADER.unpack_from(mm)[3]
+        offset, _ = _expected_size(n_events, n_path, meta_len)
+        for attr, typecode, kind in COLUMNS:
+            column = array(typecode)
+            nbytes = column.itemsize * (n_events if kind == "event" else n_path)
+            column.frombytes(mm[offset:offset + nbytes])
+            if _SWAP:
+                column.byteswap()
+            setattr(cols, attr, column)
+            offset += nbytes
+    return cols
+
+
+# ── compressed (.mcz) ───────────────────────────────────────────────────────
+
+def _codec(codec_id):
+    if codec_id == CODECS["zlib"]:
+        return zlib
+    if codec_id == CODECS["lzma"]:
+        import lzma
+        return lzma
+    raise ValueError(f"unknown codec {codec_id}")
+
+
+def _to_deltas(times, resolution):
+    deltas = array("q")
+    prev = 0
+    for t in times:
+        tick = round(t / resolution)
+        deltas.append(tick - prev)
+        prev = tick
+    return deltas
+
+
+def _from_deltas(deltas, resolution):
+    # Round back to the resolution's decimals so e.g. 1e-4 ticks give the
+    # same floats the recorder wrote, not 0.30000000000000004
+    digits = max(0, math.ceil(-math.log10(resolution) - 1e-9))
+    return array("d", (round(tick * resolution, digits) for tick in accumulate(deltas)))
+
+
+def write_compressed(path, cols, codec="zlib", resolution=DEFAULT_RESOLUTION):
+    """Write cols as a .mcz file. Timestamps are kept to `resolution` seconds."""
+    if codec not in CODECS:
+        raise ValueError(f"Unknown codec '{codec}'")
+    if resolution <= 0:
+        raise ValueError("resolution must be positive")
+    meta = json.dumps({"name": cols.name, "created": cols.created, "strings": cols.strings}).encode("utf-8")
+    parts = [meta]
+    for attr, _, _ in COLUMNS:
+        column = getattr(cols, attr)
+        if attr in _TIME_COLUMNS:
+            column = _to_deltas(column, resolution)
+        elif _SWAP:
+            column = array(column.typecode, column)
+        if _SWAP:
+            column.byteswap()
+        parts.append(column.tobytes())
+    body = _codec(CODECS[codec]).compress(b"".join(parts))
+    with open(path, "wb") as f:
+        f.write(_ZHEADER.pack(MAGIC_Z, CODECS[codec], resolution, len(cols.t), len(cols.pt), len(meta)))
+        f.write(body)
+
+
+def read_compressed_options(path):
+    """Return the (codec, resolution) a .mcz file was written with, reading only its header."""
+    with open(path, "rb") as f:
+        head = f.read(_ZHEADER.size)
+    if len(head) < _ZHEADER.size:
+        raise ValueError("file too short")
+    magic, codec_id, resolution = _ZHEADER.unpack(head)[:3]
+    if magic != MAGIC_Z:
+        raise ValueError("bad magic")
+    codec = next((name for name, code in CODECS.items() if code == codec_id), None)
+    if codec is None:
+        raise ValueError(f"unknown codec {codec_id}")
+    return codec, resolution
+
+
+def read_compressed(path):
+    """Load a .mcz file into MacroColumns. Raises ValueError for a damaged or foreign file."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < _ZHEADER.size:
+        raise ValueError("file too short")
+    magic, codec_id, resolution, n_events, n_path, meta_len = _ZHEADER.unpack_from(data)
+    if magic != MAGIC_Z:
+        raise ValueError("bad magic")
+    try:
+        body = _codec(codec_id).decompress(data[_ZHEADER.size:])
+    except Exception as e:
+        raise ValueError(f"cannot decompress: {e}")
+    meta = json.loads(body[:meta_len].decode("utf-8"))
+    cols = MacroColumns(meta.get("name", ""), meta.get("created", ""))
+    cols.strings = meta.get("strings", [])
+    offset = meta_len
+    for attr, typecode, kind in COLUMNS:
+        column = array("q" if attr in _TIME_COLUMNS else typecode)
+        nbytes = column.itemsize * (n_events if kind == "event" else n_path)
+        if offset + nbytes > len(body):
+            raise ValueError("truncated body")
+        column.frombytes(body[offset:offset + nbytes])
+        if _SWAP:
+            column.byteswap()
+        if attr in _TIME_COLUMNS:
+            column = _from_deltas(column, resolution)
+        setattr(cols, attr, column)
+        offset += nbytes
+    if offset != len(body):
+        raise ValueError(f"expected {offset} body bytes, found {len(body)}")
+    return cols
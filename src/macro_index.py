@@ -0,0 +1,98 @@
+# src/macro_index.py
+import json
+import os
+import threading
+from pathlib import Path
+
+INDEX_FILENAME = ".macro_index"  # no .json suffix, so it is never listed as a macro
+INDEX_VERSION = 1
+
+
+class MacroIndex:
+    """Metadata for every macro file in a folder, persisted alongside them.
+
+    Entries are keyed by filename and remember the mtime and size they were
+    built from. refresh() only stats the folder and calls describe(path) for
+    files that are new or changed, so listing a large library does not
+    reparse it. describe must return a dict with at least a "valid" key.
+    """
+
+    def __init__(self, folder, suffixes, describe):
+        self._folder = Path(folder)
+        self._suffixes = tuple(suffixes)
+        self._describe = describe
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+    def refresh(self):
+        """Bring the index up to date with the folder; returns {filename: entry}."""
+        with self._lock:
+            try:
+                scan = os.scandir(self._folder)
+            except FileNotFoundError:
+                self._entries = {}
+                return {}
+            seen = {}
+            dirty = False
+            with scan:
+                for de in scan:
+                    name = de.name
+                    if name.startswith(".") or not name.endswith(self._suffixes) or not de.is_file():
+                        continue
+                    st = de.stat()
+                    entry = self._entries.get(name)
+                    if entry is None or entry["mtime_ns"] != st.st_mtime_ns or entry["size"] != st.st_size:
+                        entry = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, **self._describe(Path(de.path))}
+                        dirty = True
+                    seen[name] = entry
+            if dirty or seen.keys() != self._entries.keys():
+                self._entries = seen
+                self._save()
+            return dict(seen)
+
+    def update(self, filename):
+        """Bring one file's entry up to date now (e.g. right after saving it); returns it, or None if absent.
+
+        Like refresh(), a file whose mtime and size match its entry is not re-described.
+        """
+        path = self._folder / filename
+        with self._lock:
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                if self._entries.pop(filename, None) is not None:
+                    self._save()
+                return None
+            entry = self._entries.get(filename)
+            if entry is None or entry["mtime_ns"] != st.st_mtime_ns or entry["size"] != st.st_size:
+                entry = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, **self._describe(path)}
+                self._entries[filename] = entry
+                self._save()
+            return dict(entry)
+
+    def forget(self, filename):
+        """Drop a file's entry so the next refresh re-describes it."""
+        with self._lock:
+            self._entries.pop(filename, None)
+
+    # ── persistence ─────────────────────────────────────────────────────────
+
+    def _load(self):
+        try:
+            with open(self._folder / INDEX_FILENAME, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION:
+                return data["entries"]
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+        return {}
+
+    def _save(self):
+        path = self._folder / INDEX_FILENAME
+        tmp = path.with_name(path.name + ".tmp")
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"version": INDEX_VERSION, "entries": self._entries}, f)
+            os.replace(tmp, path)
+        except OSError:
+            pass  # read-only folder: the in-memory index still works
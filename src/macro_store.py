@@ -1,56 +1,576 @@
 # src/macro_store.py
 import json
+import os
+import threading
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
 
+from src.macro_binary import (MacroColumns, read_columns, write_columns, read_compressed, read_compressed_options,
+                              write_compressed,
+                              DEFAULT_RESOLUTION, TYPE_CLICK, TYPE_SCROLL, TYPE_KEY, TYPE_MOVE)
+from src.macro_index import MacroIndex
+
 DEFAULT_FOLDER = Path.home() / "mouse_macros"
 
+# On-disk formats, keyed by name as accepted by save_macro(fmt=...)
+FORMATS = {"json": ".json", "binary": ".mcb", "stream": ".jsonl", "compressed": ".mcz"}
+MACRO_SUFFIXES = tuple(FORMATS.values())
+_INVALID_NAME_CHARS = set('<>:"/\\|?*')  # path separators and what Windows rejects in filenames
+
+
+def check_name(name):
+    """Raise ValueError unless name can be used as a macro or playlist filename in the folder."""
+    if not isinstance(name, str) or not name.strip():
+        raise ValueError("Name must not be empty")
+    bad = sorted({c for c in name if c in _INVALID_NAME_CHARS or ord(c) < 32})
+    if bad:
+        raise ValueError(f"Name '{name}' must not contain {' '.join(repr(c) for c in bad)}")
+    if name.startswith(".") or name.endswith((" ", ".")):
+        # Hidden files are never listed, and Windows drops trailing dots and spaces
+        raise ValueError(f"Name '{name}' must not start with a dot or end with a dot or space")
+
 
 def _ensure_folder(folder):
     Path(folder).mkdir(parents=True, exist_ok=True)
 
 
-def save_macro(name, events, folder=DEFAULT_FOLDER):
+def _macro_path(name, folder):
+    """Return the existing file for a macro in whichever format it was saved."""
+    stream_tmp = Path(folder) / f"{name}{FORMATS['stream']}.tmp"
+    if stream_tmp.exists():
+        _recover_stream(stream_tmp)
+    for suffix in MACRO_SUFFIXES:
+        path = Path(folder) / f"{name}{suffix}"
+        if path.exists():
+            return path
+    return None
+
+
+def _remove_other_formats(name, folder, keep):
+    # A macro name maps to exactly one file, whatever its format
+    for suffix in MACRO_SUFFIXES:
+        path = Path(folder) / f"{name}{suffix}"
+        if path != keep and path.exists():
+            path.unlink()
+
+
+def _forget(path):
+    # Writes within one mtime tick could otherwise look unchanged to the
+    # index or the cache, so drop both explicitly
+    index = _indexes.get(Path(path).parent.resolve())
+    if index is not None:
+        index.forget(Path(path).name)
+    macro_cache.invalidate(path)
+
+
+def _recover_stream(tmp):
+    """Move a stream recording left behind by a crash into place, or drop it if it holds no events.
+
+    Recordings still being written by this process are left alone.
+    """
+    if tmp.resolve() in _live_streams:
+        return
+    path = tmp.with_name(tmp.name[:-len(".tmp")])
+    try:
+        with open(tmp, "r", encoding="utf-8") as f:
+            f.readline()
+            has_events = f.readline().endswith("\n")
+        if has_events:
+            os.replace(tmp, path)
+        else:
+            tmp.unlink()
+    except OSError:
+        return  # gone already, or still open in another process (Windows)
+    if has_events:
+        _remove_other_formats(path.stem, tmp.parent, keep=path)
+        _forget(path)
+
+
+def _atomic_write(path, write):
+    """Call write(tmp_path), fsync it and rename over path, so readers see the old file or the new one."""
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        write(tmp)
+        with open(tmp, "rb+") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        raise
+
+
+def save_macro(name, events, folder=DEFAULT_FOLDER, fmt="json", codec="zlib", resolution=DEFAULT_RESOLUTION,
+               created=None):
+    """Write a macro in format fmt, replacing any file of the same name.
+
+    codec ("zlib" or "lzma") and resolution (seconds per timestamp tick)
+    only apply to the compressed format. created (an ISO timestamp)
+    defaults to now; pass the old one when rewriting a macro.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown macro format '{fmt}'")
+    check_name(name)
     _ensure_folder(folder)
-    data = {
-        "name": name,
-        "created": datetime.now().isoformat(timespec="seconds"),
-        "events": events,
-    }
-    path = Path(folder) / f"{name}.json"
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+    if created is None:
+        created = datetime.now().isoformat(timespec="seconds")
+    path = Path(folder) / f"{name}{FORMATS[fmt]}"
+    if fmt == "binary":
+        cols = MacroColumns.from_events(events, name=name, created=created)
+        _atomic_write(path, lambda tmp: write_columns(tmp, cols))
+    elif fmt == "compressed":
+        cols = MacroColumns.from_events(events, name=name, created=created)
+        _atomic_write(path, lambda tmp: write_compressed(tmp, cols, codec=codec, resolution=resolution))
+    elif fmt == "stream":
+        # Append-only already: a torn last line is skipped on load
+        writer = StreamWriter(name, folder, created=created)
+        writer.write(events)
+        writer.close()
+    else:
+        data = {
+            "name": name,
+            "created": created,
+            "events": events,
+        }
+
+        def write(tmp):
+            # Compact: pretty-printing dominates save time for big macros
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+
+        _atomic_write(path, write)
+    _remove_other_formats(name, folder, keep=path)
+    _forget(path)
     return path
 
 
 def load_macro(name, folder=DEFAULT_FOLDER):
-    path = Path(folder) / f"{name}.json"
+    """Load a macro's events as a list of dicts, whatever its on-disk format."""
+    path = _macro_path(name, folder)
+    if path is None:
+        raise FileNotFoundError(f"Macro '{name}' not found in {folder}")
+    if path.suffix in _COLUMN_SUFFIXES:
+        return _load_binary(path).to_events()
+    if path.suffix == FORMATS["stream"]:
+        return _load_stream(path)
+    return _load_json(path)
+
+
+def load_stored(name, folder=DEFAULT_FOLDER):
+    """Load a macro's events plus the save_macro options that write it back as stored.
+
+    The options are fmt and created and, for compressed files, codec and
+    resolution, so rewriting a macro keeps its format and creation time.
+    """
+    path = _macro_path(name, folder)
+    if path is None:
+        raise FileNotFoundError(f"Macro '{name}' not found in {folder}")
+    fmt = next(f for f, suffix in FORMATS.items() if suffix == path.suffix)
+    if path.suffix in _COLUMN_SUFFIXES:
+        cols = _load_binary(path)
+        events, created = cols.to_events(), cols.created
+    elif path.suffix == FORMATS["stream"]:
+        events = _load_stream(path)
+        with open(path, "r", encoding="utf-8") as f:
+            created = json.loads(f.readline()).get("created")
+    else:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            events, created = data["events"], data.get("created")
+        except (KeyError, TypeError, AttributeError, json.JSONDecodeError) as e:
+            raise ValueError(f"Macro file '{path.name}' is corrupt: {e}")
+    options = {"fmt": fmt, "created": created or None}
+    if fmt == "compressed":
+        try:
+            options["codec"], options["resolution"] = read_compressed_options(path)
+        except ValueError as e:
+            raise ValueError(f"Macro file '{path.name}' is corrupt: {e}")
+    return events, options
+
+
+def load_columns(name, folder=DEFAULT_FOLDER):
+    """Load a macro as MacroColumns. Binary and compressed files are read without building event dicts."""
+    path = _macro_path(name, folder)
+    if path is None:
+        raise FileNotFoundError(f"Macro '{name}' not found in {folder}")
+    if path.suffix in _COLUMN_SUFFIXES:
+        return _load_binary(path)
+    return _compile_source(path, lambda events: MacroColumns.from_events(events, name=name))
+
+
+def load_compiled(name, compile, folder=DEFAULT_FOLDER):
+    """compile(source) for a stored macro, e.g. with plan.compile_events.
+
+    source is the cheapest input compile_events takes: MacroColumns for
+    binary and compressed files (read without building event dicts), the
+    event list for JSON and stream files (never converted to columns
+    first). Events missing a field or holding the wrong type raise
+    ValueError, like any other corrupt file.
+    """
+    path = _macro_path(name, folder)
+    if path is None:
+        raise FileNotFoundError(f"Macro '{name}' not found in {folder}")
+    return _compile_source(path, compile)
+
+
+def _compile_source(path, compile):
+    if path.suffix in _COLUMN_SUFFIXES:
+        source = _load_binary(path)
+    elif path.suffix == FORMATS["stream"]:
+        source = _load_stream(path)
+    else:
+        source = _load_json(path)
+    try:
+        return compile(source)
+    except (KeyError, TypeError, IndexError, AttributeError) as e:
+        raise ValueError(f"Macro file '{path.name}' is corrupt: {type(e).__name__}: {e}")
+
+
+_COLUMN_SUFFIXES = (FORMATS["binary"], FORMATS["compressed"])
+
+
+def _load_binary(path):
+    try:
+        if path.suffix == FORMATS["compressed"]:
+            return read_compressed(path)
+        return read_columns(path)
+    except (ValueError, KeyError, IndexError) as e:
+        raise ValueError(f"Macro file '{path.name}' is corrupt: {e}")
+
+
+def _load_json(path):
     try:
         with open(path, "r", encoding="utf-8") as f:
             data = json.load(f)
         return data["events"]
-    except FileNotFoundError:
-        raise FileNotFoundError(f"Macro '{name}' not found in {folder}")
-    except (KeyError, json.JSONDecodeError) as e:
-        raise ValueError(f"Macro file '{name}.json' is corrupt: {e}")
+    except (KeyError, TypeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Macro file '{path.name}' is corrupt: {e}")
+
+
+def _load_stream(path):
+    with open(path, "r", encoding="utf-8") as f:
+        lines = f.read().split("\n")
+    # A crash mid-write can leave a partial last line; everything before it is intact
+    complete = lines[:-1]
+    try:
+        json.loads(complete[0])
+        events = [json.loads(line) for line in complete[1:]]
+    except (IndexError, json.JSONDecodeError) as e:
+        raise ValueError(f"Macro file '{path.name}' is corrupt: {e}")
+    return events
+
+
+_TYPE_NAMES = {TYPE_CLICK: "click", TYPE_SCROLL: "scroll", TYPE_KEY: "key", TYPE_MOVE: "move"}
+
+_indexes = {}  # resolved folder -> MacroIndex
+_live_streams = set()  # resolved .tmp paths of StreamWriters open in this process
+
+
+def _index_for(folder):
+    key = Path(folder).resolve()
+    index = _indexes.get(key)
+    if index is None:
+        index = _indexes[key] = MacroIndex(key, MACRO_SUFFIXES, _describe)
+    return index
+
+
+def _describe(path):
+    """Parse one macro file into the metadata kept by the library index."""
+    try:
+        if path.suffix in _COLUMN_SUFFIXES:
+            cols = _load_binary(path)
+            created = cols.created
+            times = cols.t
+            types = {}
+            for code in cols.type:
+                types[code] = types.get(code, 0) + 1
+            types = {_TYPE_NAMES[code]: n for code, n in types.items()}
+        else:
+            if path.suffix == FORMATS["stream"]:
+                with open(path, "r", encoding="utf-8") as f:
+                    created = json.loads(f.readline()).get("created", "")
+                events = _load_stream(path)
+            else:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                created = data.get("created", "")
+                events = data["events"]
+            times = [e["t"] for e in events]
+            types = {}
+            for e in events:
+                types[e["type"]] = types.get(e["type"], 0) + 1
+    except Exception as e:
+        print(f"Warning: skipping corrupt file {path}")
+        return {"valid": False, "error": str(e)}
+    return {
+        "valid": True,
+        "events": len(times),
+        "duration": round(times[-1] - times[0], 4) if len(times) else 0.0,
+        "created": created,
+        "types": types,
+    }
+
+
+def list_macro_info(folder=DEFAULT_FOLDER):
+    """Return index metadata for every macro file, sorted by name, without loading events.
+
+    Each dict has "name", "valid" and, for valid files, "events",
+    "duration", "created" and a per-type "types" histogram.
+    """
+    if Path(folder).is_dir():
+        for tmp in Path(folder).glob(f"*{FORMATS['stream']}.tmp"):
+            _recover_stream(tmp)
+    entries = _index_for(folder).refresh()
+    infos = [{"name": Path(filename).stem, **entry} for filename, entry in entries.items()]
+    return sorted(infos, key=lambda info: info["name"])
+
+
+def macro_info(name, folder=DEFAULT_FOLDER):
+    """Index metadata for one macro, re-read from disk now; None if it does not exist."""
+    path = _macro_path(name, folder)
+    if path is None:
+        return None
+    entry = _index_for(folder).update(path.name)
+    return {"name": name, **entry} if entry is not None else None
 
 
 def list_macros(folder=DEFAULT_FOLDER):
-    folder = Path(folder)
-    if not folder.exists():
-        return []
-    macros = []
-    for p in sorted(folder.glob("*.json")):
+    return sorted({info["name"] for info in list_macro_info(folder) if info["valid"]})
+
+
+class StreamWriter:
+    """Append-only writer for .jsonl macros.
+
+    The first line is a {"name", "created"} header and every following line
+    is one event, so a file cut short by a crash still loads up to its last
+    complete line. Each write() is flushed and fsynced before returning.
+
+    Lines go to `<path>.tmp` until close() renames it over path and removes
+    the macro's files in other formats, so an existing macro of the same
+    name survives until the new one is complete. close(keep=False)
+    discards it instead. A .tmp left behind by a crash is moved into place
+    the next time the macro is looked up or the folder is listed, and
+    before a new recording of the same name starts, so it is never lost.
+    """
+
+    def __init__(self, name, folder=DEFAULT_FOLDER, created=None):
+        check_name(name)
+        _ensure_folder(folder)
+        self._name = name
+        self._folder = folder
+        self.path = Path(folder) / f"{name}{FORMATS['stream']}"
+        self._tmp = self.path.with_name(self.path.name + ".tmp")
+        self.count = 0  # events written so far
+        if self._tmp.exists():
+            _recover_stream(self._tmp)
         try:
-            with open(p, "r", encoding="utf-8") as f:
-                json.load(f)
-            macros.append(p.stem)
-        except Exception:
-            print(f"Warning: skipping corrupt file {p}")
-    return macros
+            self._file = open(self._tmp, "x", encoding="utf-8")
+        except FileExistsError:
+            raise ValueError(f"Macro '{name}' is already being recorded")
+        _live_streams.add(self._tmp.resolve())
+        header = {"name": name, "created": created or datetime.now().isoformat(timespec="seconds")}
+        self._file.write(json.dumps(header) + "\n")
+        self._file.flush()
+
+    def write(self, events):
+        self._file.write("".join(json.dumps(e, separators=(",", ":")) + "\n" for e in events))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.count += len(events)
+
+    def close(self, keep=True):
+        self._file.close()
+        _live_streams.discard(self._tmp.resolve())
+        if not keep:
+            try:
+                self._tmp.unlink()
+            except FileNotFoundError:
+                pass
+            return
+        try:
+            os.replace(self._tmp, self.path)
+        except FileNotFoundError:
+            pass  # another process recovered it into place meanwhile
+        _remove_other_formats(self._name, self._folder, keep=self.path)
+        _forget(self.path)
+
+
+def convert_macro(name, fmt, folder=DEFAULT_FOLDER, **options):
+    """Rewrite a stored macro in another format, replacing the original file.
+
+    options (codec, resolution) are passed on to save_macro.
+    """
+    return save_macro(name, load_macro(name, folder), folder=folder, fmt=fmt, **options)
 
 
 def delete_macro(name, folder=DEFAULT_FOLDER):
-    path = Path(folder) / f"{name}.json"
-    if path.exists():
-        path.unlink()
+    for suffix in MACRO_SUFFIXES:
+        path = Path(folder) / f"{name}{suffix}"
+        if path.exists():
+            path.unlink()
+            _forget(path)
+
+
+# ── background saving ───────────────────────────────────────────────────────
+
+class MacroSaver:
+    """Saves macros on one worker thread so the caller (the Tk loop) never blocks.
+
+    save() serializes, writes and atomically renames the file on the
+    worker, then re-indexes just that file and calls on_done(info, error)
+    from the worker thread: info is the macro's index entry (as in
+    list_macro_info) on success, error the exception otherwise. Saves run
+    one at a time, and a second save of a name still being saved is refused.
+    """
+
+    def __init__(self):
+        from concurrent.futures import ThreadPoolExecutor
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="macro-save")
+        self._lock = threading.Lock()
+        self._pending = set()
+
+    def is_saving(self, name=None):
+        with self._lock:
+            return bool(self._pending) if name is None else name in self._pending
+
+    def save(self, name, events, folder=DEFAULT_FOLDER, fmt="json", on_done=None, **options):
+        """Queue a save; returns a Future. Raises RuntimeError if name is already being saved.
+
+        options (codec, resolution) are passed on to save_macro.
+        """
+        return self.submit(name, lambda: save_macro(name, events, folder=folder, fmt=fmt, **options),
+                           folder=folder, on_done=on_done)
+
+    def submit(self, name, write, folder=DEFAULT_FOLDER, on_done=None):
+        """Queue write(), which rewrites macro name's file in folder, exactly like save()."""
+        with self._lock:
+            if name in self._pending:
+                raise RuntimeError(f"Macro '{name}' is already being saved")
+            self._pending.add(name)
+        return self._pool.submit(self._run, name, write, folder, on_done)
+
+    def _run(self, name, write, folder, on_done):
+        info = error = None
+        try:
+            write()
+            info = macro_info(name, folder)
+        except Exception as e:
+            error = e
+        finally:
+            with self._lock:
+                self._pending.discard(name)
+        if on_done is not None:
+            on_done(info, error)
+        if error is not None:
+            raise error
+        return info
+
+    def shutdown(self, wait=True):
+        """Finish queued saves (wait=True) and stop the worker."""
+        self._pool.shutdown(wait=wait)
+
+
+# ── cache ───────────────────────────────────────────────────────────────────
+
+DEFAULT_CACHE_BUDGET = 256 * 1024 * 1024
+_EVENT_DICT_COST = 400  # rough bytes per event dict, for values without nbytes()
+
+
+def _estimate_size(value):
+    nbytes = getattr(value, "nbytes", None)
+    if nbytes is not None:
+        return nbytes()
+    try:
+        return len(value) * _EVENT_DICT_COST
+    except TypeError:
+        return _EVENT_DICT_COST
+
+
+class MacroCache:
+    """LRU cache of loaded macros, validated against the file's mtime and size.
+
+    get() returns the cached value while the file is unchanged on disk and
+    reloads it otherwise. transform, if given, is applied to the loaded
+    macro as in load_compiled (e.g. compile_events) and its result is what gets cached,
+    keyed separately per transform. Least recently used entries are evicted
+    once the estimated size of everything cached exceeds budget bytes.
+    """
+
+    def __init__(self, budget=DEFAULT_CACHE_BUDGET):
+        self.budget = budget
+        self._entries = OrderedDict()  # (path, transform) -> (mtime_ns, size, value, cost)
+        self._used = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, name, folder=DEFAULT_FOLDER, transform=None):
+        path = _macro_path(name, folder)
+        if path is None:
+            raise FileNotFoundError(f"Macro '{name}' not found in {folder}")
+        st = path.stat()
+        key = (str(path.resolve()), transform)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+        if transform is not None:
+            value = _compile_source(path, transform)
+        else:
+            value = load_columns(name, folder)
+        self._put(key, st, value)
+        return value
+
+    def invalidate(self, path):
+        """Drop every cached value loaded from path."""
+        resolved = str(Path(path).resolve())
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == resolved]:
+                self._used -= self._entries.pop(key)[3]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._used = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._used,
+                "budget": self.budget,
+            }
+
+    def _put(self, key, st, value):
+        cost = _estimate_size(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._used -= old[3]
+            if cost > self.budget:
+                return
+            self._entries[key] = (st.st_mtime_ns, st.st_size, value, cost)
+            self._used += cost
+            while self._used > self.budget:
+                _, evicted = self._entries.popitem(last=False)
+                self._used -= evicted[3]
+                self.evictions += 1
+
+
+macro_cache = MacroCache()
+
+
+def load_macro_cached(name, folder=DEFAULT_FOLDER, transform=None):
+    """load_compiled(name, transform), or load_columns without one, memoized in macro_cache."""
+    return macro_cache.get(name, folder, transform)
@@ -0,0 +1,93 @@
+# src/optimizer.py
+# Optimizer pass over recorded events, run between Recorder.stop() and
+# save_macro (and as `python -m src optimize` on stored macros). Every rule
+# keeps what the target application sees the same, except collapsing key
+# auto-repeat, which changes behaviour for apps that act on repeats and is
+# therefore opt-in.
+from src.macro_store import DEFAULT_FOLDER, load_stored, save_macro
+
+SCROLL_MERGE_WINDOW = 0.1     # seconds; adjacent scrolls further apart stay separate
+EST_DISPATCH_COST = 0.0005    # seconds per backend call, for the dispatch-cost estimate
+
+
+def optimize(events, collapse_repeats=False, merge_scrolls=True, drop_moves=True,
+             scroll_window=SCROLL_MERGE_WINDOW):
+    """Return (events, stats) with redundant events removed.
+
+    collapse_repeats: drop OS auto-repeat, i.e. presses of a key that is
+        already held, keeping the first press and the release.
+    merge_scrolls: fold a run of adjacent scrolls at the same x/y, each within
+        scroll_window of the previous one, into one scroll with summed dx/dy.
+    drop_moves: drop move events that never take the cursor anywhere new.
+    The input list is not modified. stats["saved_s"] estimates only the
+    backend calls no longer made: removing events does not shorten the
+    recorded timeline, and the player already skips moves that go nowhere.
+    """
+    out = []
+    held = set()
+    cursor = None
+    key_repeats = merged = moves = 0
+    for event in events:
+        kind = event.get("type")
+        if kind == "key":
+            key = event["key"]
+            if event["pressed"]:
+                if collapse_repeats and key in held:
+                    key_repeats += 1
+                    continue
+                held.add(key)
+            else:
+                held.discard(key)
+        elif kind == "scroll":
+            pos = (event["x"], event["y"])
+            prev = out[-1] if out else None
+            if (merge_scrolls and prev is not None and prev.get("type") == "scroll"
+                    and (prev["x"], prev["y"]) == pos
+                    and event["t"] - prev["_last_t"] <= scroll_window):
+                prev["dx"] += event["dx"]
+                prev["dy"] += event["dy"]
+                prev["_last_t"] = event["t"]
+                merged += 1
+                continue
+            event = dict(event, _last_t=event["t"])
+            cursor = pos
+        elif kind == "click":
+            cursor = (event["x"], event["y"])
+        elif kind == "move":
+            path = event.get("path") or []
+            if drop_moves and all((p[0], p[1]) == cursor for p in path):
+                moves += 1
+                continue
+            if path:
+                cursor = (path[-1][0], path[-1][1])
+        out.append(event)
+
+    for event in out:
+        event.pop("_last_t", None)
+    removed = len(events) - len(out)
+    stats = {
+        "before": len(events),
+        "after": len(out),
+        "removed": removed,
+        "key_repeats": key_repeats,
+        "scrolls_merged": merged,
+        "moves_dropped": moves,
+        "saved_s": round(removed * EST_DISPATCH_COST, 4),
+    }
+    return out, stats
+
+
+def format_stats(stats):
+    """One line for the status bar / CLI."""
+    return (f"removed {stats['removed']} of {stats['before']} events "
+            f"({stats['key_repeats']} key repeats, {stats['scrolls_merged']} scrolls merged, "
+            f"{stats['moves_dropped']} moves), ~{stats['saved_s'] * 1000:.1f} ms of dispatch cost saved")
+
+
+def optimize_macro(name, folder=DEFAULT_FOLDER, dry_run=False, **options):
+    """Optimize a stored macro in place, keeping its format, compression and creation time. Returns the stats."""
+    events, stored = load_stored(name, folder)
+    events, stats = optimize(events, **options)
+    if stats["removed"] and not dry_run:
+        save_macro(name, events, folder=folder, **stored)
+    return stats
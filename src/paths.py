@@ -0,0 +1,54 @@
+# src/paths.py
+# Mouse path simplification and interpolation. A path is a list of
+# (x, y, t) points. Simplification is Douglas–Peucker measured with the
+# synchronized Euclidean distance: how far a point is from where the cursor
+# would be *at that time* moving linearly between the kept neighbours, so
+# pauses and speed changes along a straight line survive.
+
+
+def simplify(points, tolerance):
+    """Return the subset of points needed to stay within tolerance pixels."""
+    n = len(points)
+    if n < 3:
+        return list(points)
+    keep = [False] * n
+    keep[0] = keep[-1] = True
+    tol2 = tolerance * tolerance
+    stack = [(0, n - 1)]
+    while stack:
+        a, b = stack.pop()
+        ax, ay, at = points[a]
+        bx, by, bt = points[b]
+        span = bt - at
+        worst, worst_d = -1, tol2
+        for i in range(a + 1, b):
+            x, y, t = points[i]
+            r = (t - at) / span if span > 0 else 0.0
+            dx = x - (ax + (bx - ax) * r)
+            dy = y - (ay + (by - ay) * r)
+            d = dx * dx + dy * dy
+            if d > worst_d:
+                worst, worst_d = i, d
+        if worst >= 0:
+            keep[worst] = True
+            stack.append((a, worst))
+            stack.append((worst, b))
+    return [p for p, k in zip(points, keep) if k]
+
+
+def interpolate(path, step):
+    """Expand a simplified path back into (x, y, t) samples every `step` seconds.
+
+    Every original vertex is kept; step <= 0 returns the vertices only.
+    """
+    if not path:
+        return []
+    out = [tuple(path[0])]
+    for (ax, ay, at), (bx, by, bt) in zip(path, path[1:]):
+        span = bt - at
+        if step > 0 and span > step:
+            for j in range(1, int(span / step)):
+                r = j * step / span
+                out.append((round(ax + (bx - ax) * r), round(ay + (by - ay) * r), at + j * step))
+        out.append((bx, by, bt))
+    return out
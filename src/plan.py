@@ -0,0 +1,197 @@
+# src/plan.py
+from array import array
+from bisect import bisect_left
+from pynput.keyboard import Key, KeyCode
+from pynput.mouse import Button
+
+from src.macro_binary import MacroColumns, FLAG_PRESSED
+from src.paths import interpolate
+
+# Opcodes stored in Plan.ops
+OP_CLICK = 0
+OP_SCROLL = 1
+OP_KEY = 2
+OP_MOVE = 3
+
+_OPCODES = {"click": OP_CLICK, "scroll": OP_SCROLL, "key": OP_KEY, "move": OP_MOVE}
+
+DEFAULT_MOVE_STEP = 0.01  # seconds between interpolated cursor updates
+CHECKPOINT_ROWS = 4096    # rows between held-state snapshots used for seeking
+
+
+def parse_key(key_str):
+    """Resolve a recorded key name ('enter', 'a', ...) to a pynput key."""
+    try:
+        return Key[key_str]
+    except KeyError:
+        pass
+    return KeyCode.from_char(key_str[0]) if key_str else KeyCode.from_char(" ")
+
+
+class Plan:
+    """A macro pre-parsed into flat columns for fast, repeatable playback.
+
+    Row i of the plan is described by ops[i], offsets[i] (seconds since the
+    first event), xs[i]/ys[i] (integer cursor position, mouse ops only),
+    pressed[i] and args[i], which holds the resolved pynput Button or key
+    object, or a (dx, dy) tuple for scrolls. Recorded move paths are
+    expanded into one OP_MOVE row per interpolated cursor position.
+
+    offsets is sorted, so it doubles as the timestamp index for seeking:
+    row_at(t) bisects it and state_at(row) gives the keys, buttons and
+    cursor position a seek to that row has to restore.
+    """
+
+    __slots__ = ("ops", "offsets", "xs", "ys", "pressed", "args", "duration", "_checkpoints")
+
+    def __init__(self):
+        self.ops = array("b")
+        self.offsets = array("d")
+        self.xs = array("i")
+        self.ys = array("i")
+        self.pressed = array("b")
+        self.args = []
+        self.duration = 0.0
+        self._checkpoints = None
+
+    def __len__(self):
+        return len(self.ops)
+
+    def row_at(self, t):
+        """Index of the first row at or after offset t (seconds); len(plan) if t is past the end."""
+        return bisect_left(self.offsets, t)
+
+    def state_at(self, row):
+        """(held keys, held buttons, cursor) just before row runs; cursor is None before any mouse row.
+
+        Snapshots every CHECKPOINT_ROWS rows are built on the first call, so
+        later seeks replay at most that many rows.
+        """
+        if self._checkpoints is None:
+            self._checkpoints = [(frozenset(), frozenset(), None)]
+            self._replay(0, len(self), checkpoint=True)
+        base = min(row // CHECKPOINT_ROWS, len(self._checkpoints) - 1)
+        return self._replay(base * CHECKPOINT_ROWS, row)
+
+    def _replay(self, first, last, checkpoint=False):
+        keys, buttons, cursor = self._checkpoints[first // CHECKPOINT_ROWS]
+        keys, buttons = set(keys), set(buttons)
+        ops, pressed, args, xs, ys = self.ops, self.pressed, self.args, self.xs, self.ys
+        for i in range(first, last):
+            if checkpoint and i and i % CHECKPOINT_ROWS == 0:
+                self._checkpoints.append((frozenset(keys), frozenset(buttons), cursor))
+            op = ops[i]
+            if op == OP_KEY:
+                (keys.add if pressed[i] else keys.discard)(args[i])
+                continue
+            cursor = (xs[i], ys[i])
+            if op == OP_CLICK:
+                (buttons.add if pressed[i] else buttons.discard)(args[i])
+        return keys, buttons, cursor
+
+    def nbytes(self):
+        """Approximate memory held by the plan (arrays plus one pointer per arg)."""
+        arrays = (self.ops, self.offsets, self.xs, self.ys, self.pressed)
+        return sum(a.itemsize * len(a) for a in arrays) + 8 * len(self.args)
+
+
+def compile_events(events, move_step=DEFAULT_MOVE_STEP):
+    """Compile a recorded event list into a Plan. Unknown event types are skipped.
+
+    events may also be a MacroColumns, which is compiled column-wise
+    without materializing event dicts. move_step is the interval at which
+    move paths are interpolated.
+    """
+    if isinstance(events, MacroColumns):
+        return _compile_columns(events, move_step)
+    plan = Plan()
+    if not events:
+        return plan
+    base_t = events[0]["t"]
+    keys = {}  # key name -> resolved key, so repeated keys are parsed once
+    for event in events:
+        op = _OPCODES.get(event.get("type"))
+        if op is None:
+            continue
+        if op == OP_MOVE:
+            for px, py, pt in interpolate(event["path"], move_step):
+                plan.ops.append(OP_MOVE)
+                plan.offsets.append(pt - base_t)
+                plan.xs.append(int(px))
+                plan.ys.append(int(py))
+                plan.pressed.append(0)
+                plan.args.append(None)
+            continue
+        x = y = 0
+        pressed = False
+        if op == OP_CLICK:
+            try:
+                arg = Button[event["button"]]
+            except KeyError:
+                raise ValueError(f"Unknown mouse button {event['button']!r}")
+            x, y = int(event["x"]), int(event["y"])
+            pressed = event["pressed"]
+        elif op == OP_SCROLL:
+            arg = (event["dx"], event["dy"])
+            x, y = int(event["x"]), int(event["y"])
+        else:
+            name = event["key"]
+            arg = keys.get(name)
+            if arg is None:
+                arg = keys[name] = parse_key(name)
+            pressed = event["pressed"]
+        plan.ops.append(op)
+        plan.offsets.append(event["t"] - base_t)
+        plan.xs.append(x)
+        plan.ys.append(y)
+        plan.pressed.append(1 if pressed else 0)
+        plan.args.append(arg)
+    if plan.offsets:
+        plan.duration = plan.offsets[-1]
+    return plan
+
+
+def _compile_columns(cols, move_step):
+    plan = Plan()
+    n = len(cols)
+    if not n:
+        return plan
+    if OP_MOVE not in cols.type:
+        # Fast path: the columns already line up with the plan's
+        base_t = cols.t[0]
+        plan.ops = array("b", cols.type)
+        plan.offsets = array("d", [t - base_t for t in cols.t])
+        plan.xs = array("i", cols.x)
+        plan.ys = array("i", cols.y)
+        plan.pressed = array("b", [f & FLAG_PRESSED for f in cols.flags])
+        resolved = _resolve_strings(cols)
+        plan.args = [
+            (a, b) if op == OP_SCROLL else resolved[op, code]
+            for op, code, a, b in zip(cols.type, cols.code, cols.a, cols.b)
+        ]
+        plan.duration = plan.offsets[-1]
+        return plan
+    return compile_events(cols.to_events(), move_step)
+
+
+def _resolve_strings(cols):
+    """Map (opcode, string index) to pynput objects.
+
+    Buttons and keys share the string table, and a name like "left" means
+    different things for each, so the opcode is part of the key.
+    """
+    resolved = {}
+    for op, code in zip(cols.type, cols.code):
+        if (op, code) in resolved:
+            continue
+        if op == OP_CLICK:
+            name = cols.strings[code]
+            try:
+                resolved[op, code] = Button[name]
+            except KeyError:
+                raise ValueError(f"Unknown mouse button {name!r}")
+        elif op == OP_KEY:
+            resolved[op, code] = parse_key(cols.strings[code])
+        else:
+            resolved[op, code] = None
+    return resolved
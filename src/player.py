@@ -1,79 +1,255 @@
 # src/player.py
 import time
 import threading
-from pynput import mouse, keyboard
-from pynput.keyboard import Key, KeyCode
+
 from pynput.mouse import Button
 
+from src.backends import PynputBackend
+from src.plan import Plan, OP_CLICK, OP_SCROLL, OP_KEY, OP_MOVE, compile_events, parse_key
+from src.scheduler import Scheduler, DEFAULT_SPIN_NS
+from src.timing import Timing
+
+DEFAULT_SETTLE = 0.01  # seconds
+# The cursor is only known to be where playback last put it for a short
+# while: after a longer gap the user may have moved the mouse, so the next
+# mouse event repositions even if playback's last move went to its spot
+CURSOR_TRUST_NS = 250_000_000
+_UNIFORM = Timing()
+
 
 class Player:
-    """Replays a recorded event list."""
+    """Replays a recorded event list or a pre-compiled Plan."""
 
-    def __init__(self):
-        self._mouse = mouse.Controller()
-        self._keyboard = keyboard.Controller()
+    def __init__(self, precise=True, settle=DEFAULT_SETTLE, backend=None, telemetry=None):
+        # settle: seconds between moving the cursor and clicking/scrolling
+        # there, giving the OS time to deliver the move. 0 = throughput mode.
+        # backend: where input is sent; defaults to real pynput input.
+        # telemetry: optional Telemetry that records per-event timing.
+        self._backend = backend if backend is not None else PynputBackend()
+        self.telemetry = telemetry
         self._stop_event = threading.Event()
+        self._scheduler = Scheduler(self._stop_event, spin_ns=DEFAULT_SPIN_NS if precise else 0)
+        self._settle_ns = int(settle * 1e9)
+        # (iteration, row) the last play() stopped before, or None if it finished
+        self.position = None
+
+    def play(self, events, speed=1.0, repeat=1, on_iteration=None, timing=None, start=0.0, end=None,
+             resume=None):
+        """Play events (or a compiled Plan) `repeat` times.
+
+        All repetitions share one absolute perf_counter_ns timeline, so
+        iteration N+1 starts exactly one macro duration after iteration N
+        regardless of dispatch overhead. on_iteration(i) is called from the
+        playing thread as each iteration begins.
+
+        The cursor is moved `settle` ahead of each mouse event's deadline so
+        the press itself still lands on time; moves to the position the
+        cursor was already sent to are skipped, unless more than
+        CURSOR_TRUST_NS has passed since the previous event (the user may
+        have moved the mouse meanwhile).
+
+        timing is an optional Timing that compresses gaps beyond the uniform
+        speed divisor (see src/timing.py).
+
+        start and end (seconds into the recording) limit playback to the
+        rows in [start, end), and repeats loop that range. Keys and buttons
+        held and the cursor position at the range start are restored before
+        its first row. resume takes a previous `position` and continues from
+        that iteration and row, so a stopped (paused) play can pick up where
+        it left off; pass the same start, end and repeat as before.
 
-    def play(self, events, speed=1.0):
-        if not events:
-            return
+        Returns False if stopped before the end, True otherwise; when
+        stopped, `position` says where.
+        """
+        # Compile once up front; callers that repeat a macro should pass the
+        # Plan itself so the parsing cost is not paid on every call.
+        plan = events if isinstance(events, Plan) else compile_events(events)
+        if not plan:
+            self.position = None
+            return True
         self._stop_event.clear()
-        held_keys = set()
-        base_t = events[0]["t"]
-        play_start = time.time()
-
-        for event in events:
-            if self._stop_event.is_set():
-                break
-            target_elapsed = (event["t"] - base_t) / speed
-            now_elapsed = time.time() - play_start
-            wait = target_elapsed - now_elapsed
-            if wait > 0:
-                if self._stop_event.wait(wait):
-                    break
-            self._dispatch(event, held_keys)
-
-        # Release any keys still held at end/abort
-        for key in list(held_keys):
-            try:
-                self._keyboard.release(key)
-            except Exception:
-                pass
+        if self.telemetry is not None:
+            self.telemetry.reset()
+        lo = plan.row_at(start) if start > 0 else 0
+        hi = plan.row_at(end) if end is not None else len(plan)
+        if resume is not None:
+            iteration, row = resume
+            return self._play(plan, speed, repeat, on_iteration, timing, lo, hi, max(lo, row), iteration)
+        return self._play(plan, speed, repeat, on_iteration, timing, lo, hi)
+
+    def play_steps(self, steps, speed=1.0, timing=None, on_step=None):
+        """Play a sequence of (plan, repeat, speed, delay) steps back to back.
+
+        steps may be a lazy generator (see src/playlist.py); each step is
+        only pulled once the previous one has finished. delay is slept, on
+        the stop event, before the step starts; the step's speed multiplies
+        `speed`. on_step(k) is called as step k begins. A step whose plan is
+        None (a macro that failed to load) is skipped. Telemetry covers the
+        whole sequence. Returns False if stopped before the end.
+        """
+        self._stop_event.clear()
+        if self.telemetry is not None:
+            self.telemetry.reset()
+        try:
+            for k, (plan, repeat, step_speed, delay) in enumerate(steps):
+                if plan is None:
+                    continue
+                if delay > 0 and not self._scheduler.wait_until(time.perf_counter_ns() + int(delay * 1e9)):
+                    return False
+                if self._stop_event.is_set():
+                    return False  # stopped while the step was loading
+                if on_step is not None:
+                    on_step(k)
+                if plan and not self._play(plan, speed * step_speed, repeat, None, timing):
+                    return False
+            return True
+        finally:
+            close = getattr(steps, "close", None)
+            if close is not None:
+                close()
+
+    def _play(self, plan, speed, repeat, on_iteration, timing, lo=0, hi=None, first=None, first_iteration=0):
+        # Plays rows [lo, hi) per iteration; the first iteration played
+        # (first_iteration) begins at row `first` instead of lo
+        n = len(plan)
+        hi = n if hi is None else hi
+        first = lo if first is None else first
+        if lo >= hi or first >= hi or first_iteration >= repeat:
+            self.position = None
+            return True
+        telemetry = self.telemetry
+        now = time.perf_counter_ns
+        held_keys = set()  # keys and buttons currently held down
+        ops, xs, ys = plan.ops, plan.xs, plan.ys
+        pressed, args = plan.pressed, plan.args
+        if timing is None:
+            timing = _UNIFORM
+        rel_ns = timing.schedule_ns(plan, speed, self._settle_ns / 1e9)
+        # A range lasts until its first excluded row is due
+        period_ns = (rel_ns[hi] if hi < n else rel_ns[-1]) - rel_ns[lo]
+        wait_until = self._scheduler.wait_until
+        dispatch = self._dispatch
+        move_to = self._move_to
+        settle_ns = self._settle_ns
+        cursor = None  # last position we moved to; unknown at start
+        # Leave room for the first move to settle before the first event
+        start_ns = now() + settle_ns - (rel_ns[first] - rel_ns[lo])
+        last_ns = start_ns  # deadline of the previous row, to notice long gaps
+        completed = False
+        it, i = first_iteration, first
+
+        try:
+            for it in range(first_iteration, repeat):
+                if on_iteration is not None:
+                    on_iteration(it)
+                row = first if it == first_iteration else lo
+                if row:
+                    cursor = self._restore(plan.state_at(row), held_keys, cursor)
+                base_ns = start_ns + (it - first_iteration) * period_ns - rel_ns[lo]
+                for i in range(row, hi):
+                    op = ops[i]
+                    deadline = base_ns + rel_ns[i]
+                    if deadline - last_ns > CURSOR_TRUST_NS:
+                        cursor = None
+                    last_ns = deadline
+                    if op == OP_MOVE:
+                        # Path samples move the cursor on time and need no settle
+                        if not wait_until(deadline):
+                            return False
+                        pos = (xs[i], ys[i])
+                        if pos != cursor:
+                            if telemetry is None:
+                                move_to(pos)
+                            else:
+                                t0 = now()
+                                ok = move_to(pos)
+                                telemetry.record(op, it, deadline, t0, now(), ok)
+                            cursor = pos
+                        continue
+                    if op != OP_KEY:
+                        pos = (xs[i], ys[i])
+                        if pos != cursor:
+                            if settle_ns and not wait_until(deadline - settle_ns):
+                                return False
+                            move_to(pos)
+                            cursor = pos
+                    if not wait_until(deadline):
+                        return False
+                    if telemetry is None:
+                        dispatch(op, pressed[i], args[i], held_keys)
+                    else:
+                        t0 = now()
+                        ok = dispatch(op, pressed[i], args[i], held_keys)
+                        telemetry.record(op, it, deadline, t0, now(), ok)
+                self._release_held(held_keys)
+            completed = True
+        finally:
+            # Release any keys still held at end/abort
+            self._release_held(held_keys)
+            self.position = None if completed else (it, i)
+            if telemetry is not None and not completed:
+                telemetry.skipped += (hi - i) + (repeat - it - 1) * (hi - lo)
+        return True
+
+    def _restore(self, state, held, cursor):
+        """Press what the recording holds at a seek point and move the cursor there; returns the cursor."""
+        keys, buttons, pos = state
+        if pos is not None and pos != cursor:
+            self._move_to(pos)
+            cursor = pos
+        for button in buttons:
+            self._dispatch(OP_CLICK, 1, button, held)
+        for key in keys:
+            self._dispatch(OP_KEY, 1, key, held)
+        return cursor
 
     def stop(self):
         self._stop_event.set()
 
     # ── dispatch ────────────────────────────────────────────────────────────
 
-    def _dispatch(self, event, held_keys):
-        t = event["type"]
+    def _move_to(self, pos):
+        try:
+            self._backend.move(pos)
+        except NotImplementedError:
+            return False
+        return True
+
+    def _dispatch(self, op, pressed, arg, held_keys):
+        backend = self._backend
         try:
-            if t == "click":
-                btn = Button[event["button"]]
-                self._mouse.position = (int(event["x"]), int(event["y"]))
-                time.sleep(0.01)
-                if event["pressed"]:
-                    self._mouse.press(btn)
+            if op == OP_CLICK:
+                if pressed:
+                    backend.press_button(arg)
+                    held_keys.add(arg)
                 else:
-                    self._mouse.release(btn)
-            elif t == "scroll":
-                self._mouse.position = (int(event["x"]), int(event["y"]))
-                time.sleep(0.01)
-                self._mouse.scroll(event["dx"], event["dy"])
-            elif t == "key":
-                key = self._parse_key(event["key"])
-                if event["pressed"]:
-                    self._keyboard.press(key)
-                    held_keys.add(key)
+                    backend.release_button(arg)
+                    held_keys.discard(arg)
+            elif op == OP_SCROLL:
+                backend.scroll(*arg)
+            elif op == OP_KEY:
+                if pressed:
+                    backend.press_key(arg)
+                    held_keys.add(arg)
                 else:
-                    self._keyboard.release(key)
-                    held_keys.discard(key)
+                    backend.release_key(arg)
+                    held_keys.discard(arg)
         except NotImplementedError:
-            pass
+            # The backend can't perform this action (e.g. pynput's dummy
+            # backend); telemetry counts it as a failed dispatch
+            return False
+        return True
+
+    def _release_held(self, held_keys):
+        for key in list(held_keys):
+            try:
+                if isinstance(key, Button):
+                    self._backend.release_button(key)
+                else:
+                    self._backend.release_key(key)
+            except Exception:
+                pass
+        held_keys.clear()
 
     def _parse_key(self, key_str):
-        try:
-            return Key[key_str]
-        except KeyError:
-            pass
-        return KeyCode.from_char(key_str[0]) if key_str else KeyCode.from_char(" ")
+        return parse_key(key_str)
@@ -0,0 +1,150 @@
+# src/playlist.py
+# Playlists chain macros A→B→C without merging them into one file. A
+# playlist is a small JSON file next to the macros (<name>.playlist) whose
+# entries name a macro plus its repeat count, speed and a delay before it
+# starts. iter_playlist() streams the compiled steps to Player.play_steps,
+# loading each macro just in time and prefetching the next one on a
+# background thread, so at most two macros are in memory however long the
+# playlist is.
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from src.macro_store import (DEFAULT_FOLDER, _atomic_write, _ensure_folder, _macro_path, check_name, list_macro_info,
+                             load_compiled)
+
+PLAYLIST_SUFFIX = ".playlist"
+_ENTRY_DEFAULTS = {"repeat": 1, "speed": 1.0, "delay": 0.0}
+
+
+def _playlist_path(name, folder):
+    return Path(folder) / f"{name}{PLAYLIST_SUFFIX}"
+
+
+def _normalize_entry(entry):
+    if isinstance(entry, str):
+        entry = {"macro": entry}
+    if not isinstance(entry, dict) or not isinstance(entry.get("macro"), str) or not entry["macro"]:
+        raise ValueError(f"Playlist entry needs a macro name: {entry!r}")
+    entry = {**_ENTRY_DEFAULTS, **entry}
+    try:
+        repeat, speed, delay = int(entry["repeat"]), float(entry["speed"]), float(entry["delay"])
+    except (TypeError, ValueError):
+        repeat = speed = delay = None
+    if repeat is None or repeat < 1 or speed <= 0 or delay < 0:
+        raise ValueError(f"Playlist entry for '{entry['macro']}' needs repeat >= 1, speed > 0 and delay >= 0")
+    return {"macro": entry["macro"], "repeat": repeat, "speed": speed, "delay": delay}
+
+
+def save_playlist(name, entries, folder=DEFAULT_FOLDER):
+    """Save entries (dicts with "macro" and optional repeat/speed/delay, or bare macro names)."""
+    check_name(name)
+    entries = [_normalize_entry(e) for e in entries]
+    _ensure_folder(folder)
+    path = _playlist_path(name, folder)
+    data = {
+        "name": name,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "entries": entries,
+    }
+
+    def write(tmp):
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+
+    _atomic_write(path, write)
+    return path
+
+
+def load_playlist(name, folder=DEFAULT_FOLDER):
+    path = _playlist_path(name, folder)
+    if not path.exists():
+        raise FileNotFoundError(f"Playlist '{name}' not found in {folder}")
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Playlist file is corrupted: {e}")
+    data["entries"] = [_normalize_entry(e) for e in data.get("entries", [])]
+    return data
+
+
+def list_playlists(folder=DEFAULT_FOLDER):
+    folder = Path(folder)
+    if not folder.exists():
+        return []
+    return sorted(p.name[:-len(PLAYLIST_SUFFIX)] for p in folder.glob(f"*{PLAYLIST_SUFFIX}"))
+
+
+def delete_playlist(name, folder=DEFAULT_FOLDER):
+    path = _playlist_path(name, folder)
+    if path.exists():
+        path.unlink()
+
+
+def missing_macros(playlist, folder=DEFAULT_FOLDER):
+    """Names the playlist refers to that have no macro file; check before playing."""
+    return sorted({e["macro"] for e in playlist["entries"] if _macro_path(e["macro"], folder) is None})
+
+
+def estimate_duration(playlist, folder=DEFAULT_FOLDER, durations=None):
+    """Playback time in seconds at uniform timing, from the library index (nothing is loaded).
+
+    durations maps macro name to duration; pass it when estimating many playlists.
+    """
+    if durations is None:
+        durations = {info["name"]: info["duration"] for info in list_macro_info(folder) if info["valid"]}
+    return sum(e["delay"] + durations.get(e["macro"], 0.0) * e["repeat"] / e["speed"]
+               for e in playlist["entries"])
+
+
+def iter_playlist(playlist, folder=DEFAULT_FOLDER, load=None, on_error=None):
+    """Yield (plan, repeat, speed, delay) per entry, for Player.play_steps.
+
+    load(name) compiles one macro (by default through load_compiled, so
+    binary macros are read through mmap and JSON ones compiled directly). The next entry's macro is loaded in the
+    background while the current one plays; an entry naming the same macro
+    as the one before reuses its plan.
+
+    A macro that fails to load (missing, unreadable or corrupt) raises
+    unless on_error is given: then on_error(name, error) is called and the
+    entry is yielded with a None plan, which play_steps skips.
+    """
+    if load is None:
+        from src.plan import compile_events
+
+        def load(name):
+            return load_compiled(name, compile_events, folder=folder)
+
+    entries = playlist["entries"]
+    if not entries:
+        return
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="playlist-prefetch") as pool:
+        pending = pool.submit(load, entries[0]["macro"])
+        for k, entry in enumerate(entries):
+            # Drop our reference first so only the current and next plans are alive
+            plan = None
+            try:
+                plan = pending.result()
+            except (OSError, ValueError) as e:
+                if on_error is None:
+                    raise
+                on_error(entry["macro"], e)
+            following = entries[k + 1]["macro"] if k + 1 < len(entries) else None
+            if following is None:
+                pending = None
+            elif following == entry["macro"] and plan is not None:
+                pending = _Ready(plan)
+            else:
+                pending = pool.submit(load, following)
+            yield plan, entry["repeat"], entry["speed"], entry["delay"]
+
+
+class _Ready:
+    # Stands in for a Future when the next entry reuses the current plan
+    def __init__(self, value):
+        self._value = value
+
+    def result(self):
+        return self._value
@@ -0,0 +1,49 @@
+# src/progress.py
+# Progress channel between the playing thread and the UI. The player only
+# stores the current iteration in an attribute (a single atomic store under
+# the GIL); the UI polls snapshot() at its own fixed rate, so reporting
+# costs the same whether iterations take a minute or a microsecond.
+import time
+
+POLL_INTERVAL_MS = 100  # 10 Hz
+
+
+class Progress:
+    """Iteration counter written by Player.play and read by a poller."""
+
+    __slots__ = ("total", "iteration", "_start_ns")
+
+    def __init__(self, total=1):
+        self.total = total
+        self.iteration = 0
+        self._start_ns = time.perf_counter_ns()
+
+    def update(self, iteration):
+        """on_iteration callback for Player.play."""
+        self.iteration = iteration
+
+    def snapshot(self):
+        """Current position as a dict: current (1-based), total, elapsed, rate (it/s), eta (s or None)."""
+        iteration = self.iteration
+        elapsed = (time.perf_counter_ns() - self._start_ns) / 1e9
+        # Iterations before the current one are the completed ones
+        rate = iteration / elapsed if elapsed > 0 else 0.0
+        eta = (self.total - iteration) / rate if rate > 0 else None
+        return {"current": iteration + 1, "total": self.total, "elapsed": elapsed, "rate": rate, "eta": eta}
+
+
+def _clock(seconds):
+    seconds = int(seconds)
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    return f"{h}:{m:02d}:{s:02d}" if h else f"{m}:{s:02d}"
+
+
+def format_progress(snap):
+    """Status-line text for a snapshot, e.g. '12,345/1,000,000 · 2,100 it/s · 0:06 elapsed · ETA 7:50'."""
+    text = f"{snap['current']:,}/{snap['total']:,} · {_clock(snap['elapsed'])} elapsed"
+    if snap["rate"] > 0:
+        rate = snap["rate"]
+        text += f" · {rate:,.0f} it/s" if rate >= 10 else f" · {rate:.2f} it/s"
+        text += f" · ETA {_clock(snap['eta'])}"
+    return text
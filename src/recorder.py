@@ -1,47 +1,100 @@
 # src/recorder.py
-import time
 import threading
-from pynput import mouse, keyboard
+from queue import SimpleQueue
+from time import perf_counter_ns
+
+from src.backends import PynputBackend
+from src.macro_store import DEFAULT_FOLDER, StreamWriter
+from src.paths import simplify
+
+MAX_PATH_POINTS = 1000  # raw points buffered before a path segment is flushed
+INTERRUPT_CHORD = (("ctrl", "ctrl_l", "ctrl_r"), "c")  # the Ctrl+C that ends a terminal session
+
+# Raw capture record kinds: (kind, perf_counter_ns, *listener args)
+_MOVE, _CLICK, _SCROLL, _PRESS, _RELEASE = range(5)
 
 
 class Recorder:
-    """Records mouse clicks/scrolls and keyboard press/release events."""
+    """Records mouse clicks/scrolls and keyboard press/release events.
+
+    Listener callbacks run on the OS input hook thread, where slowness lags
+    the whole desktop, so they only push a raw tuple stamped with
+    perf_counter_ns onto a SimpleQueue. A consumer thread does everything
+    else: key filtering, key-name mapping, path simplification and event
+    building.
+
+    With record_moves=True cursor movement is captured too. Moves are
+    rate-limited to one point per move_interval seconds and each run of
+    moves between other events is simplified to within move_tolerance
+    pixels, then stored as a single "move" event holding the path.
+    """
 
-    def __init__(self, filter_keys=None):
+    def __init__(self, filter_keys=None, record_moves=False, move_tolerance=2.0, move_interval=0.008,
+                 backend=None, trim_chord=None):
         # filter_keys: list of pynput Key objects to exclude (e.g. hotkeys)
+        # backend: where input is listened to; defaults to pynput, created on start()
+        # trim_chord: (modifier names, key name) of a chord dropped from the
+        #   end of the recording on stop, e.g. INTERRUPT_CHORD when Ctrl+C stops it
+        self._backend = backend
         self._filter_keys = set(filter_keys or [])
+        self._trim_chord = trim_chord
+        self._trim_names = frozenset(trim_chord[0]) | {trim_chord[1]} if trim_chord else frozenset()
+        self._record_moves = record_moves
+        self._move_tolerance = move_tolerance
+        self._move_interval = move_interval
         self._events = []
-        self._start_time = None
-        self._mouse_listener = None
-        self._keyboard_listener = None
+        self._path = []
+        self._move_tail = None
+        self._start_ns = perf_counter_ns()
+        self._queue = SimpleQueue()
+        self._put = self._queue.put
+        self._consumer = None
+        self._listener = None
         self._lock = threading.Lock()
+        self._handlers = {
+            _MOVE: self._handle_move,
+            _CLICK: self._handle_click,
+            _SCROLL: self._handle_scroll,
+            _PRESS: self._handle_press,
+            _RELEASE: self._handle_release,
+        }
 
     def start(self):
         self._events = []
-        self._start_time = time.time()
-        self._mouse_listener = mouse.Listener(
+        self._path = []
+        self._move_tail = None
+        self._start_ns = perf_counter_ns()
+        self._consumer = threading.Thread(target=self._consume, daemon=True)
+        self._consumer.start()
+        if self._backend is None:
+            self._backend = PynputBackend()
+        self._listener = self._backend.listen(
+            on_move=self._on_move if self._record_moves else None,
             on_click=self._on_click,
             on_scroll=self._on_scroll,
-        )
-        self._keyboard_listener = keyboard.Listener(
             on_press=self._on_key_press,
             on_release=self._on_key_release,
         )
-        self._mouse_listener.start()
-        self._keyboard_listener.start()
 
     def stop(self):
-        if self._mouse_listener:
-            self._mouse_listener.stop()
-        if self._keyboard_listener:
-            self._keyboard_listener.stop()
+        if self._listener:
+            self._listener.stop()
+            self._listener = None
+        if self._consumer is not None:
+            self._put(None)
+            self._consumer.join()
+            self._consumer = None
+        else:
+            self._drain()
         with self._lock:
+            self._flush_path()
+            del self._events[self._trailing(self._events):]
             return list(self._events)
 
     # ── helpers ────────────────────────────────────────────────────────────
 
-    def _ts(self):
-        return round(time.time() - self._start_time, 4)
+    def _ts(self, t_ns):
+        return round((t_ns - self._start_ns) / 1e9, 4)
 
     def _key_str(self, key):
         try:
@@ -55,52 +108,217 @@ class Recorder:
             pass
         return str(key).replace("Key.", "")
 
+    def _trailing_run(self, events):
+        """Index where the trailing run of key events on trim_chord keys starts."""
+        i = len(events)
+        while i and events[i - 1]["type"] == "key" and events[i - 1]["key"] in self._trim_names:
+            i -= 1
+        return i
+
+    def _trailing(self, events):
+        """Index where the trim_chord ending events starts, or len(events) if none does.
+
+        The chord starts at the last modifier press followed by a press of
+        its key (plus auto-repeats of that modifier press just before it),
+        so keys typed before the chord are kept even if they are the same key.
+        """
+        if not self._trim_chord:
+            return len(events)
+        modifiers, key = self._trim_chord
+        run = self._trailing_run(events)
+        key_pressed = False
+        for i in range(len(events) - 1, run - 1, -1):
+            event = events[i]
+            if not event["pressed"]:
+                continue
+            if event["key"] == key:
+                key_pressed = True
+            elif key_pressed and event["key"] in modifiers:
+                while i > run and events[i - 1]["pressed"] and events[i - 1]["key"] == event["key"]:
+                    i -= 1
+                return i
+        return len(events)
+
     def _is_filtered(self, key):
         return key in self._filter_keys
 
-    # ── listener callbacks ──────────────────────────────────────────────────
+    def _emit(self, event):
+        """Store one finished event. Lock must be held."""
+        self._events.append(event)
+
+    def _flush_path(self):
+        """Simplify the buffered move points into one "move" event. Lock must be held."""
+        path = self._path
+        if self._move_tail is not None:
+            path.append(self._move_tail)
+            self._move_tail = None
+        if not path:
+            return
+        kept = simplify(path, self._move_tolerance)
+        self._emit({
+            "type": "move",
+            "path": [list(p) for p in kept],
+            "t": kept[0][2],
+        })
+        self._path = []
+
+    # ── listener callbacks (OS hook thread: enqueue only) ───────────────────
+
+    def _on_move(self, x, y):
+        self._put((_MOVE, perf_counter_ns(), x, y))
 
     def _on_click(self, x, y, button, pressed):
-        ts = self._ts()
-        with self._lock:
-            self._events.append({
-                "type": "click",
-                "x": int(x), "y": int(y),
-                "button": button.name,
-                "pressed": pressed,
-                "t": ts,
-            })
+        self._put((_CLICK, perf_counter_ns(), x, y, button, pressed))
 
     def _on_scroll(self, x, y, dx, dy):
-        ts = self._ts()
-        with self._lock:
-            self._events.append({
-                "type": "scroll",
-                "x": int(x), "y": int(y),
-                "dx": dx, "dy": dy,
-                "t": ts,
-            })
+        self._put((_SCROLL, perf_counter_ns(), x, y, dx, dy))
 
     def _on_key_press(self, key):
+        self._put((_PRESS, perf_counter_ns(), key))
+
+    def _on_key_release(self, key):
+        self._put((_RELEASE, perf_counter_ns(), key))
+
+    # ── consumer ───────────────────────────────────────────────────────────
+
+    def _consume(self):
+        get = self._queue.get
+        handlers = self._handlers
+        while True:
+            item = get()
+            if item is None:
+                return
+            with self._lock:
+                handlers[item[0]](*item[1:])
+
+    def _drain(self):
+        """Process anything still queued on the calling thread."""
+        handlers = self._handlers
+        while not self._queue.empty():
+            item = self._queue.get()
+            if item is not None:
+                with self._lock:
+                    handlers[item[0]](*item[1:])
+
+    def _handle_move(self, t_ns, x, y):
+        ts = self._ts(t_ns)
+        path = self._path
+        if path and ts - path[-1][2] < self._move_interval:
+            # Rate limit, but remember the latest point so a path's end is kept
+            self._move_tail = (int(x), int(y), ts)
+            return
+        self._move_tail = None
+        path.append((int(x), int(y), ts))
+        if len(path) >= MAX_PATH_POINTS:
+            self._flush_path()
+
+    def _handle_click(self, t_ns, x, y, button, pressed):
+        self._flush_path()
+        self._emit({
+            "type": "click",
+            "x": int(x), "y": int(y),
+            "button": button.name,
+            "pressed": pressed,
+            "t": self._ts(t_ns),
+        })
+
+    def _handle_scroll(self, t_ns, x, y, dx, dy):
+        self._flush_path()
+        self._emit({
+            "type": "scroll",
+            "x": int(x), "y": int(y),
+            "dx": dx, "dy": dy,
+            "t": self._ts(t_ns),
+        })
+
+    def _handle_press(self, t_ns, key):
         if self._is_filtered(key):
             return
-        ts = self._ts()
-        with self._lock:
-            self._events.append({
-                "type": "key",
-                "key": self._key_str(key),
-                "pressed": True,
-                "t": ts,
-            })
+        self._flush_path()
+        self._emit({
+            "type": "key",
+            "key": self._key_str(key),
+            "pressed": True,
+            "t": self._ts(t_ns),
+        })
 
-    def _on_key_release(self, key):
+    def _handle_release(self, t_ns, key):
         if self._is_filtered(key):
             return
-        ts = self._ts()
+        self._flush_path()
+        self._emit({
+            "type": "key",
+            "key": self._key_str(key),
+            "pressed": False,
+            "t": self._ts(t_ns),
+        })
+
+
+class StreamingRecorder(Recorder):
+    """Recorder that spills events to an append-only .jsonl macro as it goes.
+
+    Listener callbacks only append to a small buffer; a background thread
+    writes it out every flush_interval seconds, or as soon as batch_size
+    events are pending. Memory stays flat however long the session runs,
+    and a crash loses at most the last unflushed batch. stop() returns the
+    path of the finished macro file, which loads through macro_store, or
+    None if nothing was recorded or keep is False; either way an existing
+    macro of the same name is left untouched.
+    Trailing trim_chord key events are held back from the file until
+    another event follows them, so the chord can still be dropped on stop.
+    """
+
+    def __init__(self, name, folder=DEFAULT_FOLDER, flush_interval=0.5, batch_size=1000, **kwargs):
+        super().__init__(**kwargs)
+        self._name = name
+        self._folder = folder
+        self._flush_interval = flush_interval
+        self._batch_size = batch_size
+        self._buffer = []
+        self._stopping = False
+        self._writer = None
+        self._writer_thread = None
+        self._wake = threading.Condition(self._lock)
+
+    def start(self):
+        self._buffer = []
+        self._stopping = False
+        self._writer = StreamWriter(self._name, self._folder)
+        self._writer_thread = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer_thread.start()
+        super().start()
+
+    def stop(self, keep=True):
+        super().stop()
+        if self._writer_thread is None:
+            return None
         with self._lock:
-            self._events.append({
-                "type": "key",
-                "key": self._key_str(key),
-                "pressed": False,
-                "t": ts,
-            })
+            self._stopping = True
+            self._wake.notify()
+        self._writer_thread.join()
+        self._writer_thread = None
+        batch = self._buffer[:self._trailing(self._buffer)]
+        self._buffer = []
+        if batch and keep:
+            self._writer.write(batch)
+        keep = keep and self._writer.count > 0
+        self._writer.close(keep=keep)
+        return self._writer.path if keep else None
+
+    def _emit(self, event):
+        self._buffer.append(event)
+        if len(self._buffer) >= self._batch_size:
+            self._wake.notify()
+
+    def _write_loop(self):
+        while True:
+            with self._lock:
+                held = self._trailing_run(self._buffer)
+                if not self._stopping and (len(self._buffer) < self._batch_size or not held):
+                    self._wake.wait(self._flush_interval)
+                    held = self._trailing_run(self._buffer)
+                if self._stopping:
+                    return  # stop() trims and writes what is left
+                batch, self._buffer = self._buffer[:held], self._buffer[held:]
+            if batch:
+                self._writer.write(batch)
@@ -0,0 +1,182 @@
+# src/remap.py
+# Coordinate remapping for replaying a macro on another resolution or
+# monitor layout. Recorded x/y are absolute pixels; a Remap rewrites a
+# compiled Plan's xs/ys columns once, before playback, so dispatch never
+# transforms a point. Points inside a region (a recorded rectangle, e.g.
+# one monitor) are mapped linearly onto its target rectangle; all other
+# points get the global scale and offset.
+#
+# The columns are transformed as whole arrays, with NumPy when it is
+# installed and a pure-Python loop otherwise; both give identical results.
+# A Remap compares and hashes by its parameters, so passing it as the
+# transform to load_macro_cached caches one remapped plan per macro and
+# display profile.
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # optional; the pure-Python path below is used instead
+    np = None
+
+from src.plan import Plan, compile_events
+
+
+class Remap:
+    """Scale, offset and per-region remap of cursor positions.
+
+    x' = x * scale[0] + offset[0] (likewise y) outside every region.
+    regions is a sequence of (src, dst) rectangles given as (x, y, w, h);
+    the first region containing a point maps it from src onto dst.
+    Calling a Remap on MacroColumns (or events) compiles and remaps them;
+    calling it on a Plan returns a remapped copy.
+    """
+
+    __slots__ = ("scale", "offset", "regions")
+
+    def __init__(self, scale=(1.0, 1.0), offset=(0.0, 0.0), regions=()):
+        self.scale = (float(scale[0]), float(scale[1]))
+        self.offset = (float(offset[0]), float(offset[1]))
+        self.regions = tuple((_rect(src), _rect(dst)) for src, dst in regions)
+
+    @classmethod
+    def from_displays(cls, recorded, current):
+        """Map the i-th recorded monitor onto the i-th current one; (x, y, w, h) rectangles.
+
+        Points outside every recorded monitor are mapped by stretching the
+        recorded layout's bounding box onto the current one's.
+        """
+        recorded = [_rect(r) for r in recorded]
+        current = [_rect(r) for r in current]
+        if not recorded or not current:
+            raise ValueError("both display layouts need at least one monitor")
+        (sx, sy, sw, sh), (dx, dy, dw, dh) = _bounds(recorded), _bounds(current)
+        scale = (dw / sw, dh / sh)
+        offset = (dx - sx * scale[0], dy - sy * scale[1])
+        return cls(scale, offset, zip(recorded, current))
+
+    @classmethod
+    def from_settings(cls, settings):
+        """The display_remap profile from settings, or None if remapping is off.
+
+        The profile is either {"recorded": [...], "current": [...]} monitor
+        lists (see from_displays) or {"scale", "offset", "regions"}, each
+        region being 8 numbers (source x, y, w, h, then target). A
+        malformed profile raises ValueError.
+        """
+        profile = settings.get("display_remap")
+        if not profile:
+            return None
+        if not isinstance(profile, dict):
+            raise ValueError("display_remap must be an object")
+        try:
+            if "recorded" in profile or "current" in profile:
+                remap = cls.from_displays(profile.get("recorded") or (), profile.get("current") or ())
+            else:
+                for field in ("scale", "offset"):
+                    if field in profile and len(profile[field]) != 2:
+                        raise ValueError(f"{field} needs two numbers")
+                regions = []
+                for r in profile.get("regions") or ():
+                    if len(r) != 8:
+                        raise ValueError(f"region {r!r} needs 8 numbers")
+                    regions.append((r[:4], r[4:]))
+                remap = cls(profile.get("scale", (1.0, 1.0)), profile.get("offset", (0.0, 0.0)), regions)
+        except (TypeError, ValueError, IndexError, KeyError, AttributeError) as e:
+            raise ValueError(f"display_remap is malformed: {e}") from None
+        return None if remap.is_identity else remap
+
+    @property
+    def is_identity(self):
+        return (self.scale == (1.0, 1.0) and self.offset == (0.0, 0.0)
+                and all(src == dst for src, dst in self.regions))
+
+    def _key(self):
+        return self.scale, self.offset, self.regions
+
+    def __eq__(self, other):
+        return isinstance(other, Remap) and self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def __repr__(self):
+        return f"Remap(scale={self.scale}, offset={self.offset}, regions={self.regions})"
+
+    def _mappings(self):
+        # Every mapping as ((x0, y0, x1, y1) or None, (ax, bx, ay, by)) with
+        # x' = x * ax + bx; the global one (None) comes last
+        out = []
+        for (sx, sy, sw, sh), (dx, dy, dw, dh) in self.regions:
+            ax, ay = dw / sw, dh / sh
+            out.append(((sx, sy, sx + sw, sy + sh), (ax, dx - sx * ax, ay, dy - sy * ay)))
+        out.append((None, (self.scale[0], self.offset[0], self.scale[1], self.offset[1])))
+        return out
+
+    def apply(self, xs, ys, use_numpy=None):
+        """Remap coordinate columns (array('i')); returns new (xs, ys) arrays."""
+        if use_numpy is None:
+            use_numpy = np is not None
+        if use_numpy and len(xs):
+            return _apply_numpy(xs, ys, self._mappings())
+        return _apply_python(xs, ys, self._mappings())
+
+    def plan(self, plan):
+        """A copy of plan with remapped xs/ys; the other columns are shared."""
+        out = Plan()
+        out.ops, out.offsets, out.pressed, out.args = plan.ops, plan.offsets, plan.pressed, plan.args
+        out.duration = plan.duration
+        out.xs, out.ys = self.apply(plan.xs, plan.ys)
+        return out
+
+    def __call__(self, value):
+        if not isinstance(value, Plan):
+            value = compile_events(value)
+        return self.plan(value)
+
+
+def _rect(r):
+    x, y, w, h = (int(v) for v in r)
+    if w <= 0 or h <= 0:
+        raise ValueError(f"rectangle {tuple(r)} needs a positive width and height")
+    return x, y, w, h
+
+
+def _bounds(rects):
+    x0 = min(r[0] for r in rects)
+    y0 = min(r[1] for r in rects)
+    x1 = max(r[0] + r[2] for r in rects)
+    y1 = max(r[1] + r[3] for r in rects)
+    return x0, y0, x1 - x0, y1 - y0
+
+
+def _apply_python(xs, ys, mappings):
+    (_, (ax, bx, ay, by)), regions = mappings[-1], mappings[:-1]
+    if not regions:
+        return (array("i", [round(x * ax + bx) for x in xs]),
+                array("i", [round(y * ay + by) for y in ys]))
+    out_x = array("i", bytes(xs.itemsize * len(xs)))
+    out_y = array("i", bytes(ys.itemsize * len(ys)))
+    for i, (x, y) in enumerate(zip(xs, ys)):
+        m = mappings[-1][1]
+        for (x0, y0, x1, y1), coeffs in regions:
+            if x0 <= x < x1 and y0 <= y < y1:
+                m = coeffs
+                break
+        out_x[i] = round(x * m[0] + m[1])
+        out_y[i] = round(y * m[2] + m[3])
+    return out_x, out_y
+
+
+def _apply_numpy(xs, ys, mappings):
+    x = np.frombuffer(xs, dtype=np.intc).astype(np.float64)
+    y = np.frombuffer(ys, dtype=np.intc).astype(np.float64)
+    n = len(x)
+    ax, bx, ay, by = (np.full(n, c) for c in mappings[-1][1])
+    # Earlier regions win, so paint them last
+    for (x0, y0, x1, y1), (rax, rbx, ray, rby) in reversed(mappings[:-1]):
+        inside = (x >= x0) & (x < x1) & (y >= y0) & (y < y1)
+        ax[inside], bx[inside], ay[inside], by[inside] = rax, rbx, ray, rby
+    # rint rounds half to even, like round() in the pure-Python path
+    out_x = np.rint(x * ax + bx).astype(np.intc)
+    out_y = np.rint(y * ay + by).astype(np.intc)
+    return array("i", out_x.tobytes()), array("i", out_y.tobytes())
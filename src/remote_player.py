@@ -0,0 +1,316 @@
+# src/remote_player.py
+# Out-of-process playback. RemotePlayer has Player's play()/stop()/position
+# interface but dispatches from a child process, so the Tk mainloop, the
+# hotkey listener and recorder callbacks in the parent no longer compete
+# with the dispatch loop for the GIL.
+#
+# Control protocol, over two one-way pipes so each end has one reader and
+# one writer:
+#   parent -> child   ("load", plan_id, plan)     plan pickled once per plan
+#                     ("play", plan_id, options, seq)  Player.play keyword args,
+#                                                 plus telemetry_capacity
+#                     ("stop", seq)               handled at once, even mid-play
+#                     ("quit",)
+#   child -> parent   ("ready",)
+#                     ("iteration", i)            on_iteration progress
+#                     ("done", ok, position, telemetry, actions)
+#                                                 actions: null-backend calls, else None
+#                     ("error", message)
+# If the parent goes away the child stops playing (releasing held keys)
+# and exits; if the child dies mid-play the parent releases every key and
+# button the plan uses.
+import multiprocessing
+import queue
+import signal
+import sys
+import threading
+import time
+
+from src.player import DEFAULT_SETTLE
+
+BACKENDS = ("pynput", "null")
+START_TIMEOUT = 30.0  # seconds for the child to import pynput and report ready
+_POLL_S = 0.1         # how often a waiting parent checks that the child is alive
+
+
+def _make_backend(name):
+    if name == "null":
+        from src.backends import NullBackend
+        return NullBackend()
+    from src.backends import PynputBackend
+    return PynputBackend()
+
+
+def _child_main(control, events, precise, settle, backend_name):
+    # Ctrl+C in a terminal reaches the whole process group; the parent
+    # decides what it means and sends a stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if sys.platform == "win32":
+        import ctypes
+        try:
+            # Same coordinate space as the parent (see main.py), and ahead of
+            # normal-priority work so dispatch is not preempted
+            ctypes.windll.shcore.SetProcessDpiAwareness(2)
+            ctypes.windll.kernel32.SetPriorityClass(ctypes.windll.kernel32.GetCurrentProcess(), 0x80)
+        except Exception:
+            pass
+    from src.player import Player
+    from src.telemetry import Telemetry
+
+    backend = _make_backend(backend_name)
+    player = Player(precise=precise, settle=settle, backend=backend)
+    log = getattr(backend, "log", None)  # the null backend's action log
+    inbox = queue.Queue()
+    stop_seq = [0]      # highest play sequence number a stop was asked for
+    finished_seq = [0]  # highest play sequence number that has returned
+
+    def read_control():
+        # Owns the control pipe: stop takes effect at once, the rest is queued
+        try:
+            while True:
+                msg = control.recv()
+                if msg[0] == "stop":
+                    seq = msg[1]
+                    stop_seq[0] = max(stop_seq[0], seq)
+                    # play() clears the stop flag as it starts, so keep setting
+                    # it until the play being stopped has returned
+                    while finished_seq[0] < seq:
+                        player.stop()
+                        time.sleep(0.005)
+                else:
+                    inbox.put(msg)
+        except (EOFError, OSError):
+            player.stop()  # parent is gone
+            inbox.put(("quit",))
+
+    threading.Thread(target=read_control, name="remote-player-control", daemon=True).start()
+    events.send(("ready",))
+    plans = {}
+    while True:
+        msg = inbox.get()
+        if msg[0] == "quit":
+            return
+        try:
+            if msg[0] == "load":
+                plans.clear()  # one plan at a time; the parent resends on change
+                plans[msg[1]] = msg[2]
+            elif msg[0] == "play":
+                seq = msg[3]
+                try:
+                    plan, options = plans[msg[1]], dict(msg[2])
+                    if log is not None:
+                        log.clear()
+                    report = options.pop("report_iterations", False)
+                    capacity = options.pop("telemetry_capacity", 0)
+                    if not capacity:
+                        player.telemetry = None
+                    elif player.telemetry is None or player.telemetry.capacity != capacity:
+                        player.telemetry = Telemetry(capacity)
+                    on_iteration = (lambda i: events.send(("iteration", i))) if report else None
+                    if stop_seq[0] >= seq:
+                        # Stopped before it started: report the position it would have started at
+                        ok = False
+                        if player.telemetry is not None:
+                            player.telemetry.reset()
+                        start = options.get("start", 0.0)
+                        player.position = options.get("resume") or (0, plan.row_at(start) if start > 0 else 0)
+                    else:
+                        ok = player.play(plan, on_iteration=on_iteration, **options)
+                finally:
+                    finished_seq[0] = seq
+                events.send(("done", ok, player.position, player.telemetry, None if log is None else len(log)))
+        except (EOFError, OSError):
+            return
+        except Exception as e:
+            try:
+                events.send(("error", f"{type(e).__name__}: {e}"))
+            except (EOFError, OSError):
+                return
+
+
+class RemotePlayer:
+    """Player whose dispatch loop runs in a child process.
+
+    Plays compiled Plans only. telemetry may be swapped between plays; the
+    child's records are copied into it when each play returns. backend names the input backend the child
+    creates ("pynput" or "null"); cleanup_backend is what the parent
+    releases keys through if the child dies (by default a new pynput
+    backend, or nothing for "null"). The child is started on first play
+    and reused until close(). As with Player, stop() returns early and
+    leaves `position` set, so stop doubles as pause.
+    """
+
+    def __init__(self, precise=True, settle=DEFAULT_SETTLE, backend="pynput", telemetry=None,
+                 cleanup_backend=None):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}'")
+        self._options = (precise, settle, backend)
+        self.telemetry = telemetry
+        self.position = None
+        self.actions = None  # with the null backend, how many calls the last play made
+        self._cleanup_backend = cleanup_backend
+        self._process = None
+        self._control = None  # parent end of parent -> child
+        self._events = None   # parent end of child -> parent
+        self._send_lock = threading.Lock()
+        self._plan_id = None
+        self._plan = None
+        self._seq = 0          # sequence number of the latest play
+        self._playing = False
+
+    # ── process lifecycle ───────────────────────────────────────────────────
+
+    def start(self):
+        """Start the child now rather than on the first play (it takes a moment to import pynput)."""
+        if self._process is not None and self._process.is_alive():
+            return
+        ctx = multiprocessing.get_context("spawn")
+        control_r, control_w = ctx.Pipe(duplex=False)
+        events_r, events_w = ctx.Pipe(duplex=False)
+        process = ctx.Process(target=_child_main, name="macro-player",
+                              args=(control_r, events_w, *self._options), daemon=True)
+        process.start()
+        # Close our copies of the child's ends so a dead child reads as EOF
+        control_r.close()
+        events_w.close()
+        self._process, self._control, self._events = process, control_w, events_r
+        self._plan_id = self._plan = None
+        msg = self._receive(timeout=START_TIMEOUT)
+        if msg is None or msg[0] != "ready":
+            self.close()
+            raise RuntimeError("playback process did not start")
+
+    def close(self):
+        """Stop the child process."""
+        process, self._process = self._process, None
+        if process is None:
+            return
+        try:
+            self._send(("quit",))
+        except (OSError, ValueError):
+            pass
+        process.join(timeout=2.0)
+        if process.is_alive():
+            process.terminate()
+            process.join(timeout=2.0)
+        for conn in (self._control, self._events):
+            conn.close()
+        self._control = self._events = None
+
+    @property
+    def precise(self):
+        return self._options[0]
+
+    @property
+    def settle(self):
+        return self._options[1]
+
+    @property
+    def alive(self):
+        return self._process is not None and self._process.is_alive()
+
+    # ── playback ────────────────────────────────────────────────────────────
+
+    def play(self, plan, speed=1.0, repeat=1, on_iteration=None, timing=None, start=0.0, end=None, resume=None):
+        """Play a compiled Plan in the child; same arguments and result as Player.play.
+
+        Blocks until the child reports the play finished or stopped.
+        on_iteration is called from this thread as progress arrives. If the
+        child dies, the keys and buttons the plan uses are released and
+        False is returned. A KeyboardInterrupt while waiting stops the child
+        first, so `position` is set when it propagates.
+        """
+        if not self.alive:
+            self.start()
+        if plan is not self._plan:
+            # The plan is pickled once; replays and resumes reuse the child's copy
+            self._plan_id = (self._plan_id or 0) + 1
+            self._plan = plan
+            self._send(("load", self._plan_id, plan))
+        options = dict(speed=speed, repeat=repeat, timing=timing, start=start, end=end, resume=resume,
+                       report_iterations=on_iteration is not None,
+                       telemetry_capacity=self.telemetry.capacity if self.telemetry is not None else 0)
+        self._seq += 1
+        self._playing = True
+        self._send(("play", self._plan_id, options, self._seq))
+        try:
+            try:
+                return self._wait_done(plan, on_iteration)
+            except KeyboardInterrupt:
+                self.stop()
+                self._wait_done(plan, on_iteration)
+                raise
+        finally:
+            self._playing = False
+
+    def _wait_done(self, plan, on_iteration):
+        while True:
+            msg = self._receive()
+            if msg is None:
+                self._child_died(plan)
+                return False
+            kind = msg[0]
+            if kind == "iteration":
+                on_iteration(msg[1])
+            elif kind == "done":
+                _, ok, self.position, telemetry, self.actions = msg
+                if self.telemetry is not None and telemetry is not None:
+                    # Update in place so callers holding the object see the run
+                    self.telemetry.__dict__.update(telemetry.__dict__)
+                return ok
+            elif kind == "error":
+                raise RuntimeError(f"playback process failed: {msg[1]}")
+
+    def stop(self):
+        if self._playing and self.alive:
+            try:
+                self._send(("stop", self._seq))
+            except (OSError, ValueError):
+                pass
+
+    # ── internals ───────────────────────────────────────────────────────────
+
+    def _send(self, msg):
+        with self._send_lock:
+            self._control.send(msg)
+
+    def _receive(self, timeout=None):
+        """Next message from the child, or None once it has died (or timeout passed)."""
+        waited = 0.0
+        events = self._events
+        while True:
+            try:
+                if events.poll(_POLL_S):
+                    return events.recv()
+            except (EOFError, OSError):
+                return None
+            if self._process is None or not self._process.is_alive():
+                # Drain anything sent just before it exited
+                try:
+                    return events.recv() if events.poll(0) else None
+                except (EOFError, OSError):
+                    return None
+            waited += _POLL_S
+            if timeout is not None and waited >= timeout:
+                return None
+
+    def _child_died(self, plan):
+        from src.plan import OP_CLICK, OP_KEY
+
+        backend = self._cleanup_backend
+        if backend is None and self._options[2] == "pynput":
+            backend = self._cleanup_backend = _make_backend("pynput")
+        if backend is not None:
+            # We cannot know what was down when it died, so release
+            # everything the plan ever presses
+            pressed = {(op, arg) for op, down, arg in zip(plan.ops, plan.pressed, plan.args)
+                       if down and (op == OP_CLICK or op == OP_KEY)}
+            for op, arg in pressed:
+                try:
+                    if op == OP_CLICK:
+                        backend.release_button(arg)
+                    else:
+                        backend.release_key(arg)
+                except Exception:
+                    pass
+        self.close()
@@ -0,0 +1,50 @@
+# src/scheduler.py
+import time
+
+DEFAULT_SPIN_NS = 2_000_000     # spin through the last 2 ms before a deadline
+_MAX_MARGIN_NS = 20_000_000     # never spin for more than 20 ms
+_MARGIN_SLACK_NS = 250_000
+
+
+class Scheduler:
+    """Waits for absolute perf_counter_ns deadlines with sub-millisecond accuracy.
+
+    The bulk of each wait is slept on the stop event so stop() stays prompt.
+    The final stretch is spun on the clock, because OS sleeps overshoot by
+    up to a timer tick. The spin margin adapts to the oversleep actually
+    observed, so coarse timers (e.g. 15.6 ms on Windows) are absorbed too.
+    With spin_ns=0 the scheduler only sleeps (low CPU, lower accuracy).
+    """
+
+    def __init__(self, stop_event, spin_ns=DEFAULT_SPIN_NS):
+        self._stop_event = stop_event
+        self._spin_ns = spin_ns
+        self._margin_ns = spin_ns
+
+    def wait_until(self, deadline_ns):
+        """Block until deadline_ns. Returns False if stopped before it."""
+        stop_event = self._stop_event
+        if stop_event.is_set():
+            return False
+        now = time.perf_counter_ns()
+        coarse = deadline_ns - now - self._margin_ns
+        if coarse > 0:
+            if stop_event.wait(coarse / 1e9):
+                return False
+            if self._spin_ns:
+                self._adapt(time.perf_counter_ns() - now - coarse)
+        if not self._spin_ns:
+            return True
+        while time.perf_counter_ns() < deadline_ns:
+            if stop_event.is_set():
+                return False
+        return True
+
+    def _adapt(self, overshoot_ns):
+        # Grow immediately on a bad oversleep, shrink back slowly
+        margin = self._margin_ns
+        if overshoot_ns + _MARGIN_SLACK_NS > margin:
+            margin = overshoot_ns + _MARGIN_SLACK_NS
+        else:
+            margin -= (margin - overshoot_ns) // 16
+        self._margin_ns = min(max(margin, self._spin_ns), _MAX_MARGIN_NS)
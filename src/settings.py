@@ -1,5 +1,7 @@
 # src/settings.py
 import json
+import os
+import threading
 from pathlib import Path
 
 SETTINGS_PATH = Path.home() / "mouse_macros" / "settings.json"
@@ -8,15 +10,38 @@ DEFAULT_SETTINGS = {
     "record_hotkey": "<f6>",
     "play_hotkey": "<f7>",
     "speed": 1.0,
+    "timing_mode": "uniform",
+    "max_gap_s": 1.0,
+    "long_gap_s": 0.5,
+    "long_gap_speed": 4.0,
+    "min_gap_ms": 10,
     "repeat_count": 1,
+    "precise_timing": True,
+    "cursor_settle_ms": 10,
+    "record_moves": False,
+    "move_tolerance_px": 2.0,
+    "macro_format": "json",
+    "compression_codec": "zlib",
+    "timestamp_resolution_ms": 0.1,
+    "stream_recording": False,
+    "optimize_recordings": True,
+    "collapse_key_repeat": False,
+    "cache_budget_mb": 256,
+    "library_poll_s": 1.0,
+    "display_remap": None,
+    "out_of_process_playback": False,
+    "telemetry": False,
     "macro_folder": str(Path.home() / "mouse_macros"),
 }
 
+DEFAULT_SAVE_DELAY = 0.5  # seconds of quiet before a change is written
 
-def load_settings():
-    if SETTINGS_PATH.exists():
+
+def load_settings(path=None):
+    path = Path(path) if path is not None else SETTINGS_PATH
+    if path.exists():
         try:
-            with open(SETTINGS_PATH, "r", encoding="utf-8") as f:
+            with open(path, "r", encoding="utf-8") as f:
                 data = json.load(f)
             return {**DEFAULT_SETTINGS, **data}
         except Exception as e:
@@ -24,7 +49,103 @@ def load_settings():
     return dict(DEFAULT_SETTINGS)
 
 
-def save_settings(settings):
-    SETTINGS_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with open(SETTINGS_PATH, "w", encoding="utf-8") as f:
+def save_settings(settings, path=None):
+    """Write settings atomically: a crash mid-write never leaves a truncated file."""
+    path = Path(path) if path is not None else SETTINGS_PATH
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
         json.dump(settings, f, indent=2)
+    os.replace(tmp, path)
+
+
+class SettingsManager:
+    """Settings held in memory, persisted lazily, with per-field change events.
+
+    update() applies changes immediately and notifies the subscribers whose
+    fields changed, passing a {field: (old, new)} diff; assigning a value
+    equal to the current one is not a change. The file is written once the
+    settings have been quiet for `delay` seconds (on a timer thread), so a
+    burst of edits such as typing into an entry costs one write. Call
+    flush() before exiting. Subscribers run on the thread calling update().
+    """
+
+    def __init__(self, path=None, delay=DEFAULT_SAVE_DELAY):
+        self._path = Path(path) if path is not None else SETTINGS_PATH
+        self._delay = delay
+        self._values = load_settings(self._path)
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()  # one write at a time: they share the .tmp file
+        self._timer = None
+        self._dirty = False
+        self._subscribers = []
+
+    @property
+    def path(self):
+        return self._path
+
+    def __getitem__(self, key):
+        return self._values[key]
+
+    def get(self, key, default=None):
+        return self._values.get(key, default)
+
+    def snapshot(self):
+        """A copy of the current values, e.g. for another thread."""
+        with self._lock:
+            return dict(self._values)
+
+    def update(self, changes=None, **kwargs):
+        """Apply changes; returns the {field: (old, new)} diff of what actually changed."""
+        changes = {**(changes or {}), **kwargs}
+        with self._lock:
+            diff = {}
+            for key, value in changes.items():
+                old = self._values.get(key)
+                if old != value:
+                    diff[key] = (old, value)
+                    self._values[key] = value
+            if diff:
+                self._dirty = True
+                self._schedule_save()
+        if diff:
+            for fields, callback in list(self._subscribers):
+                if fields is None or not fields.isdisjoint(diff):
+                    callback(diff)
+        return diff
+
+    def __setitem__(self, key, value):
+        self.update({key: value})
+
+    def subscribe(self, callback, fields=None):
+        """Call callback(diff) when any of fields (default: any field) changes. Returns an unsubscribe function."""
+        entry = (frozenset(fields) if fields is not None else None, callback)
+        self._subscribers.append(entry)
+        return lambda: self._subscribers.remove(entry)
+
+    def flush(self):
+        """Write pending changes now; waits for a timer write already in progress."""
+        with self._write_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._dirty:
+                    return
+                values = dict(self._values)
+                self._dirty = False
+            save_settings(values, self._path)
+
+    def _schedule_save(self):
+        # Called with the lock held; restart the quiet period
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(self._delay, self._save_now)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _save_now(self):
+        try:
+            self.flush()
+        except OSError as e:
+            print(f"Warning: could not save settings ({e})")
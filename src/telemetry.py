@@ -0,0 +1,172 @@
+# src/telemetry.py
+import json
+from array import array
+from collections import OrderedDict
+
+from src.macro_binary import TYPE_CLICK, TYPE_SCROLL, TYPE_KEY, TYPE_MOVE
+
+OP_NAMES = {TYPE_CLICK: "click", TYPE_SCROLL: "scroll", TYPE_KEY: "key", TYPE_MOVE: "move"}
+
+DEFAULT_CAPACITY = 65536        # per-event records kept in the ring buffer
+MAX_ITERATION_HISTOGRAMS = 100  # most recent repeat iterations kept
+
+
+class Histogram:
+    """HDR-style log-linear histogram of non-negative integers (nanoseconds).
+
+    Values below 2**SUB_BITS are counted exactly; above that every power of
+    two is split into 2**(SUB_BITS-1) buckets, so any recorded value is
+    reported within ~3% whatever its magnitude, in constant memory.
+    """
+
+    SUB_BITS = 6
+    _SUB = 1 << SUB_BITS
+    _HALF = _SUB >> 1
+
+    __slots__ = ("counts", "count", "max")
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.max = 0
+
+    def record(self, value):
+        if value < 0:
+            value = 0
+        if value < self._SUB:
+            index = value
+        else:
+            shift = value.bit_length() - self.SUB_BITS
+            index = shift * self._HALF + (value >> shift)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    def _upper(self, index):
+        if index < self._SUB:
+            return index
+        shift = index // self._HALF - 1
+        return ((index - shift * self._HALF + 1) << shift) - 1
+
+    def percentile(self, p):
+        """Upper bound of the bucket holding the p-th percentile (p in 0..100)."""
+        if not self.count:
+            return 0
+        target = max(1, -(-self.count * p // 100))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(self._upper(index), self.max)
+        return self.max
+
+    def merge(self, other):
+        for index, n in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + n
+        self.count += other.count
+        self.max = max(self.max, other.max)
+
+    def summary(self):
+        """p50/p99/max in microseconds."""
+        return {
+            "count": self.count,
+            "p50_us": round(self.percentile(50) / 1000, 1),
+            "p99_us": round(self.percentile(99) / 1000, 1),
+            "max_us": round(self.max / 1000, 1),
+        }
+
+
+class Telemetry:
+    """Opt-in per-event timing capture for Player.
+
+    For every dispatched event the player records the scheduled and actual
+    dispatch time and how long the dispatch took. The raw records go into
+    preallocated arrays used as a ring buffer (the last `capacity` events);
+    lateness is also folded into histograms per event type and per repeat
+    iteration, so a report covers the whole run at constant memory.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.scheduled = array("q", bytes(8 * capacity))
+        self.actual = array("q", bytes(8 * capacity))
+        self.duration = array("q", bytes(8 * capacity))
+        self.iteration = array("q", bytes(8 * capacity))
+        self.ops = array("b", bytes(capacity))
+        self.ok = array("b", bytes(capacity))
+        self.reset()
+
+    def reset(self):
+        """Start a new run. Player sets `skipped` if the run is stopped early."""
+        self.recorded = 0
+        self.failed = 0
+        self.skipped = 0
+        self.lateness = Histogram()
+        self.dispatch = Histogram()
+        self.by_type = {}
+        self.by_iteration = OrderedDict()
+
+    def record(self, op, iteration, scheduled_ns, actual_ns, done_ns, ok):
+        i = self.recorded % self.capacity
+        self.scheduled[i] = scheduled_ns
+        self.actual[i] = actual_ns
+        self.duration[i] = done_ns - actual_ns
+        self.iteration[i] = iteration
+        self.ops[i] = op
+        self.ok[i] = ok
+        self.recorded += 1
+        if not ok:
+            self.failed += 1
+        late = actual_ns - scheduled_ns
+        self.lateness.record(late)
+        self.dispatch.record(done_ns - actual_ns)
+        hist = self.by_type.get(op)
+        if hist is None:
+            hist = self.by_type[op] = Histogram()
+        hist.record(late)
+        hist = self.by_iteration.get(iteration)
+        if hist is None:
+            hist = self.by_iteration[iteration] = Histogram()
+            if len(self.by_iteration) > MAX_ITERATION_HISTOGRAMS:
+                self.by_iteration.popitem(last=False)
+        hist.record(late)
+
+    def recent(self):
+        """The buffered records, oldest first, as (op, iteration, scheduled, actual, duration, ok) tuples."""
+        n = min(self.recorded, self.capacity)
+        start = self.recorded - n
+        rows = []
+        for k in range(start, self.recorded):
+            i = k % self.capacity
+            rows.append((self.ops[i], self.iteration[i], self.scheduled[i],
+                         self.actual[i], self.duration[i], self.ok[i]))
+        return rows
+
+    def report(self):
+        return {
+            "dispatched": self.recorded,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "lateness": self.lateness.summary(),
+            "dispatch": self.dispatch.summary(),
+            "by_type": {OP_NAMES.get(op, str(op)): h.summary() for op, h in sorted(self.by_type.items())},
+            "by_iteration": {str(it): h.summary() for it, h in self.by_iteration.items()},
+        }
+
+    def format_report(self):
+        """A short human-readable summary for the CLI and GUI status line."""
+        r = self.report()
+        late = r["lateness"]
+        lines = [
+            f"{r['dispatched']} dispatched, {r['failed']} failed, {r['skipped']} skipped",
+            f"lateness p50 {late['p50_us']}us  p99 {late['p99_us']}us  max {late['max_us']}us",
+            f"dispatch p99 {r['dispatch']['p99_us']}us  max {r['dispatch']['max_us']}us",
+        ]
+        for name, s in r["by_type"].items():
+            lines.append(f"  {name:<6} n={s['count']:<8} p99 {s['p99_us']}us  max {s['max_us']}us")
+        return "\n".join(lines)
+
+    def write_report(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
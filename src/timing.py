@@ -0,0 +1,94 @@
+# src/timing.py
+# Playback time compression. A Timing turns a Plan's recorded offsets into
+# the schedule Player follows, gap by gap:
+#   uniform  every gap divided by speed (the classic speed control)
+#   cap      like uniform, but no gap longer than max_gap
+#   split    gaps up to long_gap play at speed; anything beyond long_gap is
+#            divided by long_speed as well, so think-pauses shrink while the
+#            short press→release gaps apps rely on keep their length
+#   fastest  only press→release and reposition→click spacing is kept, each
+#            at most min_gap (or the cursor settle time); every other gap is 0
+# Thresholds are in playback seconds, i.e. applied after speed.
+from array import array
+
+# Plan opcodes equal the binary format's TYPE_* codes; importing these
+# keeps pynput (loaded by src.plan) out of the headless CLI
+from src.macro_binary import TYPE_SCROLL, TYPE_KEY, TYPE_MOVE
+
+TIMING_MODES = ("uniform", "cap", "split", "fastest")
+
+
+class Timing:
+    """Gap-compression policy for Player.play."""
+
+    __slots__ = ("mode", "max_gap", "long_gap", "long_speed", "min_gap")
+
+    def __init__(self, mode="uniform", max_gap=1.0, long_gap=0.5, long_speed=4.0, min_gap=0.01):
+        if mode not in TIMING_MODES:
+            raise ValueError(f"Unknown timing mode '{mode}'")
+        if long_speed <= 0:
+            raise ValueError("long_speed must be positive")
+        self.mode = mode
+        self.max_gap = max_gap
+        self.long_gap = long_gap
+        self.long_speed = long_speed
+        self.min_gap = min_gap
+
+    @classmethod
+    def from_settings(cls, settings):
+        return cls(mode=settings.get("timing_mode", "uniform"),
+                   max_gap=settings.get("max_gap_s", 1.0),
+                   long_gap=settings.get("long_gap_s", 0.5),
+                   long_speed=settings.get("long_gap_speed", 4.0),
+                   min_gap=settings.get("min_gap_ms", 10) / 1000)
+
+    def schedule_ns(self, plan, speed=1.0, settle=0.0):
+        """Playback offset of every row of plan, in integer nanoseconds."""
+        if speed <= 0:
+            raise ValueError("speed must be positive")
+        offsets = plan.offsets
+        if self.mode == "uniform":
+            return array("q", (int(o * 1e9 / speed) for o in offsets))
+        mode = self.mode
+        max_gap, long_gap, long_speed, min_gap = self.max_gap, self.long_gap, self.long_speed, self.min_gap
+        # A reposition shorter than the settle time would click before the
+        # cursor arrives, so fastest never squeezes one below it
+        reposition_gap = max(min_gap, settle)
+        ops, xs, ys, pressed = plan.ops, plan.xs, plan.ys, plan.pressed
+        out = array("q", bytes(8 * len(offsets)))
+        t = 0.0
+        prev = 0.0
+        cursor = prev_op = None
+        for i, o in enumerate(offsets):
+            gap = (o - prev) / speed
+            prev = o
+            if mode == "cap":
+                if gap > max_gap:
+                    gap = max_gap
+            elif mode == "split":
+                if gap > long_gap:
+                    gap = long_gap + (gap - long_gap) / long_speed
+            else:
+                op = ops[i]
+                # Releases keep their hold time; presses and scrolls go at once
+                keep = 0.0 if pressed[i] or op == TYPE_SCROLL or op == TYPE_MOVE else min_gap
+                if op != TYPE_KEY:
+                    pos = (xs[i], ys[i])
+                    if op != TYPE_MOVE:
+                        if pos != cursor:
+                            keep = max(keep, reposition_gap)
+                        elif prev_op == TYPE_MOVE:
+                            keep = max(keep, min_gap)
+                    cursor = pos
+                prev_op = op
+                if gap > keep:
+                    gap = keep
+            t += gap
+            out[i] = int(t * 1e9)
+        return out
+
+    def duration(self, plan, speed=1.0, settle=0.0):
+        """Effective playback duration of one pass, in seconds."""
+        if not plan:
+            return 0.0
+        return self.schedule_ns(plan, speed, settle)[-1] / 1e9
@@ -0,0 +1,174 @@
+# src/tracks.py
+# Multi-track playback: several compiled macros overlaid on one timeline,
+# e.g. a keyboard macro running over a mouse-patrol macro. A single
+# dispatch thread merges the tracks lazily through a heap holding exactly
+# one pending entry per track, so memory is O(tracks) however long or
+# often-repeated the tracks are.
+import heapq
+import time
+
+from src.player import CURSOR_TRUST_NS, Player
+from src.plan import Plan, OP_KEY, OP_MOVE, compile_events
+from src.timing import Timing
+
+_UNIFORM = Timing()
+# Heap entry phases: reposition the cursor `settle` ahead, then dispatch
+_REPOSITION = 0
+_DISPATCH = 1
+
+
+class Track:
+    """One macro in a multi-track mix, with its own speed, start offset and repeats."""
+
+    __slots__ = ("plan", "name", "speed", "offset", "repeat", "timing", "muted", "stopped", "held")
+
+    def __init__(self, plan, name=None, speed=1.0, offset=0.0, repeat=1, timing=None):
+        self.plan = plan if isinstance(plan, Plan) else compile_events(plan)
+        self.name = name
+        self.speed = speed
+        self.offset = offset  # seconds after the mix starts
+        self.repeat = repeat
+        self.timing = timing if timing is not None else _UNIFORM
+        self.muted = False
+        self.stopped = False
+        self.held = set()  # keys this track currently holds down
+
+
+class MultiPlayer(Player):
+    """Plays any number of Tracks concurrently from one dispatch thread.
+
+    Each track keeps its own absolute timeline and held-key set. Tracks can
+    be muted (events are consumed on schedule but not sent) or stopped
+    while the mix plays; either releases the keys that track holds. The
+    cursor is shared, so a mouse event is repositioned again at dispatch
+    time if another track moved the cursor during its settle window.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stopping = False
+
+    def play(self, tracks, speed=1.0):
+        """Play tracks until all have finished or stop() is called.
+
+        speed multiplies every track's own speed. Returns False if stopped
+        before the end, True otherwise.
+        """
+        tracks = [t for t in tracks if t.plan]
+        if not tracks:
+            return True
+        self._stopping = False
+        self._stop_event.clear()
+        telemetry = self.telemetry
+        if telemetry is not None:
+            telemetry.reset()
+        now = time.perf_counter_ns
+        settle_ns = self._settle_ns
+        settle = settle_ns / 1e9
+        wait_until = self._scheduler.wait_until
+        dispatch = self._dispatch
+        move_to = self._move_to
+        schedules = [t.timing.schedule_ns(t.plan, t.speed * speed, settle) for t in tracks]
+        start_ns = now() + settle_ns
+        bases = [start_ns + int(t.offset * 1e9) for t in tracks]
+        heap = []
+
+        def push(k, it, i):
+            rel = schedules[k]
+            deadline = bases[k] + it * rel[-1] + rel[i]
+            op = tracks[k].plan.ops[i]
+            if settle_ns and op != OP_KEY and op != OP_MOVE:
+                heapq.heappush(heap, (deadline - settle_ns, k, it, i, _REPOSITION))
+            else:
+                heapq.heappush(heap, (deadline, k, it, i, _DISPATCH))
+
+        for k in range(len(tracks)):
+            push(k, 0, 0)
+        cursor = None
+        last_ns = start_ns  # deadline of the previous entry; after a long gap the cursor is unknown
+
+        try:
+            while heap:
+                deadline, k, it, i, phase = heap[0]
+                if not wait_until(deadline):
+                    if self._stopping:
+                        return self._stopped(tracks, heap)
+                    # Woken by stop_track()/mute_track(): release what those tracks hold
+                    self._stop_event.clear()
+                    if self._stopping:
+                        # stop() ran just before the clear; its wake-up was lost
+                        return self._stopped(tracks, heap)
+                    for track in tracks:
+                        if (track.stopped or track.muted) and track.held:
+                            self._release_held(track.held)
+                    # Drop stopped tracks now rather than when their entry comes due
+                    heap[:] = [entry for entry in heap if not tracks[entry[1]].stopped]
+                    heapq.heapify(heap)
+                    continue
+                heapq.heappop(heap)
+                if deadline - last_ns > CURSOR_TRUST_NS:
+                    cursor = None
+                last_ns = deadline
+                track = tracks[k]
+                if track.stopped:
+                    self._release_held(track.held)
+                    continue
+                plan = track.plan
+                op = plan.ops[i]
+                if phase == _REPOSITION:
+                    pos = (plan.xs[i], plan.ys[i])
+                    if pos != cursor and not track.muted:
+                        move_to(pos)
+                        cursor = pos
+                    heapq.heappush(heap, (deadline + settle_ns, k, it, i, _DISPATCH))
+                    continue
+                if track.muted:
+                    if track.held:
+                        self._release_held(track.held)
+                else:
+                    if op != OP_KEY:
+                        pos = (plan.xs[i], plan.ys[i])
+                        if pos != cursor:
+                            move_to(pos)
+                            cursor = pos
+                    if op != OP_MOVE:
+                        if telemetry is None:
+                            dispatch(op, plan.pressed[i], plan.args[i], track.held)
+                        else:
+                            t0 = now()
+                            ok = dispatch(op, plan.pressed[i], plan.args[i], track.held)
+                            telemetry.record(op, it, deadline, t0, now(), ok)
+                i += 1
+                if i == len(plan):
+                    self._release_held(track.held)
+                    i = 0
+                    it += 1
+                    if it == track.repeat:
+                        continue
+                push(k, it, i)
+            return True
+        finally:
+            for track in tracks:
+                self._release_held(track.held)
+
+    def _stopped(self, tracks, heap):
+        # Every track still playing has exactly one pending entry
+        if self.telemetry is not None:
+            for _, k, it, i, _ in heap:
+                n = len(tracks[k].plan)
+                self.telemetry.skipped += (n - i) + (tracks[k].repeat - it - 1) * n
+        return False
+
+    def stop(self):
+        self._stopping = True
+        super().stop()
+
+    def stop_track(self, track):
+        """Stop one track; the others keep playing."""
+        track.stopped = True
+        self._stop_event.set()  # wake the dispatch thread to release its keys
+
+    def mute_track(self, track, muted=True):
+        track.muted = muted
+        if muted:
+            self._stop_event.set()
@@ -0,0 +1,92 @@
+# src/watcher.py
+# Polling folder watcher, so macros copied into the folder by other tools
+# or synced from other machines show up without a restart. Only stdlib
+# os.scandir is used: each poll stats the folder (no file is opened) and
+# compares (mtime, size) per file with the previous poll, the same test
+# MacroIndex uses to decide what to re-describe.
+import os
+import threading
+
+DEFAULT_INTERVAL = 1.0  # seconds between polls
+
+
+def scan(folder, suffixes, ignore=()):
+    """{filename: (mtime_ns, size)} for non-hidden files in folder ending in one of suffixes, except ignore."""
+    snapshot = {}
+    try:
+        it = os.scandir(folder)
+    except (FileNotFoundError, NotADirectoryError):
+        return snapshot
+    with it:
+        for de in it:
+            name = de.name
+            if name.startswith(".") or not name.endswith(suffixes) or name in ignore:
+                continue
+            try:
+                if not de.is_file():
+                    continue
+                st = de.stat()
+            except FileNotFoundError:
+                continue  # removed between listing and stat
+            snapshot[name] = (st.st_mtime_ns, st.st_size)
+    return snapshot
+
+
+def diff(old, new):
+    """(added, removed, changed) filename sets between two scan() snapshots."""
+    added = new.keys() - old.keys()
+    removed = old.keys() - new.keys()
+    changed = {name for name in new.keys() & old.keys() if new[name] != old[name]}
+    return added, removed, changed
+
+
+class FolderWatcher:
+    """Polls a folder on a daemon thread and reports what changed.
+
+    on_change(added, removed, changed) is called from the watcher thread
+    with sets of filenames, and only when at least one set is non-empty;
+    GUI callers must hand the result over to their own thread. The first
+    snapshot is taken in the constructor, so only changes made after that
+    are reported. Filenames in ignore (e.g. a settings file sharing the
+    folder) are never reported.
+    """
+
+    def __init__(self, folder, suffixes, on_change, interval=DEFAULT_INTERVAL, ignore=()):
+        self.folder = folder
+        self._suffixes = tuple(suffixes)
+        self._ignore = frozenset(ignore)
+        self._on_change = on_change
+        self._interval = interval
+        self._snapshot = scan(folder, self._suffixes, self._ignore)
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def poll(self):
+        """Scan once and report changes since the previous scan; returns (added, removed, changed)."""
+        snapshot = scan(self.folder, self._suffixes, self._ignore)
+        added, removed, changed = diff(self._snapshot, snapshot)
+        self._snapshot = snapshot
+        if added or removed or changed:
+            self._on_change(added, removed, changed)
+        return added, removed, changed
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="folder-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=self._interval + 1.0)
+
+    def _run(self):
+        while not self._stop_event.wait(self._interval):
+            try:
+                self.poll()
+            except Exception as e:
+                # A failing callback must not end the watcher
+                print(f"Warning: folder watcher error ({e})")
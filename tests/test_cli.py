@@ -0,0 +1,167 @@
+# tests/test_cli.py
+import json
+import subprocess
+import sys
+import pytest
+from pathlib import Path
+from src.cli import main, IMPORT_BUDGET_MS
+from src.backends import NullBackend
+from src.macro_store import save_macro, list_macros, load_macro
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+SAMPLE_EVENTS = [
+    {"type": "key", "key": "a", "pressed": True, "t": 0.0},
+    {"type": "key", "key": "a", "pressed": False, "t": 0.05},
+]
+
+
+@pytest.fixture
+def folder(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.settings.SETTINGS_PATH", tmp_path / "settings.json")
+    folder = tmp_path / "macros"
+    save_macro("demo", SAMPLE_EVENTS, folder=folder)
+    return folder
+
+
+def test_headless_import_is_fast_and_tk_free():
+    code = ("import sys, time; t = time.perf_counter(); import src.cli; "
+            "print((time.perf_counter() - t) * 1000, 'tkinter' in sys.modules, 'pynput' in sys.modules)")
+    out = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+    ms, tk_loaded, pynput_loaded = out.stdout.split()
+    assert tk_loaded == "False" and pynput_loaded == "False"
+    assert float(ms) < IMPORT_BUDGET_MS
+
+
+def test_list(folder, capsys):
+    assert main(["--folder", str(folder), "list"]) == 0
+    assert capsys.readouterr().out.split() == ["demo"]
+
+
+def test_stats_reports_missing(folder, capsys):
+    assert main(["--folder", str(folder), "stats", "demo", "ghost"]) == 1
+    captured = capsys.readouterr()
+    assert "demo: 2 events" in captured.out
+    assert "ghost: not found" in captured.err
+
+
+def test_convert(folder):
+    assert main(["--folder", str(folder), "convert", "demo", "--to", "binary"]) == 0
+    assert (folder / "demo.mcb").exists()
+    assert list_macros(folder=folder) == ["demo"]
+
+
+def test_convert_compressed(folder):
+    assert main(["--folder", str(folder), "convert", "demo", "--to", "compressed", "--codec", "lzma"]) == 0
+    assert (folder / "demo.mcz").exists()
+    assert list_macros(folder=folder) == ["demo"]
+
+
+class _Ctrl:
+    # pynput's dummy backend aliases the Key members, so stand in for Key.ctrl
+    def __str__(self):
+        return "Key.ctrl"
+
+
+class _CtrlCBackend(NullBackend):
+    """Types 'c', then the Ctrl+C that stops `record`."""
+
+    def listen(self, **callbacks):
+        from pynput.keyboard import KeyCode
+
+        super().listen(**callbacks)
+        self.inject([("press", KeyCode.from_char("c")), ("release", KeyCode.from_char("c")),
+                     ("press", _Ctrl()), ("press", KeyCode.from_char("\x03"))])
+        return self
+
+
+def _interrupt(seconds):
+    raise KeyboardInterrupt
+
+
+def test_record_drops_the_ctrl_c_that_stops_it(folder, monkeypatch):
+    monkeypatch.setattr("src.recorder.PynputBackend", _CtrlCBackend)
+    monkeypatch.setattr("src.cli.time.sleep", _interrupt)
+    assert main(["--folder", str(folder), "record", "typed"]) == 0
+    assert [(e["key"], e["pressed"]) for e in load_macro("typed", folder=folder)] == [("c", True), ("c", False)]
+
+
+def test_record_rejects_bad_name_before_recording(folder, capsys):
+    assert main(["--folder", str(folder), "record", "../outside", "--duration", "0"]) == 1
+    assert "must not contain" in capsys.readouterr().err
+
+
+def test_play_dry_run(folder, capsys):
+    assert main(["--folder", str(folder), "play", "demo", "--repeat", "2", "--speed", "5", "--dry-run"]) == 0
+    assert "4 actions" in capsys.readouterr().out
+
+
+def test_play_missing_macro(folder, capsys):
+    assert main(["--folder", str(folder), "play", "ghost", "--dry-run"]) == 1
+    assert "not found" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("speed", ["0", "-2"])
+def test_play_rejects_non_positive_speed(folder, capsys, speed):
+    assert main(["--folder", str(folder), "play", "demo", "--speed", speed, "--dry-run"]) == 1
+    assert "--speed must be positive" in capsys.readouterr().err
+
+
+def test_play_report_writes_json(folder, tmp_path, capsys):
+    path = tmp_path / "report.json"
+    assert main(["--folder", str(folder), "play", "demo", "--dry-run", "--report", str(path)]) == 0
+    assert "2 dispatched, 0 failed, 0 skipped" in capsys.readouterr().out
+    assert json.loads(path.read_text())["dispatched"] == 2
+
+
+def test_play_process_dry_run(folder, capsys):
+    assert main(["--folder", str(folder), "play", "demo", "--process", "--dry-run", "--report"]) == 0
+    out = capsys.readouterr().out
+    assert "2 dispatched, 0 failed, 0 skipped" in out
+    assert "Dry run: 2 actions dispatched to the null backend in the playback process" in out
+
+
+def test_play_process_failure_is_reported(folder, capsys, monkeypatch):
+    def fail(self):
+        raise RuntimeError("playback process did not start")
+
+    monkeypatch.setattr("src.remote_player.RemotePlayer.start", fail)
+    assert main(["--folder", str(folder), "play", "demo", "--process", "--dry-run"]) == 1
+    assert "playback process did not start" in capsys.readouterr().err
+
+
+def test_play_range_dry_run(folder, capsys):
+    # Each pass of [0.01, end) re-presses the held 'a' and then releases it
+    assert main(["--folder", str(folder), "play", "demo", "--start", "0.01", "--repeat", "3", "--dry-run"]) == 0
+    assert "6 actions" in capsys.readouterr().out
+    assert main(["--folder", str(folder), "play", "demo", "demo", "--start", "0.01", "--dry-run"]) == 1
+
+
+def test_play_remap_dry_run(folder):
+    args = ["--folder", str(folder), "play", "demo", "--dry-run", "--remap-from", "1920x1080"]
+    assert main(args + ["--remap-to", "2560x1440+-2560+0"]) == 0
+    assert main(args + ["--remap-to", "big"]) == 1
+    assert main(args) == 1  # --remap-to missing
+
+
+def test_optimize_dry_run(folder, capsys):
+    assert main(["--folder", str(folder), "optimize", "demo", "--dry-run"]) == 0
+    assert "removed 0 of 2 events" in capsys.readouterr().out
+
+
+def test_play_tracks_dry_run(folder, capsys):
+    save_macro("other", SAMPLE_EVENTS, folder=folder)
+    assert main(["--folder", str(folder), "play", "demo", "other", "--offset", "0", "0.02", "--dry-run"]) == 0
+    out = capsys.readouterr().out
+    assert "Played demo + other" in out
+    assert "4 actions" in out
+
+
+def test_playlist_save_show_and_play(folder, capsys):
+    assert main(["--folder", str(folder), "playlist", "chain", "demo:2", "demo::2:0.01"]) == 0
+    assert main(["--folder", str(folder), "playlist", "chain"]) == 0
+    assert "demo" in capsys.readouterr().out
+    assert main(["--folder", str(folder), "play", "chain", "--playlist", "--dry-run"]) == 0
+    out = capsys.readouterr().out
+    assert "Played playlist chain (2 steps)" in out
+    assert "6 actions" in out
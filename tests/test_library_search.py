@@ -0,0 +1,85 @@
+# tests/test_library_search.py
+from src.library_search import SubstringIndex, LibraryModel
+
+COLUMNS = ("name", "events", "duration", "created")
+
+
+def _model():
+    model = LibraryModel(COLUMNS)
+    model.set("login", ("login", 12, "3.0s", "2024-05-01 09:00"), ("login", 12, 3.0, "2024-05-01 09:00"))
+    model.set("Logout", ("Logout", 4, "0.5s", "2024-06-02 10:00"), ("logout", 4, 0.5, "2024-06-02 10:00"))
+    model.set("farm", ("farm", 900, "60.0s", "2023-01-01 08:00"), ("farm", 900, 60.0, "2023-01-01 08:00"))
+    model.set("playlist:daily", ("▸ daily", "2 steps", "~3.5s", "2024-07-01 12:00"),
+              ("daily", 2, 3.5, "2024-07-01 12:00"), group=1)
+    return model
+
+
+def test_index_substring_search_is_case_insensitive():
+    index = SubstringIndex()
+    index.add("a", ("Login", "12"))
+    index.add("b", ("logout", "4"))
+    index.add("c", ("farm", "900"))
+    assert index.search("LOG") == {"a", "b"}
+    assert index.search("gout") == {"b"}
+    assert index.search("o") == {"a", "b"}
+    assert index.search("90") == {"c"}
+    assert index.search("zzz") == set()
+    index.remove("b")
+    assert index.search("log") == {"a"}
+
+
+def test_index_search_within_candidates():
+    index = SubstringIndex()
+    index.add("a", ("alpha",))
+    index.add("b", ("alphabet",))
+    assert index.search("alpha", within={"b"}) == {"b"}
+
+
+def test_model_filters_on_metadata_and_narrows():
+    model = _model()
+    model.search("log")
+    assert model.view == ["login", "Logout"]  # name keys are lowercased
+    model.search("logo")
+    assert model.view == ["Logout"]
+    model.search("2024-05")
+    assert model.view == ["login"]
+    model.search("")
+    assert len(model.view) == 4
+
+
+def test_model_sorts_by_column_within_groups():
+    model = _model()
+    model.sort("events")
+    assert model.view == ["Logout", "login", "farm", "playlist:daily"]
+    model.sort("duration", descending=True)
+    assert model.view == ["farm", "login", "Logout", "playlist:daily"]
+
+
+def test_model_updates_keep_query_applied():
+    model = _model()
+    model.search("log")
+    model.set("blog", ("blog", 1, "0.1s", "2024-01-01 00:00"))
+    model.set("farm", ("farm", 901, "60.0s", "2023-01-01 08:00"))
+    assert set(model.view) == {"login", "Logout", "blog"}
+    model.set("blog", ("bog", 1, "0.1s", "2024-01-01 00:00"))
+    assert "blog" not in model.view
+    assert model.remove("login") and not model.remove("login")
+    assert model.view == ["Logout"]
+    assert not model.shown("farm") and model.shown("Logout")
+
+
+def test_model_set_reports_unchanged_rows():
+    model = _model()
+    assert not model.set("farm", ("farm", 900, "60.0s", "2023-01-01 08:00"), ("farm", 900, 60.0, "2023-01-01 08:00"))
+
+
+def test_clear_keeps_query_and_sort():
+    model = _model()
+    model.search("log")
+    model.sort("events", descending=True)
+    model.clear()
+    assert model.view == []
+    model.set("login", ("login", 1, "0.1s", ""))
+    model.set("other", ("other", 1, "0.1s", ""))
+    assert model.view == ["login"]
+    assert (model.sort_column, model.descending) == ("events", True)
@@ -0,0 +1,77 @@
+# tests/test_macro_index.py
+import json
+import os
+from src.macro_index import MacroIndex, INDEX_FILENAME
+
+
+def _describe_counting(calls):
+    def describe(path):
+        calls.append(path.name)
+        return {"valid": True, "events": len(path.read_text())}
+    return describe
+
+
+def test_refresh_only_reparses_changed_files(tmp_path):
+    (tmp_path / "a.json").write_text("{}")
+    (tmp_path / "b.json").write_text("{}")
+    calls = []
+    index = MacroIndex(tmp_path, (".json",), _describe_counting(calls))
+    assert sorted(index.refresh()) == ["a.json", "b.json"]
+    assert sorted(calls) == ["a.json", "b.json"]
+
+    calls.clear()
+    index.refresh()
+    assert calls == []
+
+    (tmp_path / "b.json").write_text("{\"x\": 1}")
+    index.refresh()
+    assert calls == ["b.json"]
+
+
+def test_index_persists_between_instances(tmp_path):
+    (tmp_path / "a.json").write_text("{}")
+    MacroIndex(tmp_path, (".json",), _describe_counting([])).refresh()
+    assert (tmp_path / INDEX_FILENAME).exists()
+    calls = []
+    entries = MacroIndex(tmp_path, (".json",), _describe_counting(calls)).refresh()
+    assert calls == []
+    assert entries["a.json"]["events"] == 2
+
+
+def test_refresh_drops_removed_and_ignores_other_files(tmp_path):
+    (tmp_path / "a.json").write_text("{}")
+    (tmp_path / "notes.txt").write_text("x")
+    index = MacroIndex(tmp_path, (".json",), _describe_counting([]))
+    assert list(index.refresh()) == ["a.json"]
+    os.remove(tmp_path / "a.json")
+    assert index.refresh() == {}
+
+
+def test_corrupt_index_file_is_rebuilt(tmp_path):
+    (tmp_path / INDEX_FILENAME).write_text("not json")
+    (tmp_path / "a.json").write_text("{}")
+    index = MacroIndex(tmp_path, (".json",), _describe_counting([]))
+    assert list(index.refresh()) == ["a.json"]
+    assert json.loads((tmp_path / INDEX_FILENAME).read_text())["entries"]["a.json"]["valid"]
+
+
+def test_missing_folder_is_empty(tmp_path):
+    index = MacroIndex(tmp_path / "nope", (".json",), _describe_counting([]))
+    assert index.refresh() == {}
+
+
+def test_update_describes_a_single_file(tmp_path):
+    (tmp_path / "a.json").write_text("{}")
+    (tmp_path / "b.json").write_text("{}")
+    calls = []
+    index = MacroIndex(tmp_path, (".json",), _describe_counting(calls))
+    index.refresh()
+    calls.clear()
+    (tmp_path / "a.json").write_text("{\"x\": 1}")
+    assert index.update("a.json")["events"] == 8
+    assert calls == ["a.json"]
+    assert index.update("a.json")["events"] == 8  # unchanged: not reparsed
+    assert calls == ["a.json"]
+    (tmp_path / "a.json").unlink()
+    assert index.update("a.json") is None
+    assert sorted(index.refresh()) == ["b.json"]
@@ -2,7 +2,8 @@
 import json
 import pytest
 from pathlib import Path
-from src.macro_store import save_macro, load_macro, list_macros, delete_macro
+from src.macro_store import (save_macro, load_macro, load_columns, load_compiled, list_macros, list_macro_info,
+                             delete_macro, convert_macro, MacroCache, load_macro_cached, macro_info, MacroSaver)
 
 SAMPLE_EVENTS = [
     {"type": "click", "x": 100, "y": 200, "button": "left", "pressed": True, "t": 0.0},
@@ -44,3 +45,263 @@ def test_delete_macro(tmp_folder):
 
 def test_delete_nonexistent_is_noop(tmp_folder):
     delete_macro("ghost", folder=tmp_folder)  # should not raise
+
+BINARY_EVENTS = SAMPLE_EVENTS + [
+    {"type": "scroll", "x": 5, "y": 6, "dx": 0, "dy": -3, "t": 0.75},
+    {"type": "move", "path": [[1, 2, 0.8], [3, 4, 0.9]], "t": 0.8},
+    {"type": "key", "key": "left", "pressed": False, "t": 1.0},
+    {"type": "click", "x": 100, "y": 200, "button": "left", "pressed": False, "t": 1.25},
+]
+
+def test_binary_save_load_roundtrip(tmp_folder):
+    save_macro("bin", BINARY_EVENTS, folder=tmp_folder, fmt="binary")
+    assert (tmp_folder / "bin.mcb").exists()
+    assert load_macro("bin", folder=tmp_folder) == BINARY_EVENTS
+
+def test_load_columns_binary(tmp_folder):
+    save_macro("bin", BINARY_EVENTS, folder=tmp_folder, fmt="binary")
+    cols = load_columns("bin", folder=tmp_folder)
+    assert len(cols) == len(BINARY_EVENTS)
+    assert list(cols.t) == [e["t"] for e in BINARY_EVENTS]
+    assert cols.name == "bin"
+
+def test_list_macros_detects_both_formats(tmp_folder):
+    save_macro("alpha", SAMPLE_EVENTS, folder=tmp_folder)
+    save_macro("beta", SAMPLE_EVENTS, folder=tmp_folder, fmt="binary")
+    assert list_macros(folder=tmp_folder) == ["alpha", "beta"]
+
+def test_list_macros_skips_truncated_binary(tmp_folder):
+    path = save_macro("bin", BINARY_EVENTS, folder=tmp_folder, fmt="binary")
+    path.write_bytes(path.read_bytes()[:-3])
+    assert list_macros(folder=tmp_folder) == []
+    with pytest.raises(ValueError):
+        load_macro("bin", folder=tmp_folder)
+
+def test_convert_between_formats(tmp_folder):
+    save_macro("conv", BINARY_EVENTS, folder=tmp_folder)
+    convert_macro("conv", "binary", folder=tmp_folder)
+    assert not (tmp_folder / "conv.json").exists()
+    assert (tmp_folder / "conv.mcb").exists()
+    convert_macro("conv", "json", folder=tmp_folder)
+    assert (tmp_folder / "conv.json").exists()
+    assert not (tmp_folder / "conv.mcb").exists()
+    assert load_macro("conv", folder=tmp_folder) == BINARY_EVENTS
+
+@pytest.mark.parametrize("codec", ["zlib", "lzma"])
+def test_compressed_roundtrip_is_lossless(tmp_folder, codec):
+    path = save_macro("z", BINARY_EVENTS, folder=tmp_folder, fmt="compressed", codec=codec)
+    assert path.suffix == ".mcz"
+    assert load_macro("z", folder=tmp_folder) == BINARY_EVENTS
+    assert list(load_columns("z", folder=tmp_folder).t) == [e["t"] for e in BINARY_EVENTS]
+    assert list_macro_info(folder=tmp_folder)[0]["events"] == len(BINARY_EVENTS)
+
+def test_compressed_coarse_resolution_rounds_timestamps(tmp_folder):
+    events = [dict(e, t=e["t"] + 0.0004) for e in SAMPLE_EVENTS]
+    save_macro("z", events, folder=tmp_folder, fmt="compressed", resolution=0.001)
+    assert [e["t"] for e in load_macro("z", folder=tmp_folder)] == [0.0, 0.5]
+
+def test_compressed_is_smaller_than_binary(tmp_folder):
+    events = [{"type": "key", "key": "a", "pressed": i % 2 == 0, "t": round(i * 0.05, 4)} for i in range(2000)]
+    binary = save_macro("b", events, folder=tmp_folder, fmt="binary")
+    compressed = save_macro("z", events, folder=tmp_folder, fmt="compressed")
+    assert compressed.stat().st_size * 5 < binary.stat().st_size
+    assert load_macro("z", folder=tmp_folder) == events
+
+def test_corrupt_compressed_raises(tmp_folder):
+    path = save_macro("z", BINARY_EVENTS, folder=tmp_folder, fmt="compressed")
+    path.write_bytes(path.read_bytes()[:-5])
+    assert list_macros(folder=tmp_folder) == []
+    with pytest.raises(ValueError):
+        load_macro("z", folder=tmp_folder)
+
+def test_unknown_codec_rejected(tmp_folder):
+    with pytest.raises(ValueError):
+        save_macro("z", SAMPLE_EVENTS, folder=tmp_folder, fmt="compressed", codec="zstd")
+
+def test_delete_removes_binary(tmp_folder):
+    save_macro("bin", SAMPLE_EVENTS, folder=tmp_folder, fmt="binary")
+    delete_macro("bin", folder=tmp_folder)
+    assert list_macros(folder=tmp_folder) == []
+
+def test_load_missing_raises(tmp_folder):
+    with pytest.raises(FileNotFoundError):
+        load_macro("ghost", folder=tmp_folder)
+
+def test_stream_format_tolerates_truncated_tail(tmp_folder):
+    path = save_macro("s", SAMPLE_EVENTS, folder=tmp_folder, fmt="stream")
+    assert path.suffix == ".jsonl"
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"type": "key", "ke')  # crash mid-line
+    assert load_macro("s", folder=tmp_folder) == SAMPLE_EVENTS
+    assert list_macros(folder=tmp_folder) == ["s"]
+
+def _leave_crashed_stream(folder, name, events):
+    # What a stream recording killed mid-session leaves behind
+    path = save_macro("crashed", events, folder=folder, fmt="stream")
+    return path.rename(folder / f"{name}.jsonl.tmp")
+
+def test_crashed_stream_recording_is_recovered_on_list(tmp_folder):
+    save_macro("s", SAMPLE_EVENTS[:1], folder=tmp_folder)
+    _leave_crashed_stream(tmp_folder, "s", SAMPLE_EVENTS)
+    assert list_macros(folder=tmp_folder) == ["s"]
+    assert load_macro("s", folder=tmp_folder) == SAMPLE_EVENTS
+    assert sorted(p.name for p in tmp_folder.iterdir() if not p.name.startswith(".")) == ["s.jsonl"]
+
+def test_crashed_stream_recording_survives_next_recording(tmp_folder):
+    from src.macro_store import StreamWriter
+    _leave_crashed_stream(tmp_folder, "s", SAMPLE_EVENTS)
+    writer = StreamWriter("s", folder=tmp_folder)
+    with pytest.raises(ValueError, match="already being recorded"):
+        StreamWriter("s", folder=tmp_folder)
+    writer.close(keep=False)
+    assert load_macro("s", folder=tmp_folder) == SAMPLE_EVENTS
+
+def test_empty_crashed_stream_recording_is_dropped(tmp_folder):
+    save_macro("s", SAMPLE_EVENTS, folder=tmp_folder)
+    _leave_crashed_stream(tmp_folder, "s", [])
+    assert load_macro("s", folder=tmp_folder) == SAMPLE_EVENTS
+    assert not (tmp_folder / "s.jsonl.tmp").exists()
+
+def test_list_macro_info_metadata(tmp_folder):
+    save_macro("info", BINARY_EVENTS, folder=tmp_folder, fmt="binary")
+    save_macro("plain", SAMPLE_EVENTS, folder=tmp_folder)
+    (tmp_folder / "bad.json").write_text("not json")
+    infos = {info["name"]: info for info in list_macro_info(folder=tmp_folder)}
+    assert infos["bad"]["valid"] is False
+    assert infos["info"]["events"] == len(BINARY_EVENTS)
+    assert infos["info"]["duration"] == 1.25
+    assert infos["info"]["types"] == {"click": 2, "key": 2, "scroll": 1, "move": 1}
+    assert infos["plain"]["types"] == {"click": 1, "key": 1}
+    assert infos["plain"]["created"]
+
+def test_list_macros_sees_rewrites(tmp_folder):
+    save_macro("m", SAMPLE_EVENTS, folder=tmp_folder)
+    assert list_macro_info(folder=tmp_folder)[0]["events"] == 2
+    save_macro("m", SAMPLE_EVENTS[:1], folder=tmp_folder)
+    assert list_macro_info(folder=tmp_folder)[0]["events"] == 1
+
+def test_cache_hits_until_file_changes(tmp_folder):
+    cache = MacroCache()
+    save_macro("c", SAMPLE_EVENTS, folder=tmp_folder)
+    first = cache.get("c", folder=tmp_folder)
+    assert cache.get("c", folder=tmp_folder) is first
+    assert (cache.hits, cache.misses) == (1, 1)
+    save_macro("c", SAMPLE_EVENTS[:1], folder=tmp_folder)
+    cache.invalidate(tmp_folder / "c.json")
+    assert len(cache.get("c", folder=tmp_folder)) == 1
+    assert cache.misses == 2
+
+def test_cache_invalidated_by_save_and_delete(tmp_folder):
+    save_macro("c", SAMPLE_EVENTS, folder=tmp_folder)
+    load_macro_cached("c", folder=tmp_folder)
+    save_macro("c", SAMPLE_EVENTS[:1], folder=tmp_folder)
+    assert len(load_macro_cached("c", folder=tmp_folder)) == 1
+    delete_macro("c", folder=tmp_folder)
+    with pytest.raises(FileNotFoundError):
+        load_macro_cached("c", folder=tmp_folder)
+
+def test_cache_evicts_lru_over_budget(tmp_folder):
+    for name in ("a", "b", "c"):
+        save_macro(name, SAMPLE_EVENTS, folder=tmp_folder)
+    one = MacroCache().get("a", folder=tmp_folder).nbytes()
+    cache = MacroCache(budget=2 * one)
+    cache.get("a", folder=tmp_folder)
+    cache.get("b", folder=tmp_folder)
+    cache.get("a", folder=tmp_folder)  # b is now least recently used
+    cache.get("c", folder=tmp_folder)
+    stats = cache.stats()
+    assert stats["evictions"] == 1 and stats["entries"] == 2
+    cache.get("a", folder=tmp_folder)
+    assert cache.stats()["hits"] == 2
+
+def test_cache_keys_by_transform(tmp_folder):
+    save_macro("c", SAMPLE_EVENTS, folder=tmp_folder)
+    cache = MacroCache()
+    cols = cache.get("c", folder=tmp_folder)
+    n = cache.get("c", folder=tmp_folder, transform=len)
+    assert n == 2 and cols is not n
+    assert cache.stats()["entries"] == 2
+
+def test_failed_save_keeps_previous_file(tmp_folder):
+    save_macro("keep", SAMPLE_EVENTS, folder=tmp_folder)
+    with pytest.raises(TypeError):
+        save_macro("keep", [{"type": "key", "t": object()}], folder=tmp_folder)
+    assert load_macro("keep", folder=tmp_folder) == SAMPLE_EVENTS
+    assert sorted(p.name for p in tmp_folder.iterdir() if not p.name.startswith(".")) == ["keep.json"]
+
+def test_macro_info_reindexes_one_file(tmp_folder):
+    assert macro_info("ghost", folder=tmp_folder) is None
+    save_macro("one", SAMPLE_EVENTS, folder=tmp_folder)
+    info = macro_info("one", folder=tmp_folder)
+    assert (info["name"], info["events"], info["duration"]) == ("one", 2, 0.5)
+
+def test_saver_saves_in_background_and_refuses_duplicates(tmp_folder):
+    import threading
+    saver = MacroSaver()
+    gate = threading.Event()
+    saver._pool.submit(gate.wait)  # hold the worker so the save stays pending
+    results = []
+    future = saver.save("bg", SAMPLE_EVENTS, folder=tmp_folder, on_done=lambda info, err: results.append((info, err)))
+    assert saver.is_saving("bg") and saver.is_saving()
+    with pytest.raises(RuntimeError):
+        saver.save("bg", SAMPLE_EVENTS, folder=tmp_folder)
+    gate.set()
+    info = future.result(timeout=5)
+    assert results == [(info, None)]
+    assert info["events"] == 2
+    assert not saver.is_saving()
+    saver.shutdown()
+
+def test_saver_reports_errors(tmp_folder):
+    saver = MacroSaver()
+    results = []
+    future = saver.save("bad", SAMPLE_EVENTS, folder=tmp_folder, fmt="nope", on_done=lambda i, e: results.append(e))
+    with pytest.raises(ValueError):
+        future.result(timeout=5)
+    assert isinstance(results[0], ValueError)
+    assert not saver.is_saving("bad")
+    saver.shutdown()
+
+def test_saver_runs_other_writes_and_reindexes(tmp_folder):
+    save_macro("w", SAMPLE_EVENTS, folder=tmp_folder)
+    saver = MacroSaver()
+    results = []
+    future = saver.submit("w", lambda: save_macro("w", SAMPLE_EVENTS[:1], folder=tmp_folder), folder=tmp_folder,
+                          on_done=lambda info, err: results.append((info, err)))
+    info = future.result(timeout=5)
+    assert results == [(info, None)] and info["events"] == 1
+    saver.shutdown()
+
+def test_load_compiled_passes_json_events_straight_through(tmp_folder):
+    save_macro("j", SAMPLE_EVENTS, folder=tmp_folder)
+    save_macro("b", SAMPLE_EVENTS, folder=tmp_folder, fmt="binary")
+    assert load_compiled("j", lambda source: source, folder=tmp_folder) == SAMPLE_EVENTS
+    assert type(load_compiled("b", lambda source: source, folder=tmp_folder)).__name__ == "MacroColumns"
+    with pytest.raises(FileNotFoundError):
+        load_compiled("ghost", len, folder=tmp_folder)
+
+@pytest.mark.parametrize("events", [
+    [{"type": "key", "pressed": True, "t": 0.0}],  # no key
+    [{"type": "click", "x": "1", "y": 2, "button": "left", "pressed": True, "t": None}],
+    ["not an event"],
+])
+def test_malformed_json_events_are_reported_as_corrupt(tmp_folder, events):
+    from src.plan import compile_events
+    save_macro("bad", events, folder=tmp_folder)
+    with pytest.raises(ValueError, match="corrupt"):
+        load_compiled("bad", compile_events, folder=tmp_folder)
+    with pytest.raises(ValueError, match="corrupt"):
+        load_macro_cached("bad", folder=tmp_folder, transform=compile_events)
+    with pytest.raises(ValueError, match="corrupt"):
+        load_columns("bad", folder=tmp_folder)
+
+def test_json_without_events_list_is_corrupt(tmp_folder):
+    tmp_folder.mkdir()
+    (tmp_folder / "list.json").write_text("[1, 2]")
+    with pytest.raises(ValueError, match="corrupt"):
+        load_macro("list", folder=tmp_folder)
+
+def test_save_rejects_names_outside_the_folder(tmp_folder):
+    with pytest.raises(ValueError):
+        save_macro("../outside", SAMPLE_EVENTS, folder=tmp_folder)
+    assert not (tmp_folder.parent / "outside.json").exists()
@@ -0,0 +1,82 @@
+# tests/test_optimizer.py
+import pytest
+from src.optimizer import EST_DISPATCH_COST, optimize, optimize_macro, format_stats
+from src.macro_store import save_macro, load_macro
+
+
+def _key(key, pressed, t):
+    return {"type": "key", "key": key, "pressed": pressed, "t": t}
+
+
+def _scroll(x, y, dy, t):
+    return {"type": "scroll", "x": x, "y": y, "dx": 0, "dy": dy, "t": t}
+
+
+def test_auto_repeat_kept_unless_asked():
+    events = [_key("a", True, 0.0), _key("a", True, 0.5), _key("a", True, 0.53), _key("a", False, 0.6)]
+    assert optimize(events)[0] == events
+    out, stats = optimize(events, collapse_repeats=True)
+    assert out == [events[0], events[3]]
+    assert stats["key_repeats"] == 2
+
+
+def test_repeat_after_release_is_a_new_press():
+    events = [_key("a", True, 0.0), _key("a", False, 0.1), _key("a", True, 0.2), _key("a", False, 0.3)]
+    assert optimize(events, collapse_repeats=True)[0] == events
+
+
+def test_adjacent_scrolls_merge_within_window():
+    events = [_scroll(5, 5, 1, 0.0), _scroll(5, 5, 1, 0.02), _scroll(5, 5, -1, 0.04),
+              _scroll(9, 9, 1, 0.06), _scroll(9, 9, 1, 1.0)]
+    out, stats = optimize(events)
+    assert [(e["x"], e["dy"], e["t"]) for e in out] == [(5, 1, 0.0), (9, 1, 0.06), (9, 1, 1.0)]
+    assert stats["scrolls_merged"] == 2
+    assert all("_last_t" not in e for e in out)
+    assert events[0]["dy"] == 1  # input untouched
+
+
+def test_scrolls_split_by_other_events_stay_separate():
+    events = [_scroll(5, 5, 1, 0.0), _key("a", True, 0.01), _scroll(5, 5, 1, 0.02)]
+    assert len(optimize(events)[0]) == 3
+
+
+def test_moves_that_go_nowhere_are_dropped():
+    events = [
+        {"type": "click", "x": 3, "y": 4, "button": "left", "pressed": True, "t": 0.0},
+        {"type": "move", "path": [[3, 4, 0.1], [3, 4, 0.2]], "t": 0.1},
+        {"type": "move", "path": [[3, 4, 0.3], [8, 8, 0.4]], "t": 0.3},
+    ]
+    out, stats = optimize(events)
+    assert out == [events[0], events[2]]
+    assert stats["moves_dropped"] == 1
+    assert stats["saved_s"] == EST_DISPATCH_COST  # one backend call, no settle time
+    assert "removed 1 of 3 events" in format_stats(stats)
+
+
+def test_optimize_macro_keeps_format(tmp_path):
+    events = [_scroll(1, 1, 1, 0.0), _scroll(1, 1, 1, 0.01)]
+    save_macro("m", events, folder=tmp_path, fmt="binary")
+    assert optimize_macro("m", folder=tmp_path, dry_run=True)["removed"] == 1
+    assert len(load_macro("m", folder=tmp_path)) == 2
+    optimize_macro("m", folder=tmp_path)
+    assert (tmp_path / "m.mcb").exists()
+    assert load_macro("m", folder=tmp_path)[0]["dy"] == 2
+
+
+@pytest.mark.parametrize("fmt", ["compressed", "json", "stream"])
+def test_optimize_macro_keeps_compression_and_created(tmp_path, fmt):
+    from src.macro_binary import read_compressed_options
+    from src.macro_store import load_stored
+    events = [_scroll(1, 1, 1, 0.0), _scroll(1, 1, 1, 0.01)]
+    save_macro("m", events, folder=tmp_path, fmt=fmt, codec="lzma", resolution=0.01, created="2020-01-02T03:04:05")
+    optimize_macro("m", folder=tmp_path)
+    events, stored = load_stored("m", folder=tmp_path)
+    assert len(events) == 1
+    assert (stored["fmt"], stored["created"]) == (fmt, "2020-01-02T03:04:05")
+    if fmt == "compressed":
+        assert read_compressed_options(tmp_path / "m.mcz") == ("lzma", 0.01)
+
+
+def test_optimize_macro_missing(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        optimize_macro("ghost", folder=tmp_path)
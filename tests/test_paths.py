@@ -0,0 +1,42 @@
+# tests/test_paths.py
+from src.paths import simplify, interpolate
+
+
+def test_simplify_straight_constant_speed_line():
+    points = [(i, 2 * i, i * 0.01) for i in range(50)]
+    assert simplify(points, 1.0) == [points[0], points[-1]]
+
+
+def test_simplify_keeps_corner():
+    points = [(i, 0, i * 0.01) for i in range(10)] + [(9, j, 0.09 + j * 0.01) for j in range(1, 10)]
+    kept = simplify(points, 1.0)
+    assert (9, 0, 0.09) in kept
+    assert len(kept) == 3
+
+
+def test_simplify_keeps_pause_on_straight_line():
+    # Cursor moves to x=10, waits a second, then continues to x=20
+    points = [(i, 0, i * 0.01) for i in range(11)]
+    points += [(10, 0, 1.0)]
+    points += [(10 + i, 0, 1.0 + i * 0.01) for i in range(1, 11)]
+    kept = simplify(points, 1.0)
+    assert len(kept) > 2
+
+
+def test_simplify_short_inputs():
+    assert simplify([], 1.0) == []
+    assert simplify([(1, 1, 0.0)], 1.0) == [(1, 1, 0.0)]
+
+
+def test_interpolate_fills_steps():
+    out = interpolate([[0, 0, 0.0], [100, 0, 0.1]], 0.01)
+    assert out[0] == (0, 0, 0.0)
+    assert out[-1] == (100, 0, 0.1)
+    assert len(out) >= 10
+    xs = [p[0] for p in out]
+    assert xs == sorted(xs)
+
+
+def test_interpolate_zero_step_returns_vertices():
+    path = [[0, 0, 0.0], [5, 5, 1.0]]
+    assert interpolate(path, 0) == [(0, 0, 0.0), (5, 5, 1.0)]
@@ -0,0 +1,110 @@
+# tests/test_plan.py
+import pytest
+from src.plan import compile_events, parse_key, OP_CLICK, OP_SCROLL, OP_KEY, OP_MOVE
+from pynput.keyboard import KeyCode
+from pynput.mouse import Button
+
+SAMPLE_EVENTS = [
+    {"type": "click", "x": 100.0, "y": 200.0, "button": "left", "pressed": True, "t": 1.0},
+    {"type": "scroll", "x": 5, "y": 6, "dx": 0, "dy": -2, "t": 1.25},
+    {"type": "key", "key": "a", "pressed": True, "t": 1.5},
+    {"type": "key", "key": "a", "pressed": False, "t": 2.0},
+]
+
+
+def test_compile_resolves_columns():
+    plan = compile_events(SAMPLE_EVENTS)
+    assert len(plan) == 4
+    assert list(plan.ops) == [OP_CLICK, OP_SCROLL, OP_KEY, OP_KEY]
+    assert list(plan.offsets) == [0.0, 0.25, 0.5, 1.0]
+    assert plan.xs[0] == 100 and plan.ys[0] == 200
+    assert plan.args[0] == Button.left
+    assert plan.args[1] == (0, -2)
+    assert plan.args[2] == KeyCode.from_char("a")
+    assert list(plan.pressed) == [1, 0, 1, 0]
+    assert plan.duration == 1.0
+
+
+def test_compile_empty():
+    plan = compile_events([])
+    assert len(plan) == 0
+    assert plan.duration == 0.0
+
+
+def test_compile_skips_unknown_types():
+    plan = compile_events([{"type": "bogus", "t": 0.0}] + SAMPLE_EVENTS)
+    assert len(plan) == 4
+
+
+def test_compile_rejects_unknown_button():
+    with pytest.raises(ValueError):
+        compile_events([{"type": "click", "x": 0, "y": 0, "button": "nope", "pressed": True, "t": 0.0}])
+
+
+def test_parse_key_empty_string_is_space():
+    assert parse_key("") == KeyCode.from_char(" ")
+
+
+def test_compile_expands_move_paths():
+    events = [
+        {"type": "move", "path": [[0, 0, 0.0], [100, 0, 0.1]], "t": 0.0},
+        {"type": "click", "x": 100, "y": 0, "button": "left", "pressed": True, "t": 0.2},
+    ]
+    plan = compile_events(events, move_step=0.01)
+    moves = [i for i, op in enumerate(plan.ops) if op == OP_MOVE]
+    assert len(moves) >= 10
+    assert plan.xs[moves[-1]] == 100
+    assert plan.ops[-1] == OP_CLICK
+    offsets = list(plan.offsets)
+    assert offsets == sorted(offsets)
+
+
+def test_compile_columns_matches_compile_events():
+    from src.macro_binary import MacroColumns
+    events = SAMPLE_EVENTS + [{"type": "key", "key": "left", "pressed": True, "t": 2.5},
+                              {"type": "click", "x": 1, "y": 1, "button": "left", "pressed": False, "t": 3.0}]
+    a = compile_events(events)
+    b = compile_events(MacroColumns.from_events(events))
+    assert list(a.ops) == list(b.ops)
+    assert list(a.offsets) == list(b.offsets)
+    assert list(a.xs) == list(b.xs) and list(a.ys) == list(b.ys)
+    assert list(a.pressed) == list(b.pressed)
+    assert a.args == b.args
+
+
+SEEK_EVENTS = [
+    {"type": "key", "key": "shift", "pressed": True, "t": 0.0},
+    {"type": "click", "x": 10, "y": 20, "button": "left", "pressed": True, "t": 0.1},
+    {"type": "key", "key": "a", "pressed": True, "t": 0.2},
+    {"type": "key", "key": "a", "pressed": False, "t": 0.3},
+    {"type": "click", "x": 10, "y": 20, "button": "left", "pressed": False, "t": 0.4},
+    {"type": "key", "key": "shift", "pressed": False, "t": 0.5},
+]
+
+
+def test_row_at_bisects_offsets():
+    plan = compile_events(SEEK_EVENTS)
+    assert plan.row_at(0.0) == 0
+    assert plan.row_at(0.25) == 3
+    assert plan.row_at(0.3) == 3
+    assert plan.row_at(9.0) == len(plan)
+
+
+def test_state_at_restores_held_keys_buttons_and_cursor():
+    plan = compile_events(SEEK_EVENTS)
+    assert plan.state_at(0) == (set(), set(), None)
+    keys, buttons, cursor = plan.state_at(3)
+    assert keys == {parse_key("shift"), KeyCode.from_char("a")}
+    assert buttons == {Button.left}
+    assert cursor == (10, 20)
+    assert plan.state_at(5)[:2] == ({parse_key("shift")}, set())
+
+
+def test_state_at_uses_checkpoints(monkeypatch):
+    import src.plan
+    monkeypatch.setattr(src.plan, "CHECKPOINT_ROWS", 2)
+    plan = compile_events(SEEK_EVENTS)
+    for row in range(len(plan) + 1):
+        keys = {plan.args[i] for i in range(row) if plan.ops[i] == OP_KEY and plan.pressed[i]}
+        keys -= {plan.args[i] for i in range(row) if plan.ops[i] == OP_KEY and not plan.pressed[i]}
+        assert plan.state_at(row)[0] == keys
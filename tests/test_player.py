@@ -3,12 +3,15 @@ import pytest
 import time
 import threading
 from src.player import Player
+from src.backends import NullBackend
+from src.telemetry import Telemetry
+from src.timing import Timing
 from pynput.keyboard import Key, KeyCode
 from pynput.mouse import Button
 
 
 def test_parse_key_char():
-    p = Player()
+    p = Player(backend=NullBackend())
     result = p._parse_key("a")
     assert result == KeyCode.from_char("a")
     result_v = p._parse_key("v")
@@ -16,32 +19,32 @@ def test_parse_key_char():
 
 
 def test_parse_key_special_enter():
-    p = Player()
+    p = Player(backend=NullBackend())
     result = p._parse_key("enter")
     assert result == Key.enter
 
 
 def test_parse_key_ctrl_and_space():
-    p = Player()
+    p = Player(backend=NullBackend())
     assert p._parse_key("ctrl_l") == Key.ctrl_l
     assert p._parse_key("space") == Key.space
 
 
 def test_parse_key_fallback_for_unknown():
-    p = Player()
+    p = Player(backend=NullBackend())
     # An unknown key string falls back to KeyCode.from_char of first char
     result = p._parse_key("z")
     assert result == KeyCode.from_char("z")
 
 
 def test_play_empty_events_does_nothing():
-    p = Player()
+    p = Player(backend=NullBackend())
     p.play([])  # should return immediately without error or hang
 
 
 def test_play_respects_stop():
     """stop() called while play() is waiting should abort early."""
-    p = Player()
+    p = Player(backend=NullBackend())
     events = [
         {"type": "key", "key": "a", "pressed": True, "t": 0.0},
         {"type": "key", "key": "a", "pressed": False, "t": 10.0},  # 10s gap
@@ -59,7 +62,7 @@ def test_play_respects_stop():
 
 def test_play_speed_multiplier():
     """Events with 0.5s gap at 2x speed should complete in ~0.25s, not 0.5s."""
-    p = Player()
+    p = Player(backend=NullBackend())
     events = [
         {"type": "key", "key": "a", "pressed": True,  "t": 0.0},
         {"type": "key", "key": "a", "pressed": False, "t": 0.5},
@@ -69,3 +72,182 @@ def test_play_speed_multiplier():
     elapsed = time.time() - start
     assert elapsed > 0.05, f"timing should not be skipped entirely, took {elapsed:.2f}s"
     assert elapsed < 0.4, f"2x speed should take ~0.25s, took {elapsed:.2f}s"
+
+
+def test_play_repeats_share_one_timeline():
+    """3 repeats of a 0.1s macro take ~0.3s total, not 3 separately-drifting runs."""
+    p = Player(backend=NullBackend())
+    events = [
+        {"type": "key", "key": "a", "pressed": True,  "t": 0.0},
+        {"type": "key", "key": "a", "pressed": False, "t": 0.1},
+    ]
+    seen = []
+    start = time.perf_counter()
+    p.play(events, repeat=3, on_iteration=seen.append)
+    elapsed = time.perf_counter() - start
+    assert seen == [0, 1, 2]
+    assert 0.29 < elapsed < 0.4, f"last event is due at 0.3s, took {elapsed:.3f}s"
+
+
+def test_play_stop_aborts_remaining_repeats():
+    p = Player(backend=NullBackend())
+    events = [
+        {"type": "key", "key": "a", "pressed": True,  "t": 0.0},
+        {"type": "key", "key": "a", "pressed": False, "t": 1.0},
+    ]
+    threading.Timer(0.05, p.stop).start()
+    start = time.perf_counter()
+    p.play(events, repeat=1000)
+    assert time.perf_counter() - start < 1.0
+
+
+def test_settle_skips_unchanged_position():
+    backend = NullBackend()
+    p = Player(settle=0.0, backend=backend)
+    events = [
+        {"type": "click", "x": 10, "y": 20, "button": "left", "pressed": True, "t": 0.0},
+        {"type": "click", "x": 10, "y": 20, "button": "left", "pressed": False, "t": 0.01},
+        {"type": "scroll", "x": 10, "y": 20, "dx": 0, "dy": 1, "t": 0.02},
+        {"type": "scroll", "x": 30, "y": 40, "dx": 0, "dy": 1, "t": 0.03},
+    ]
+    p.play(events)
+    kinds = [entry[1] for entry in backend.log]
+    assert kinds == ["move", "press_button", "release_button", "scroll", "move", "scroll"]
+
+
+def test_unchanged_position_is_moved_to_again_after_a_long_gap():
+    # The user may have moved the mouse during the pause
+    backend = NullBackend()
+    p = Player(settle=0.0, backend=backend)
+    events = [
+        {"type": "click", "x": 10, "y": 20, "button": "left", "pressed": True, "t": 0.0},
+        {"type": "click", "x": 10, "y": 20, "button": "left", "pressed": False, "t": 0.01},
+        {"type": "click", "x": 10, "y": 20, "button": "left", "pressed": True, "t": 0.3},
+    ]
+    p.play(events)
+    kinds = [entry[1] for entry in backend.log]
+    assert kinds == ["move", "press_button", "release_button", "move", "press_button", "release_button"]
+
+
+def test_settle_moves_ahead_of_deadline():
+    """The settle delay is taken from the schedule, not added after it."""
+    backend = NullBackend()
+    p = Player(settle=0.05, backend=backend)
+    events = [
+        {"type": "key", "key": "a", "pressed": True, "t": 0.0},
+        {"type": "click", "x": 1, "y": 1, "button": "left", "pressed": True, "t": 0.2},
+    ]
+    start = time.perf_counter_ns()
+    p.play(events)
+    (_, _, _), (t_move, _, _), (t_press, _, _) = backend.log[:3]
+    assert t_press - t_move >= 35_000_000
+    # click is due at settle + 0.2s from start; it must not be pushed later
+    assert t_press - start < 300_000_000
+
+
+def test_null_backend_logs_dispatch_timestamps():
+    backend = NullBackend()
+    p = Player(backend=backend)
+    events = [
+        {"type": "key", "key": "a", "pressed": True,  "t": 0.0},
+        {"type": "key", "key": "a", "pressed": False, "t": 0.05},
+    ]
+    start = time.perf_counter_ns()
+    p.play(events)
+    (t0, a0, k0), (t1, a1, k1) = backend.log
+    assert (a0, a1) == ("press_key", "release_key")
+    assert k0 == k1 == KeyCode.from_char("a")
+    # Deadlines are absolute, so a late press does not shorten the release offset
+    assert 50_000_000 <= t1 - start < 80_000_000
+
+
+def test_telemetry_records_each_dispatch():
+    telemetry = Telemetry()
+    p = Player(settle=0.0, backend=NullBackend(), telemetry=telemetry)
+    events = [
+        {"type": "key", "key": "a", "pressed": True,  "t": 0.0},
+        {"type": "key", "key": "a", "pressed": False, "t": 0.01},
+    ]
+    p.play(events, repeat=3)
+    report = telemetry.report()
+    assert report["dispatched"] == 6
+    assert report["failed"] == report["skipped"] == 0
+    assert set(report["by_iteration"]) == {"0", "1", "2"}
+    assert report["lateness"]["p99_us"] < 20_000
+
+
+def test_telemetry_counts_skipped_on_stop():
+    telemetry = Telemetry()
+    p = Player(backend=NullBackend(), telemetry=telemetry)
+    events = [
+        {"type": "key", "key": "a", "pressed": True,  "t": 0.0},
+        {"type": "key", "key": "a", "pressed": False, "t": 1.0},
+    ]
+    threading.Timer(0.05, p.stop).start()
+    p.play(events, repeat=5)
+    assert telemetry.recorded == 1
+    assert telemetry.skipped == 9
+
+
+def test_play_with_capped_timing():
+    backend = NullBackend()
+    p = Player(backend=backend)
+    events = [
+        {"type": "key", "key": "a", "pressed": True,  "t": 0.0},
+        {"type": "key", "key": "a", "pressed": False, "t": 5.0},
+    ]
+    start = time.perf_counter()
+    p.play(events, timing=Timing("cap", max_gap=0.05))
+    assert time.perf_counter() - start < 0.5
+    assert len(backend.log) == 2
+
+
+SEEK_EVENTS = [
+    {"type": "key", "key": "shift", "pressed": True, "t": 0.0},
+    {"type": "click", "x": 10, "y": 20, "button": "left", "pressed": True, "t": 0.01},
+    {"type": "key", "key": "a", "pressed": True, "t": 0.02},
+    {"type": "key", "key": "a", "pressed": False, "t": 0.03},
+    {"type": "click", "x": 10, "y": 20, "button": "left", "pressed": False, "t": 0.04},
+    {"type": "key", "key": "shift", "pressed": False, "t": 0.05},
+]
+
+
+def _actions(backend):
+    return [(action, args[0] if args else None) for _, action, *args in backend.log]
+
+
+def test_play_range_restores_held_state_first():
+    backend = NullBackend()
+    Player(settle=0.0, backend=backend).play(SEEK_EVENTS, start=0.025, end=0.045)
+    actions = _actions(backend)
+    a, shift = KeyCode.from_char("a"), Key.shift
+    # Seek point: cursor back on the button, then button, shift and 'a' pressed again
+    assert actions[0] == ("move", (10, 20))
+    assert actions[1] == ("press_button", Button.left)
+    assert set(actions[2:4]) == {("press_key", shift), ("press_key", a)}
+    # Then rows [0.03, 0.045): the 'a' release and the button release
+    assert actions[4:6] == [("release_key", a), ("release_button", Button.left)]
+    # Shift is released at the end of the range, not replayed
+    assert actions[6:] == [("release_key", shift)]
+
+
+def test_play_range_loops_with_repeat():
+    backend = NullBackend()
+    Player(settle=0.0, backend=backend).play(SEEK_EVENTS, repeat=3, start=0.02, end=0.035)
+    presses = [a for a in _actions(backend) if a == ("press_key", KeyCode.from_char("a"))]
+    assert len(presses) == 3
+
+
+def test_stopped_play_resumes_where_it_left_off():
+    events = [{"type": "key", "key": "a", "pressed": i % 2 == 0, "t": i * 0.02} for i in range(10)]
+    backend = NullBackend()
+    p = Player(settle=0.0, backend=backend)
+    threading.Timer(0.05, p.stop).start()
+    assert p.play(events, repeat=2) is False
+    iteration, row = p.position
+    assert iteration == 0 and 0 < row < 10
+    assert p.play(events, repeat=2, resume=p.position) is True
+    assert p.position is None
+    # Every press of both passes is sent once, plus a re-press of 'a' if
+    # the stop fell between a press and its release
+    assert sum(1 for _, action, _ in backend.log if action == "press_key") == 10 + row % 2
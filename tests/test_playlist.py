@@ -0,0 +1,135 @@
+# tests/test_playlist.py
+import threading
+import time
+import pytest
+from src.backends import NullBackend
+from src.macro_store import save_macro
+from src.player import Player
+from src.playlist import (save_playlist, load_playlist, list_playlists, delete_playlist,
+                          missing_macros, estimate_duration, iter_playlist)
+
+
+def _tap(key, hold=0.02):
+    return [{"type": "key", "key": key, "pressed": True, "t": 0.0},
+            {"type": "key", "key": key, "pressed": False, "t": hold}]
+
+
+def test_save_load_normalizes_entries(tmp_path):
+    save_playlist("p", ["a", {"macro": "b", "repeat": 3, "speed": 2}], folder=tmp_path)
+    entries = load_playlist("p", folder=tmp_path)["entries"]
+    assert entries == [
+        {"macro": "a", "repeat": 1, "speed": 1.0, "delay": 0.0},
+        {"macro": "b", "repeat": 3, "speed": 2.0, "delay": 0.0},
+    ]
+    assert list_playlists(folder=tmp_path) == ["p"]
+    delete_playlist("p", folder=tmp_path)
+    assert list_playlists(folder=tmp_path) == []
+
+
+def test_playlists_are_not_listed_as_macros(tmp_path):
+    from src.macro_store import list_macros
+    save_macro("a", _tap("a"), folder=tmp_path)
+    save_playlist("p", ["a"], folder=tmp_path)
+    assert list_macros(folder=tmp_path) == ["a"]
+
+
+@pytest.mark.parametrize("entry", [{"repeat": 2}, {"macro": "a", "repeat": 0}, {"macro": "a", "speed": 0},
+                                   {"macro": "a", "repeat": None}, {"macro": "a", "speed": "fast"}])
+def test_invalid_entries_rejected(tmp_path, entry):
+    with pytest.raises(ValueError):
+        save_playlist("p", [entry], folder=tmp_path)
+
+
+@pytest.mark.parametrize("name", ["", "../escape", "a/b", "a\\b", "bad:name", ".hidden", "trailing.", "tab\there"])
+def test_invalid_playlist_names_rejected(tmp_path, name):
+    with pytest.raises(ValueError):
+        save_playlist(name, ["a"], folder=tmp_path / "lists")
+    assert not (tmp_path / "lists").exists() or list((tmp_path / "lists").iterdir()) == []
+    assert not (tmp_path / "escape.playlist").exists()
+
+
+def test_failed_save_keeps_previous_playlist(tmp_path, monkeypatch):
+    save_playlist("p", ["a"], folder=tmp_path)
+    monkeypatch.setattr("src.playlist.json.dump", lambda *args, **kwargs: 1 / 0)
+    with pytest.raises(ZeroDivisionError):
+        save_playlist("p", ["b"], folder=tmp_path)
+    assert [e["macro"] for e in load_playlist("p", folder=tmp_path)["entries"]] == ["a"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["p.playlist"]
+
+
+def test_load_missing_and_corrupt(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        load_playlist("ghost", folder=tmp_path)
+    (tmp_path / "bad.playlist").write_text("{not json")
+    with pytest.raises(ValueError):
+        load_playlist("bad", folder=tmp_path)
+
+
+def test_missing_macros_and_estimate(tmp_path):
+    save_macro("a", _tap("a", hold=1.0), folder=tmp_path)
+    save_playlist("p", [{"macro": "a", "repeat": 3, "speed": 2.0, "delay": 0.5}, "ghost"], folder=tmp_path)
+    playlist = load_playlist("p", folder=tmp_path)
+    assert missing_macros(playlist, folder=tmp_path) == ["ghost"]
+    assert estimate_duration(playlist, folder=tmp_path) == pytest.approx(2.0)
+
+
+def test_iter_playlist_loads_one_step_ahead():
+    loaded = []
+
+    def load(name):
+        loaded.append(name)
+        return name
+
+    playlist = {"entries": [{"macro": m, "repeat": 1, "speed": 1.0, "delay": 0.0} for m in "abbcd"]}
+    steps = iter_playlist(playlist, load=load)
+    assert next(steps)[0] == "a"
+    time.sleep(0.05)
+    assert loaded == ["a", "b"]  # only the next macro is prefetched
+    assert [s[0] for s in steps] == ["b", "b", "c", "d"]
+    assert loaded == ["a", "b", "c", "d"]  # the repeated "b" reused its plan
+
+
+def test_play_steps_plays_in_order_with_delay(tmp_path):
+    save_macro("a", _tap("a"), folder=tmp_path)
+    save_macro("b", _tap("b"), folder=tmp_path)
+    save_playlist("p", [{"macro": "a", "repeat": 2}, {"macro": "b", "delay": 0.1}], folder=tmp_path)
+    backend = NullBackend()
+    seen = []
+    start = time.perf_counter_ns()
+    done = Player(settle=0.0, backend=backend).play_steps(
+        iter_playlist(load_playlist("p", folder=tmp_path), folder=tmp_path), on_step=seen.append)
+    assert done is True
+    assert seen == [0, 1]
+    presses = [(t, key.char) for t, action, key in backend.log if action == "press_key"]
+    assert [k for _, k in presses] == ["a", "a", "b"]
+    assert presses[2][0] - presses[1][0] >= 100_000_000
+
+
+def test_play_steps_stop_during_delay(tmp_path):
+    save_macro("a", _tap("a"), folder=tmp_path)
+    save_playlist("p", [{"macro": "a", "delay": 5.0}], folder=tmp_path)
+    player = Player(settle=0.0, backend=NullBackend())
+    threading.Timer(0.05, player.stop).start()
+    start = time.perf_counter()
+    assert player.play_steps(iter_playlist(load_playlist("p", folder=tmp_path), folder=tmp_path)) is False
+    assert time.perf_counter() - start < 1.0
+
+
+def test_play_steps_skips_and_reports_corrupt_macro(tmp_path):
+    save_macro("a", _tap("a"), folder=tmp_path)
+    (tmp_path / "b.json").write_text('{"events": [{"type": "key", "t": 0}]}')
+    save_macro("c", _tap("c"), folder=tmp_path)
+    save_playlist("p", ["a", "b", "c"], folder=tmp_path)
+    playlist = load_playlist("p", folder=tmp_path)
+    assert missing_macros(playlist, folder=tmp_path) == []
+    with pytest.raises(ValueError, match="corrupt"):
+        Player(settle=0.0, backend=NullBackend()).play_steps(iter_playlist(playlist, folder=tmp_path))
+
+    backend = NullBackend()
+    failed, seen = [], []
+    done = Player(settle=0.0, backend=backend).play_steps(
+        iter_playlist(playlist, folder=tmp_path, on_error=lambda name, e: failed.append(name)), on_step=seen.append)
+    assert done is True
+    assert failed == ["b"]
+    assert seen == [0, 2]
+    assert [key.char for _, action, key in backend.log if action == "press_key"] == ["a", "c"]
@@ -0,0 +1,35 @@
+# tests/test_progress.py
+import time
+from src.progress import Progress, format_progress
+from src.player import Player
+from src.backends import NullBackend
+
+
+def test_snapshot_before_any_iteration():
+    snap = Progress(10).snapshot()
+    assert (snap["current"], snap["total"], snap["rate"], snap["eta"]) == (1, 10, 0.0, None)
+    assert "ETA" not in format_progress(snap)
+
+
+def test_rate_and_eta_from_completed_iterations():
+    p = Progress(100)
+    p._start_ns = time.perf_counter_ns() - 2_000_000_000  # started 2s ago
+    p.update(50)
+    snap = p.snapshot()
+    assert snap["current"] == 51
+    assert 24 < snap["rate"] <= 25
+    assert 2.0 <= snap["eta"] < 2.1
+    assert format_progress(snap).startswith("51/100 · 0:02 elapsed · 25 it/s · ETA 0:02")
+
+
+def test_format_large_counts_and_hours():
+    snap = {"current": 1_234_568, "total": 1_000_000_000, "elapsed": 3725.0, "rate": 331.4, "eta": 3_000_000.0}
+    assert format_progress(snap) == "1,234,568/1,000,000,000 · 1:02:05 elapsed · 331 it/s · ETA 833:20:00"
+
+
+def test_player_drives_progress():
+    p = Progress(500)
+    events = [{"type": "key", "key": "a", "pressed": True, "t": 0.0},
+              {"type": "key", "key": "a", "pressed": False, "t": 0.0}]
+    Player(settle=0.0, backend=NullBackend()).play(events, repeat=500, on_iteration=p.update)
+    assert p.snapshot()["current"] == 500
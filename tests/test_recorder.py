@@ -1,6 +1,7 @@
 # tests/test_recorder.py
 import time
-from src.recorder import Recorder
+from src.recorder import INTERRUPT_CHORD, Recorder, StreamingRecorder
+from src.backends import NullBackend
 from pynput.keyboard import Key, KeyCode
 
 
@@ -86,8 +87,139 @@ def test_stop_before_start_returns_empty_list():
 
 def test_ts_increases_monotonically():
     r = Recorder()
-    r._start_time = time.time()
-    t1 = r._ts()
+    r._start_ns = time.perf_counter_ns()
+    t1 = r._ts(time.perf_counter_ns())
     time.sleep(0.01)
-    t2 = r._ts()
+    t2 = r._ts(time.perf_counter_ns())
     assert t2 > t1
+
+
+def test_moves_are_simplified_into_one_path_event():
+    r = Recorder(record_moves=True, move_interval=0.0)
+    for i in range(100):
+        r._on_move(i, i)
+    r._on_key_press(KeyCode.from_char("a"))
+    events = r.stop()
+    assert [e["type"] for e in events] == ["move", "key"]
+    path = events[0]["path"]
+    assert path[0][:2] == [0, 0]
+    assert path[-1][:2] == [99, 99]
+    assert len(path) < 100
+
+
+def test_move_rate_limit_keeps_last_point():
+    r = Recorder(record_moves=True, move_interval=60.0)
+    r._on_move(0, 0)
+    r._on_move(5, 5)   # rate-limited, but it is the path's end
+    events = r.stop()
+    assert [p[:2] for p in events[0]["path"]] == [[0, 0], [5, 5]]
+
+
+def test_streaming_recorder_spills_to_disk(tmp_path):
+    from src.macro_store import load_macro
+    backend = NullBackend()
+    r = StreamingRecorder("stream", folder=tmp_path, batch_size=2, flush_interval=0.01, backend=backend)
+    r.start()
+    backend.inject(("scroll", i, i, 0, 1) for i in range(5))
+    path = r.stop()
+    assert path == tmp_path / "stream.jsonl"
+    assert r._events == []  # nothing was kept in memory
+    events = load_macro("stream", folder=tmp_path)
+    assert [e["x"] for e in events] == [0, 1, 2, 3, 4]
+
+
+def test_streaming_recorder_stop_before_start(tmp_path):
+    r = StreamingRecorder("stream", folder=tmp_path)
+    assert r.stop() is None
+
+
+def test_callbacks_only_enqueue_until_consumed():
+    r = Recorder(filter_keys=[_KEY_F6])
+    r._on_key_press(KeyCode.from_char("\x16"))  # Ctrl+V arrives as a control char
+    r._on_key_press(_KEY_F6)
+    r._on_key_release(KeyCode.from_char("\x16"))
+    assert r._events == []  # normalization is deferred to the consumer
+    events = r.stop()
+    assert [(e["key"], e["pressed"]) for e in events] == [("v", True), ("v", False)]
+    assert events[0]["t"] <= events[1]["t"]
+
+
+def test_recorder_through_null_backend_at_fixed_rate():
+    backend = NullBackend()
+    r = Recorder(backend=backend)
+    r.start()
+    stream = [("press", KeyCode.from_char("a")), ("release", KeyCode.from_char("a"))] * 10
+    start = time.perf_counter()
+    assert backend.inject(stream, rate=1000) == 20
+    assert time.perf_counter() - start >= 0.018
+    events = r.stop()
+    assert len(events) == 20
+    ts = [e["t"] for e in events]
+    assert ts == sorted(ts) and ts[-1] - ts[0] >= 0.015
+
+
+_CTRL_C = [("press", _KEY_CTRL_L), ("press", KeyCode.from_char("\x03"))]
+
+
+def test_trailing_ctrl_c_is_trimmed():
+    backend = NullBackend()
+    r = Recorder(backend=backend, trim_chord=INTERRUPT_CHORD)
+    r.start()
+    # A Ctrl+C copy in the middle is kept; only the one that ended the session goes
+    backend.inject(_CTRL_C + [("release", KeyCode.from_char("c")), ("release", _KEY_CTRL_L),
+                              ("press", KeyCode.from_char("a"))] + _CTRL_C)
+    events = r.stop()
+    assert [(e["key"], e["pressed"]) for e in events] == [
+        ("ctrl_l", True), ("c", True), ("c", False), ("ctrl_l", False), ("a", True)]
+
+
+def test_typed_c_before_trailing_ctrl_c_is_kept():
+    backend = NullBackend()
+    r = Recorder(backend=backend, trim_chord=INTERRUPT_CHORD)
+    r.start()
+    typed = [(action, KeyCode.from_char(c)) for c in "abc" for action in ("press", "release")]
+    backend.inject(typed + [("press", _KEY_CTRL_L), ("press", _KEY_CTRL_L)] + _CTRL_C[1:] +
+                   [("release", KeyCode.from_char("c")), ("release", _KEY_CTRL_L)])
+    events = r.stop()
+    assert [(e["key"], e["pressed"]) for e in events] == [
+        ("a", True), ("a", False), ("b", True), ("b", False), ("c", True), ("c", False)]
+
+
+def test_streaming_recorder_holds_back_trailing_ctrl_c(tmp_path):
+    from src.macro_store import load_macro
+    backend = NullBackend()
+    r = StreamingRecorder("stream", folder=tmp_path, batch_size=1, flush_interval=0.01, backend=backend,
+                          trim_chord=INTERRUPT_CHORD)
+    r.start()
+    backend.inject([("press", KeyCode.from_char("a")), ("press", KeyCode.from_char("c"))] + _CTRL_C)
+    time.sleep(0.05)  # let the writer flush everything it may
+    r.stop()
+    assert [e["key"] for e in load_macro("stream", folder=tmp_path)] == ["a", "c"]
+
+
+def test_streaming_recorder_replaces_previous_macro_only_when_done(tmp_path):
+    from src.macro_store import load_macro, save_macro
+    save_macro("stream", [{"type": "key", "key": "x", "pressed": True, "t": 0.0}], folder=tmp_path, fmt="binary")
+    backend = NullBackend()
+    r = StreamingRecorder("stream", folder=tmp_path, batch_size=1, flush_interval=0.01, backend=backend)
+    r.start()
+    backend.inject(("scroll", i, i, 0, 1) for i in range(3))
+    time.sleep(0.05)
+    assert [e["key"] for e in load_macro("stream", folder=tmp_path)] == ["x"]  # still the old one
+    assert r.stop() == tmp_path / "stream.jsonl"
+    assert [e["x"] for e in load_macro("stream", folder=tmp_path)] == [0, 1, 2]
+    assert sorted(p.name for p in tmp_path.iterdir() if not p.name.startswith(".")) == ["stream.jsonl"]
+
+
+def test_streaming_recorder_empty_or_discarded_keeps_previous_macro(tmp_path):
+    from src.macro_store import load_macro, save_macro
+    save_macro("stream", [{"type": "key", "key": "x", "pressed": True, "t": 0.0}], folder=tmp_path)
+    backend = NullBackend()
+    r = StreamingRecorder("stream", folder=tmp_path, backend=backend)
+    r.start()
+    assert r.stop() is None  # nothing recorded
+    r.start()
+    backend.inject([("scroll", 0, 0, 0, 1)])
+    assert r.stop(keep=False) is None
+    assert [e["key"] for e in load_macro("stream", folder=tmp_path)] == ["x"]
+    assert sorted(p.name for p in tmp_path.iterdir() if not p.name.startswith(".")) == ["stream.json"]
@@ -0,0 +1,98 @@
+# tests/test_remap.py
+from array import array
+
+import pytest
+
+import src.remap
+from src.macro_store import save_macro, load_macro_cached, macro_cache
+from src.plan import compile_events
+from src.remap import Remap
+
+EVENTS = [
+    {"type": "click", "x": 100, "y": 200, "button": "left", "pressed": True, "t": 0.0},
+    {"type": "key", "key": "a", "pressed": True, "t": 0.1},
+    {"type": "click", "x": 1919, "y": 1079, "button": "left", "pressed": False, "t": 0.2},
+    {"type": "scroll", "x": 2000, "y": 500, "dx": 0, "dy": -1, "t": 0.3},
+]
+
+needs_numpy = pytest.mark.skipif(src.remap.np is None, reason="NumPy not installed")
+
+
+def test_scale_and_offset():
+    plan = Remap(scale=(2560 / 1920, 1440 / 1080), offset=(10, 0))(compile_events(EVENTS))
+    assert (plan.xs[0], plan.ys[0]) == (143, 267)
+    assert (plan.xs[2], plan.ys[2]) == (2569, 1439)
+
+
+def test_remap_shares_other_columns():
+    source = compile_events(EVENTS)
+    plan = Remap(offset=(5, 5)).plan(source)
+    assert plan.ops is source.ops and plan.offsets is source.offsets and plan.args is source.args
+    assert list(source.xs) == [100, 0, 1919, 2000]  # original untouched
+
+
+def test_regions_take_precedence_in_order():
+    remap = Remap(offset=(1000, 1000), regions=[
+        ((0, 0, 1920, 1080), (0, 0, 3840, 2160)),
+        ((0, 0, 4000, 4000), (0, 0, 10, 10)),
+    ])
+    xs, ys = remap.apply(array("i", [100, 1919, 2000, 5000]), array("i", [200, 1079, 500, 5000]), use_numpy=False)
+    assert list(xs) == [200, 3838, 5, 6000]
+    assert list(ys) == [400, 2158, 1, 6000]
+
+
+def test_from_displays_maps_monitor_to_monitor():
+    # Two 1080p monitors side by side, replayed on a 1440p + 1080p layout
+    remap = Remap.from_displays([(0, 0, 1920, 1080), (1920, 0, 1920, 1080)],
+                                [(0, 0, 2560, 1440), (2560, 0, 1920, 1080)])
+    xs, ys = remap.apply(array("i", [960, 2880]), array("i", [540, 540]))
+    assert list(xs) == [1280, 3520]
+    assert list(ys) == [720, 540]
+
+
+def test_identity_and_settings():
+    assert Remap().is_identity
+    assert Remap.from_settings({"display_remap": None}) is None
+    assert Remap.from_settings({"display_remap": {"scale": [1, 1]}}) is None
+    remap = Remap.from_settings({"display_remap": {"scale": [2, 2], "regions": [[0, 0, 10, 10, 0, 0, 5, 5]]}})
+    assert remap == Remap(scale=(2, 2), regions=[((0, 0, 10, 10), (0, 0, 5, 5))])
+    with pytest.raises(ValueError):
+        Remap(regions=[((0, 0, 0, 10), (0, 0, 5, 5))])
+
+
+@pytest.mark.parametrize("profile", [
+    [1, 2],
+    {"scale": 2},
+    {"scale": [2]},
+    {"offset": ["a", 0]},
+    {"regions": [[0, 0, 10, 10]]},
+    {"regions": 5},
+    {"regions": [5]},
+    {"recorded": [[0, 0, 10]], "current": [[0, 0, 10, 10]]},
+    {"recorded": [[0, 0, 10, 10]]},
+])
+def test_malformed_settings_profile_raises_value_error(profile):
+    with pytest.raises(ValueError, match="display_remap"):
+        Remap.from_settings({"display_remap": profile})
+
+
+@needs_numpy
+def test_numpy_matches_pure_python():
+    import random
+    rng = random.Random(1)
+    xs = array("i", [rng.randrange(-3000, 6000) for _ in range(5000)])
+    ys = array("i", [rng.randrange(-500, 3000) for _ in range(5000)])
+    remap = Remap.from_displays([(0, 0, 1920, 1080), (-1280, 0, 1280, 1024)],
+                                [(0, 0, 2560, 1440), (-1920, 100, 1920, 1200)])
+    assert remap.apply(xs, ys, use_numpy=True) == remap.apply(xs, ys, use_numpy=False)
+
+
+def test_cached_per_display_profile(tmp_path):
+    folder = tmp_path / "macros"
+    save_macro("m", EVENTS, folder=folder, fmt="binary")
+    macro_cache.clear()
+    small = load_macro_cached("m", folder=folder, transform=Remap(scale=(0.5, 0.5)))
+    again = load_macro_cached("m", folder=folder, transform=Remap(scale=(0.5, 0.5)))
+    other = load_macro_cached("m", folder=folder, transform=Remap(scale=(2, 2)))
+    assert again is small
+    assert small.xs[0] == 50 and other.xs[0] == 200
@@ -0,0 +1,127 @@
+# tests/test_remote_player.py
+import threading
+import time
+
+import pytest
+
+from src.backends import NullBackend
+from src.plan import compile_events
+from src.remote_player import RemotePlayer
+from src.telemetry import Telemetry
+
+
+def _events(n, interval=0.01):
+    events = []
+    for i in range(n):
+        t = round(i * interval, 4)
+        events.append({"type": "key", "key": "a", "pressed": True, "t": t})
+        events.append({"type": "key", "key": "a", "pressed": False, "t": round(t + interval / 2, 4)})
+    return events
+
+
+@pytest.fixture
+def remote():
+    players = []
+
+    def make(**kwargs):
+        p = RemotePlayer(settle=0, backend="null", **kwargs)
+        players.append(p)
+        return p
+
+    yield make
+    for p in players:
+        p.close()
+
+
+def test_unknown_backend_rejected():
+    with pytest.raises(ValueError):
+        RemotePlayer(backend="xdotool")
+
+
+def test_timing_options_are_exposed():
+    p = RemotePlayer(precise=False, settle=0.02, backend="null")
+    assert (p.precise, p.settle) == (False, 0.02)
+
+
+def test_play_runs_to_completion_and_reports_iterations(remote):
+    p = remote(telemetry=Telemetry())
+    plan = compile_events(_events(5))
+    seen = []
+    assert p.play(plan, repeat=2, on_iteration=seen.append) is True
+    assert seen == [0, 1]
+    assert p.position is None
+    assert p.actions == 2 * len(plan)  # null backend calls in the child
+    assert p.telemetry.recorded == 2 * len(plan)
+    assert p.alive
+
+
+def test_telemetry_can_be_attached_between_plays(remote):
+    p = remote()
+    plan = compile_events(_events(3, interval=0.001))
+    p.play(plan)
+    p.telemetry = Telemetry()
+    p.play(plan)
+    assert p.telemetry.recorded == len(plan)
+
+
+def test_plan_is_sent_once_per_plan(remote):
+    p = remote()
+    plan = compile_events(_events(2, interval=0.001))
+    p.play(plan)
+    first = p._plan_id
+    p.play(plan)
+    assert p._plan_id == first
+    p.play(compile_events(_events(2, interval=0.001)))
+    assert p._plan_id == first + 1
+
+
+def test_stop_then_resume(remote):
+    p = remote()
+    plan = compile_events(_events(50))
+    threading.Timer(0.1, p.stop).start()
+    assert p.play(plan) is False
+    iteration, row = p.position
+    assert iteration == 0 and 0 < row < len(plan)
+    assert p.play(plan, resume=p.position) is True
+    assert p.position is None
+
+
+def test_stop_when_idle_does_not_affect_next_play(remote):
+    p = remote()
+    plan = compile_events(_events(3, interval=0.001))
+    p.start()
+    p.stop()
+    assert p.play(plan) is True
+
+
+def test_child_death_releases_plan_keys(remote):
+    cleanup = NullBackend()
+    p = remote(cleanup_backend=cleanup)
+    plan = compile_events(_events(200))
+    p.start()
+    threading.Timer(0.1, lambda: p._process.terminate()).start()
+    start = time.perf_counter()
+    assert p.play(plan) is False
+    assert time.perf_counter() - start < 1.5
+    assert [entry[1] for entry in cleanup.log] == ["release_key"]
+    assert not p.alive
+    # The next play starts a fresh child
+    assert p.play(compile_events(_events(2, interval=0.001))) is True
+
+
+def test_keyboard_interrupt_stops_child_and_keeps_position(remote):
+    p = remote()
+    plan = compile_events(_events(50))
+    seen = []
+
+    def on_iteration(i):
+        seen.append(i)
+        if len(seen) == 1:
+            raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        p.play(plan, repeat=3, on_iteration=on_iteration)
+    # on_iteration(0) fires as the first pass starts
+    assert p.position is not None and p.position[0] == 0
+    assert p.alive
+    assert p.play(plan, resume=p.position) is True
@@ -0,0 +1,33 @@
+# tests/test_scheduler.py
+import threading
+import time
+from src.scheduler import Scheduler
+
+
+def test_wait_until_reaches_deadline():
+    s = Scheduler(threading.Event())
+    deadline = time.perf_counter_ns() + 20_000_000
+    assert s.wait_until(deadline) is True
+    assert time.perf_counter_ns() >= deadline
+
+
+def test_wait_until_past_deadline_returns_immediately():
+    s = Scheduler(threading.Event())
+    start = time.perf_counter()
+    assert s.wait_until(time.perf_counter_ns() - 1_000_000) is True
+    assert time.perf_counter() - start < 0.05
+
+
+def test_wait_until_honors_stop():
+    stop = threading.Event()
+    s = Scheduler(stop)
+    threading.Timer(0.05, stop.set).start()
+    start = time.perf_counter()
+    assert s.wait_until(time.perf_counter_ns() + 10_000_000_000) is False
+    assert time.perf_counter() - start < 1.0
+
+
+def test_sleep_only_mode():
+    s = Scheduler(threading.Event(), spin_ns=0)
+    deadline = time.perf_counter_ns() + 10_000_000
+    assert s.wait_until(deadline) is True
@@ -1,8 +1,9 @@
 # tests/test_settings.py
 import json
+import time
 import pytest
 from pathlib import Path
-from src.settings import load_settings, save_settings, DEFAULT_SETTINGS
+from src.settings import load_settings, save_settings, DEFAULT_SETTINGS, SettingsManager
 
 @pytest.fixture
 def settings_path(tmp_path, monkeypatch):
@@ -36,3 +37,65 @@ def test_load_falls_back_on_corrupt_file(settings_path):
     settings_path.write_text("not json")
     s = load_settings()
     assert s == DEFAULT_SETTINGS
+
+def test_save_is_atomic(settings_path):
+    save_settings({"speed": 2.0})
+    assert json.loads(settings_path.read_text()) == {"speed": 2.0}
+    assert list(settings_path.parent.iterdir()) == [settings_path]
+
+
+def test_manager_debounces_writes(settings_path, monkeypatch):
+    writes = []
+    monkeypatch.setattr("src.settings.save_settings", lambda values, path=None: writes.append(values))
+    manager = SettingsManager(delay=0.05)
+    for n in range(1, 20):
+        manager.update(repeat_count=n)
+    assert manager["repeat_count"] == 19
+    assert writes == []
+    time.sleep(0.2)
+    assert len(writes) == 1 and writes[0]["repeat_count"] == 19
+
+
+def test_manager_notifies_only_changed_fields(settings_path):
+    manager = SettingsManager(delay=60)
+    hotkey_diffs, all_diffs = [], []
+    manager.subscribe(hotkey_diffs.append, fields=("record_hotkey", "play_hotkey"))
+    unsubscribe = manager.subscribe(all_diffs.append)
+    manager.update(repeat_count=5, record_hotkey="<f6>")  # hotkey unchanged
+    assert hotkey_diffs == []
+    assert all_diffs == [{"repeat_count": (1, 5)}]
+    manager["play_hotkey"] = "<f8>"
+    assert hotkey_diffs == [{"play_hotkey": ("<f7>", "<f8>")}]
+    unsubscribe()
+    manager.update(speed=2.0)
+    assert len(all_diffs) == 2
+    manager.flush()
+
+
+def test_manager_flush_persists_pending_changes(settings_path):
+    manager = SettingsManager(delay=60)
+    manager.update(speed=1.5)
+    assert not settings_path.exists()
+    manager.flush()
+    assert load_settings()["speed"] == 1.5
+    assert SettingsManager().get("speed") == 1.5
+
+def test_flush_waits_for_a_timer_write_in_progress(settings_path, monkeypatch):
+    active = []
+    overlaps = []
+
+    def slow_save(values, path=None):
+        active.append(1)
+        overlaps.append(len(active))
+        time.sleep(0.1)
+        save_settings(values, path)
+        active.pop()
+
+    monkeypatch.setattr("src.settings.save_settings", slow_save)
+    manager = SettingsManager(delay=0.01)
+    manager.update(speed=1.5)
+    time.sleep(0.05)  # the timer's write is now under way
+    manager.update(speed=2.0)
+    manager.flush()
+    assert max(overlaps) == 1
+    assert load_settings()["speed"] == 2.0
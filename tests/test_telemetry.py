@@ -0,0 +1,57 @@
+# tests/test_telemetry.py
+import random
+from src.telemetry import Histogram, Telemetry
+from src.macro_binary import TYPE_CLICK, TYPE_KEY
+
+
+def test_histogram_small_values_exact():
+    h = Histogram()
+    for v in range(10):
+        h.record(v)
+    assert h.percentile(50) == 4
+    assert h.percentile(100) == 9
+    assert h.max == 9
+
+
+def test_histogram_relative_error_bounded():
+    rng = random.Random(1)
+    values = sorted(rng.randrange(1, 10**9) for _ in range(5000))
+    h = Histogram()
+    for v in values:
+        h.record(v)
+    for p in (50, 90, 99):
+        exact = values[-(-len(values) * p // 100) - 1]
+        assert exact <= h.percentile(p) <= exact * 1.035
+
+
+def test_histogram_negative_clamped_and_merge():
+    a, b = Histogram(), Histogram()
+    a.record(-5)
+    b.record(1000)
+    a.merge(b)
+    assert a.count == 2
+    assert a.percentile(50) == 0
+    assert a.max == 1000
+
+
+def test_ring_buffer_keeps_latest():
+    t = Telemetry(capacity=4)
+    for i in range(10):
+        t.record(TYPE_KEY, 0, i * 100, i * 100 + 5, i * 100 + 7, True)
+    rows = t.recent()
+    assert [r[2] for r in rows] == [600, 700, 800, 900]
+    assert rows[-1] == (TYPE_KEY, 0, 900, 905, 2, 1)
+    assert t.report()["dispatched"] == 10
+
+
+def test_report_groups_by_type_and_counts_failures():
+    t = Telemetry()
+    t.record(TYPE_KEY, 0, 0, 1_000, 2_000, True)
+    t.record(TYPE_CLICK, 1, 0, 3_000_000, 3_000_100, False)
+    report = t.report()
+    assert report["failed"] == 1
+    assert set(report["by_type"]) == {"key", "click"}
+    assert report["by_type"]["click"]["max_us"] == 3000.0
+    assert "1 failed" in t.format_report()
+    t.reset()
+    assert t.report()["dispatched"] == 0
@@ -0,0 +1,68 @@
+# tests/test_timing.py
+import pytest
+from src.plan import compile_events
+from src.timing import Timing
+
+
+def _keys(*times):
+    # alternate press/release of "a" at the given offsets
+    return [{"type": "key", "key": "a", "pressed": i % 2 == 0, "t": t} for i, t in enumerate(times)]
+
+
+def _schedule(events, timing, speed=1.0, settle=0.0):
+    return [ns / 1e9 for ns in timing.schedule_ns(compile_events(events), speed, settle)]
+
+
+def test_uniform_divides_by_speed():
+    assert _schedule(_keys(0.0, 0.1, 2.0, 2.1), Timing(), speed=2.0) == pytest.approx([0.0, 0.05, 1.0, 1.05])
+
+
+def test_cap_limits_long_gaps_only():
+    out = _schedule(_keys(0.0, 0.1, 5.1, 5.2), Timing("cap", max_gap=0.5))
+    assert out == pytest.approx([0.0, 0.1, 0.6, 0.7])
+
+
+def test_split_shrinks_only_the_excess():
+    out = _schedule(_keys(0.0, 0.1, 2.6, 2.7), Timing("split", long_gap=0.5, long_speed=4.0))
+    assert out == pytest.approx([0.0, 0.1, 1.1, 1.2])
+
+
+def test_fastest_keeps_hold_and_reposition_spacing():
+    events = [
+        {"type": "key", "key": "a", "pressed": True, "t": 1.0},
+        {"type": "key", "key": "a", "pressed": False, "t": 1.5},
+        {"type": "click", "x": 5, "y": 5, "button": "left", "pressed": True, "t": 3.0},
+        {"type": "click", "x": 5, "y": 5, "button": "left", "pressed": False, "t": 3.004},
+        {"type": "scroll", "x": 5, "y": 5, "dx": 0, "dy": 1, "t": 4.0},
+    ]
+    out = _schedule(events, Timing("fastest", min_gap=0.01), settle=0.02)
+    # press at once; release after 10 ms; click at a new spot after the 20 ms settle;
+    # a release already faster than min_gap keeps its own gap; same-spot scroll at once
+    assert out == pytest.approx([0.0, 0.01, 0.03, 0.034, 0.034])
+
+
+def test_fastest_keeps_spacing_after_a_move_path():
+    events = [
+        {"type": "move", "path": [[0, 0, 0.0], [10, 0, 0.5]], "t": 0.0},
+        {"type": "click", "x": 10, "y": 0, "button": "left", "pressed": True, "t": 2.0},
+    ]
+    out = _schedule(events, Timing("fastest", min_gap=0.01))
+    assert out[-2] == 0.0
+    assert out[-1] == pytest.approx(0.01)
+
+
+def test_duration_and_validation():
+    plan = compile_events(_keys(0.0, 0.1, 10.1))
+    assert Timing("cap", max_gap=1.0).duration(plan) == pytest.approx(1.1)
+    assert Timing().duration(compile_events([])) == 0.0
+    with pytest.raises(ValueError):
+        Timing("warp")
+    t = Timing.from_settings({"timing_mode": "split", "min_gap_ms": 20})
+    assert (t.mode, t.min_gap) == ("split", 0.02)
+
+
+@pytest.mark.parametrize("mode", ["uniform", "split"])
+@pytest.mark.parametrize("speed", [0, -1.0])
+def test_non_positive_speed_rejected(mode, speed):
+    with pytest.raises(ValueError, match="speed"):
+        _schedule(_keys(0.0, 0.1), Timing(mode), speed=speed)
@@ -0,0 +1,105 @@
+# tests/test_tracks.py
+import threading
+import time
+from src.backends import NullBackend
+from src.telemetry import Telemetry
+from src.tracks import Track, MultiPlayer
+
+
+def _tap(key, t, hold=0.01):
+    return [{"type": "key", "key": key, "pressed": True, "t": t},
+            {"type": "key", "key": key, "pressed": False, "t": t + hold}]
+
+
+def _keys(backend):
+    return [(action, key.char) for _, action, key in backend.log]
+
+
+def test_tracks_interleave_on_one_timeline():
+    backend = NullBackend()
+    a = Track(_tap("a", 0.0) + _tap("a", 0.06), name="a")
+    b = Track(_tap("b", 0.0), name="b", offset=0.03)
+    MultiPlayer(settle=0.0, backend=backend).play([a, b])
+    assert [k for action, k in _keys(backend) if action == "press_key"] == ["a", "b", "a"]
+
+
+def test_offset_speed_and_repeat_per_track():
+    backend = NullBackend()
+    slow = Track(_tap("a", 0.0, hold=0.04), repeat=2)
+    fast = Track(_tap("b", 0.0, hold=0.04), speed=2.0, offset=0.1)
+    start = time.perf_counter_ns()
+    MultiPlayer(settle=0.0, backend=backend).play([slow, fast])
+    times = {}
+    for t, action, key in backend.log:
+        times.setdefault((action, key.char), []).append((t - start) / 1e6)
+    assert len(times[("press_key", "a")]) == 2
+    b_press, b_release = times[("press_key", "b")][0], times[("release_key", "b")][0]
+    assert b_press >= 95
+    # 40 ms hold at 2x: released at 120 ms, however late the press went out
+    assert 120 <= b_release < 135
+
+
+def test_stop_track_releases_its_keys_and_others_continue():
+    backend = NullBackend()
+    held = Track(_tap("a", 0.0, hold=5.0))
+    other = Track(_tap("b", 0.0), offset=0.1)
+    player = MultiPlayer(settle=0.0, backend=backend)
+    threading.Timer(0.05, player.stop_track, args=(held,)).start()
+    start = time.perf_counter()
+    player.play([held, other])
+    assert time.perf_counter() - start < 1.0
+    assert _keys(backend) == [("press_key", "a"), ("release_key", "a"), ("press_key", "b"), ("release_key", "b")]
+
+
+def test_muted_track_dispatches_nothing():
+    backend = NullBackend()
+    muted = Track(_tap("a", 0.0))
+    muted.muted = True
+    MultiPlayer(settle=0.0, backend=backend).play([muted, Track(_tap("b", 0.0))])
+    assert {k for _, k in _keys(backend)} == {"b"}
+
+
+def test_stop_ends_all_tracks():
+    player = MultiPlayer(settle=0.0, backend=NullBackend())
+    threading.Timer(0.05, player.stop).start()
+    start = time.perf_counter()
+    assert player.play([Track(_tap("a", 0.0, hold=1.0), repeat=100), Track(_tap("b", 0.0), offset=2.0)]) is False
+    assert time.perf_counter() - start < 0.5
+
+
+def test_stop_counts_skipped_events():
+    player = MultiPlayer(settle=0.0, backend=NullBackend(), telemetry=Telemetry())
+    threading.Timer(0.05, player.stop).start()
+    player.play([Track(_tap("a", 0.0, hold=1.0), repeat=3), Track(_tap("b", 0.0), offset=2.0)])
+    # 'a' pressed; its release, two more taps and all of 'b' are left
+    assert player.telemetry.recorded == 1
+    assert player.telemetry.skipped == 1 + 2 * 2 + 2
+
+
+def test_stop_racing_a_track_wakeup_is_not_lost():
+    player = MultiPlayer(settle=0.0, backend=NullBackend())
+    track = Track(_tap("a", 0.0, hold=1.0), repeat=100)
+    original = player._stop_event.clear
+    calls = []
+
+    def clear():
+        calls.append(1)
+        if len(calls) == 2:
+            player._stopping = True  # stop() lands between the check and the clear
+        original()
+
+    threading.Timer(0.05, player.stop_track, args=(Track(_tap("b", 0.0)),)).start()
+    player._stop_event.clear = clear
+    start = time.perf_counter()
+    assert player.play([track]) is False
+    assert time.perf_counter() - start < 0.5
+
+
+def test_mouse_tracks_share_the_cursor():
+    backend = NullBackend()
+    clicks = [{"type": "click", "x": 1, "y": 1, "button": "left", "pressed": True, "t": 0.0},
+              {"type": "click", "x": 1, "y": 1, "button": "left", "pressed": False, "t": 0.05}]
+    scroll = [{"type": "scroll", "x": 9, "y": 9, "dx": 0, "dy": 1, "t": 0.0}]
+    MultiPlayer(settle=0.01, backend=backend).play([Track(clicks), Track(scroll, offset=0.02)])
+    moves = [entry[2] for entry in backend.log if entry[1] == "move"]
+    assert moves == [(1, 1), (9, 9), (1, 1)]
@@ -0,0 +1,73 @@
+# tests/test_watcher.py
+import os
+import threading
+
+from src.watcher import FolderWatcher, scan, diff
+
+SUFFIXES = (".json", ".mcb")
+
+
+def _touch(path, text="x", mtime_ns=None):
+    path.write_text(text)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_scan_filters_suffixes_and_hidden(tmp_path):
+    _touch(tmp_path / "a.json")
+    _touch(tmp_path / "b.mcb")
+    _touch(tmp_path / "notes.txt")
+    _touch(tmp_path / ".macro_index.json")
+    (tmp_path / "dir.json").mkdir()
+    assert sorted(scan(tmp_path, SUFFIXES)) == ["a.json", "b.mcb"]
+
+
+def test_scan_skips_ignored_names(tmp_path):
+    _touch(tmp_path / "a.json")
+    _touch(tmp_path / "settings.json")
+    assert list(scan(tmp_path, SUFFIXES, ignore={"settings.json"})) == ["a.json"]
+
+
+def test_scan_missing_folder_is_empty(tmp_path):
+    assert scan(tmp_path / "nope", SUFFIXES) == {}
+
+
+def test_diff_sets():
+    old = {"a": (1, 1), "b": (1, 1), "c": (1, 1)}
+    new = {"b": (1, 1), "c": (2, 1), "d": (1, 1)}
+    assert diff(old, new) == ({"d"}, {"a"}, {"c"})
+
+
+def test_poll_reports_added_removed_changed(tmp_path):
+    _touch(tmp_path / "keep.json", mtime_ns=1_000_000_000)
+    _touch(tmp_path / "edit.json", mtime_ns=1_000_000_000)
+    _touch(tmp_path / "gone.json")
+    calls = []
+    watcher = FolderWatcher(tmp_path, SUFFIXES, lambda *sets: calls.append(sets))
+    assert watcher.poll() == (set(), set(), set())
+    assert calls == []  # nothing changed, no callback
+
+    _touch(tmp_path / "new.mcb")
+    _touch(tmp_path / "edit.json", "longer", mtime_ns=2_000_000_000)
+    (tmp_path / "gone.json").unlink()
+    assert watcher.poll() == ({"new.mcb"}, {"gone.json"}, {"edit.json"})
+    assert calls == [({"new.mcb"}, {"gone.json"}, {"edit.json"})]
+    assert watcher.poll() == (set(), set(), set())
+
+
+def test_background_thread_reports_and_stops(tmp_path):
+    seen = threading.Event()
+    got = []
+
+    def on_change(added, removed, changed):
+        got.append(added)
+        seen.set()
+
+    watcher = FolderWatcher(tmp_path, SUFFIXES, on_change, interval=0.01)
+    watcher.start()
+    try:
+        _touch(tmp_path / "a.json")
+        assert seen.wait(2.0)
+    finally:
+        watcher.stop()
+    assert got[0] == {"a.json"}